@@ -0,0 +1,4 @@
+"""
+MissionManager のベンチマーク（python -m benchmarks run）
+合成データ（generate）で保存・読み込み・完了切替・並べ替え・描画のシナリオ（scenarios）を計測する
+"""
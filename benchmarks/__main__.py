@@ -0,0 +1,5 @@
+"""python -m benchmarks でベンチマークを実行"""
+import sys
+from benchmarks.runner import main
+
+sys.exit(main())
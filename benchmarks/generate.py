@@ -0,0 +1,97 @@
+"""ベンチマーク用の合成データ（同じ指定と seed からは常に同じデータを作る）"""
+from __future__ import annotations
+import random
+from datetime import date, datetime, timedelta
+from typing import TypedDict
+from missionmanager.models import GenreDict, MissionDict, TaskDict
+
+
+class WorkspaceSpec(TypedDict):
+    genres: int          # ジャンル数
+    missions: int        # ジャンルあたりのミッション数
+    tasks: int           # ミッションあたりのタスク数
+    due_spread: int      # 期限を base_date の前後何日に散らすか
+    due_ratio: float     # 期限を設定する割合（ミッション・タスクそれぞれ）
+    done_ratio: float    # 完了済みタスクの割合
+    seed: int
+    base_date: str       # 期限の基準日（YYYY-MM-DD）。既定は固定日付で、実行日によらず同じデータになる
+
+
+# 規模の目安（--size）
+SIZES: dict[str, tuple[int, int, int]] = {
+    "small": (5, 20, 10),         # 1,000 タスク
+    "medium": (20, 50, 20),       # 20,000 タスク
+    "large": (50, 100, 40),       # 200,000 タスク
+}
+
+
+def spec(size: str = "small", **overrides: object) -> WorkspaceSpec:
+    genres, missions, tasks = SIZES[size]
+    result: WorkspaceSpec = {
+        "genres": genres,
+        "missions": missions,
+        "tasks": tasks,
+        "due_spread": 60,
+        "due_ratio": 0.7,
+        "done_ratio": 0.3,
+        "seed": 0,
+        "base_date": "2025-01-01",
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            result[key] = value  # type: ignore[literal-required]
+    return result
+
+
+def task_count(s: WorkspaceSpec) -> int:
+    return s["genres"] * s["missions"] * s["tasks"]
+
+
+def generate(s: WorkspaceSpec) -> list[GenreDict]:
+    """指定の規模のジャンル・ミッション・タスクを作る（id も seed から決まる）"""
+    rng = random.Random(s["seed"])
+    base = date.fromisoformat(s["base_date"])
+    spread = s["due_spread"]
+
+    def new_id() -> str:
+        return f"{rng.getrandbits(128):032x}"
+
+    def due() -> str | None:
+        if rng.random() >= s["due_ratio"]:
+            return None
+        return (base + timedelta(days=rng.randint(-spread, spread))).isoformat()
+
+    def completed_at() -> str:
+        at = datetime.combine(base, datetime.min.time()) + timedelta(minutes=rng.randint(-spread * 1440, 0))
+        return at.strftime("%Y-%m-%d %H:%M")
+
+    genres: list[GenreDict] = []
+    for gi in range(s["genres"]):
+        missions: list[MissionDict] = []
+        for mi in range(s["missions"]):
+            tasks: list[TaskDict] = []
+            for ti in range(s["tasks"]):
+                done = rng.random() < s["done_ratio"]
+                tasks.append({
+                    "id": new_id(),
+                    "name": f"タスク {gi + 1}-{mi + 1}-{ti + 1}",
+                    "done": done,
+                    "completed_at": completed_at() if done else None,
+                    "due_date": due(),
+                })
+            complete = bool(tasks) and all(t["done"] for t in tasks)
+            missions.append({
+                "id": new_id(),
+                "name": f"ミッション {gi + 1}-{mi + 1}",
+                "tasks": tasks,
+                "due_date": due(),
+                "completed_at": completed_at() if complete else None,
+                "summary": f"ミッション {gi + 1}-{mi + 1} の概要" if mi % 3 == 0 else None,
+            })
+        genres.append({
+            "id": new_id(),
+            "name": f"ジャンル {gi + 1}",
+            "missions": missions,
+            "summary": None,
+        })
+    return genres
@@ -0,0 +1,170 @@
+"""
+ベンチマークの実行（python -m benchmarks）
+- run: 合成データでシナリオを実行し、結果を JSON で保存する
+- compare: 2つの結果の JSON を比べ、計測ごとの中央値の比を出す
+- generate: 合成データを JsonStorage 形式のファイルに書き出す（アプリで開いて確かめる用）
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Sequence
+from benchmarks.generate import SIZES, WorkspaceSpec, generate, spec, task_count
+from benchmarks.scenarios import SCENARIOS, Context
+from missionmanager import jsonstream
+
+
+def _spec_from_args(args: argparse.Namespace) -> WorkspaceSpec:
+    return spec(
+        args.size,
+        genres=args.genres,
+        missions=args.missions,
+        tasks=args.tasks,
+        due_spread=args.due_spread,
+        due_ratio=args.due_ratio,
+        done_ratio=args.done_ratio,
+        seed=args.seed,
+        base_date=args.base_date,
+    )
+
+
+def run(s: WorkspaceSpec, scenarios: Sequence[str], repeat: int) -> dict[str, Any]:
+    """シナリオを順に実行した結果（失敗したシナリオはエラー内容を記録して続ける）"""
+    started = time.perf_counter()
+    genres = generate(s)
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="missionmanager-bench-") as workdir:
+        ctx = Context(Path(workdir), genres, repeat)
+        for name in scenarios:
+            sys.stderr.write(f"{name} ...\n")
+            sub = Path(workdir) / name
+            sub.mkdir()
+            ctx.workdir = sub
+            try:
+                results[name] = SCENARIOS[name](ctx)
+            except ImportError as e:
+                # 描画シナリオは PySide6 がない環境では飛ばす
+                results[name] = {"skipped": str(e)}
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spec": s,
+            "task_count": task_count(s),
+            "repeat": repeat,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        },
+        "results": results,
+    }
+
+
+def _flatten(report: dict[str, Any]) -> dict[str, float]:
+    """"シナリオ.計測" -> 中央値（ms）"""
+    flat: dict[str, float] = {}
+    for scenario, timings in report.get("results", {}).items():
+        for name, timing in timings.items():
+            if isinstance(timing, dict) and "median_ms" in timing:
+                flat[f"{scenario}.{name}"] = timing["median_ms"]
+    return flat
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], threshold: float) -> tuple[list[str], bool]:
+    """比較表の行と、threshold 倍より遅くなった計測があるか"""
+    before, after = _flatten(old), _flatten(new)
+    lines = [f"{'measurement':<32} {'old ms':>10} {'new ms':>10} {'ratio':>7}"]
+    regressed = False
+    for name in sorted(before.keys() | after.keys()):
+        a, b = before.get(name), after.get(name)
+        if a is None or b is None:
+            lines.append(f"{name:<32} {'-' if a is None else f'{a:.3f}':>10} {'-' if b is None else f'{b:.3f}':>10}")
+            continue
+        ratio = b / a if a > 0 else float("inf")
+        mark = ""
+        if ratio > threshold:
+            mark = "  slower"
+            regressed = True
+        lines.append(f"{name:<32} {a:>10.3f} {b:>10.3f} {ratio:>6.2f}x{mark}")
+    if old.get("meta", {}).get("spec") != new.get("meta", {}).get("spec"):
+        lines.append("注意: データの規模（spec）が異なります")
+    return lines, regressed
+
+
+def _format(report: dict[str, Any]) -> str:
+    lines = [f"tasks: {report['meta']['task_count']}  repeat: {report['meta']['repeat']}"]
+    for scenario, timings in report["results"].items():
+        for name, timing in timings.items():
+            if isinstance(timing, dict) and "median_ms" in timing:
+                lines.append(f"  {scenario + '.' + name:<32} median {timing['median_ms']:>10.3f} ms"
+                             f"  (min {timing['min_ms']:.3f})")
+            elif isinstance(timing, dict) and "bytes" in timing:
+                lines.append(f"  {scenario + '.' + name:<32} {timing['bytes'] / 2**20:>10.1f} MiB"
+                             f"  ({timing['bytes_per_task']:.0f} bytes/task)")
+            elif name in ("skipped", "error"):
+                lines.append(f"  {scenario:<32} {name}: {timing}")
+    return "\n".join(lines) + "\n"
+
+
+def _add_spec_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--size", choices=sorted(SIZES), default="small",
+                   help="規模の目安（ジャンル×ミッション×タスク）。個別の指定で上書きできる")
+    p.add_argument("--genres", type=int, help="ジャンル数")
+    p.add_argument("--missions", type=int, help="ジャンルあたりのミッション数")
+    p.add_argument("--tasks", type=int, help="ミッションあたりのタスク数")
+    p.add_argument("--due-spread", type=int, help="期限を基準日の前後何日に散らすか（既定 60）")
+    p.add_argument("--due-ratio", type=float, help="期限を設定する割合（既定 0.7）")
+    p.add_argument("--done-ratio", type=float, help="完了済みタスクの割合（既定 0.3）")
+    p.add_argument("--seed", type=int, help="乱数の種（既定 0）")
+    p.add_argument("--base-date", help="期限の基準日 YYYY-MM-DD（既定 2025-01-01）")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="MissionManager のベンチマーク")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="シナリオを実行して結果を JSON で保存する")
+    _add_spec_arguments(p)
+    p.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                   help="実行するシナリオ（複数指定可。既定は全て）")
+    p.add_argument("--repeat", type=int, default=5, help="各計測の繰り返し回数（既定 5）")
+    p.add_argument("-o", "--output", help="結果の保存先（既定 bench-<日時>.json）")
+
+    p = sub.add_parser("compare", help="2つの結果を比べる（遅くなった計測があれば終了コード 1）")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=1.2, help="この倍率より遅ければ回帰とみなす（既定 1.2）")
+
+    p = sub.add_parser("generate", help="合成データを JSON ファイルに書き出す")
+    _add_spec_arguments(p)
+    p.add_argument("path")
+    p.add_argument("--pretty", action="store_true", help="インデント付きで書く")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        report = run(_spec_from_args(args), args.scenario or list(SCENARIOS), args.repeat)
+        output = Path(args.output or f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        sys.stdout.write(_format(report))
+        sys.stdout.write(f"結果: {output}\n")
+        return 0
+    if args.command == "compare":
+        old = json.loads(Path(args.old).read_text(encoding="utf-8"))
+        new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+        lines, regressed = compare(old, new, args.threshold)
+        sys.stdout.write("\n".join(lines) + "\n")
+        return 1 if regressed else 0
+    s = _spec_from_args(args)
+    jsonstream.write_file(Path(args.path), generate(s), args.pretty)
+    sys.stdout.write(f"{task_count(s)} タスクを書き出しました: {args.path}\n")
+    return 0
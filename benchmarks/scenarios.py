@@ -0,0 +1,308 @@
+"""
+ベンチマークの各シナリオ。
+それぞれ作業ディレクトリと合成データを受け取り、計測名 -> Timing を返す。
+ストレージは作業ディレクトリ内に作り、利用者の data/ には書かない。
+"""
+from __future__ import annotations
+import copy
+import gc
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Optional, TypedDict
+from missionmanager import models
+from missionmanager.app import AppService
+from missionmanager.models import GenreDict
+from missionmanager.storage import JournalStorage, JsonStorage, StorageProtocol
+
+
+class Timing(TypedDict):
+    runs: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+
+
+class Memory(TypedDict):
+    bytes: int             # 読み込んだデータと AppService の索引が使うメモリ（tracemalloc で計測）
+    bytes_per_task: float
+
+
+class Context:
+    """シナリオに渡す共通の入力"""
+
+    def __init__(self, workdir: Path, genres: list[GenreDict], repeat: int) -> None:
+        self.workdir = workdir
+        self.genres = genres
+        self.repeat = repeat
+
+    def fresh_genres(self) -> list[GenreDict]:
+        """シナリオ内で書き換えてよいデータ（元データは共有のまま残す）"""
+        return copy.deepcopy(self.genres)
+
+
+class MemoryStorage:
+    """ファイルに書かないストレージ（読み込みのたびに load() の結果を返し、保存は何もしない）"""
+
+    def __init__(self, load: Callable[[], list[GenreDict]]) -> None:
+        self._load = load
+
+    def load_genres(self) -> list[GenreDict]:
+        return self._load()
+
+    def save_genres(self, genres: list[GenreDict]) -> None:
+        pass
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Timing:
+    """fn を repeat 回実行した時間（setup は各回の前に呼び、時間に含めない）"""
+    times: list[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "runs": len(times),
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+    }
+
+
+# ---------- ストレージ ----------
+def _storage_factories(workdir: Path) -> dict[str, Callable[[], StorageProtocol]]:
+    """種類名 -> 作業ディレクトリ内のストレージを開く関数"""
+    missing = workdir / "none.json"   # 既存データの取り込み元（存在しないパス）
+
+    def sqlite() -> StorageProtocol:
+        from missionmanager.sqlite_storage import SqliteStorage
+        return SqliteStorage(workdir / "bench.sqlite3", import_json=missing)
+
+    def sharded() -> StorageProtocol:
+        from missionmanager.sharded_storage import ShardedJsonStorage
+        return ShardedJsonStorage(workdir / "shards", import_json=missing)
+
+    return {
+        "json": lambda: JsonStorage(workdir / "bench.json"),
+        "journal": lambda: JournalStorage(workdir / "journal.json"),
+        "sqlite": sqlite,
+        "sharded": sharded,
+    }
+
+
+def _close(storage: StorageProtocol) -> None:
+    close = getattr(storage, "close", None)
+    if close is not None:
+        close()
+
+
+def scenario_save(ctx: Context) -> dict[str, Timing]:
+    """全体の保存（save_genres）"""
+    results: dict[str, Timing] = {}
+    for kind, make in _storage_factories(ctx.workdir).items():
+        storage = make()
+        results[kind] = measure(lambda: storage.save_genres(ctx.genres), ctx.repeat)
+        _close(storage)
+    return results
+
+
+def scenario_load(ctx: Context) -> dict[str, Timing]:
+    """保存済みデータの読み込み（ストレージを開き直して load_genres）"""
+    results: dict[str, Timing] = {}
+    for kind, make in _storage_factories(ctx.workdir).items():
+        storage = make()
+        storage.save_genres(ctx.genres)
+        _close(storage)
+
+        def load() -> None:
+            s = make()
+            s.load_genres()
+            _close(s)
+        results[kind] = measure(load, ctx.repeat)
+    return results
+
+
+def scenario_toggle_save(ctx: Context) -> dict[str, Timing]:
+    """タスク1件の完了切替と、その保存（同期保存。増分保存できるストレージは差分だけ書く）"""
+    results: dict[str, Timing] = {}
+    for kind, make in _storage_factories(ctx.workdir).items():
+        storage = make()
+        storage.save_genres(ctx.genres)
+        service = AppService(storage)
+        pairs = [(m, t) for g in service.genres for m in g.get("missions", []) for t in m["tasks"]]
+        if not pairs:
+            _close(storage)
+            continue
+        step = max(1, len(pairs) // max(1, ctx.repeat))
+        cursor = iter(range(0, len(pairs) * ctx.repeat, step))
+
+        def toggle() -> None:
+            m, t = pairs[next(cursor) % len(pairs)]
+            service.toggle_task_done(m, t, not t["done"])
+        results[kind] = measure(toggle, ctx.repeat)
+        service.close()
+        _close(storage)
+    return results
+
+
+# ---------- 並べ替え ----------
+def scenario_sort(ctx: Context) -> dict[str, Timing]:
+    """
+    期限順の並べ替え：models の並び替えキーで全ジャンルを毎回ソートする場合と、
+    AppService の索引（作成時に一度だけ整列し、以後は範囲指定で取り出す）の場合
+    """
+    genres = ctx.genres
+    today = models.today_ordinal()
+
+    def sort_with_keys() -> None:
+        for g in genres:
+            missions = g.get("missions", [])
+            sorted(range(len(missions)), key=lambda i: models.mission_sort_key(missions[i], i, today=today))
+            for m in missions:
+                tasks = m["tasks"]
+                sorted(range(len(tasks)), key=lambda i: models.task_sort_key(tasks[i], i, today=today))
+
+    service = AppService(MemoryStorage(ctx.fresh_genres))
+
+    def sorted_from_index() -> None:
+        for g in service.genres:
+            for m in service.sorted_missions(g):
+                service.sorted_tasks(m)
+
+    return {
+        "mission_sort_key": measure(sort_with_keys, ctx.repeat),
+        "service_build": measure(lambda: AppService(MemoryStorage(ctx.fresh_genres)), ctx.repeat),
+        "service_sorted": measure(sorted_from_index, ctx.repeat),
+    }
+
+
+# ---------- 集計 ----------
+def scenario_analytics(ctx: Context) -> dict[str, Timing]:
+    """
+    完了履歴の集計：全タスクの列への写し、1件の変更後の写し直し（変わったジャンルだけ）、
+    列からの集計（NumPy があれば NumPy と標準ライブラリの両方）
+    """
+    from missionmanager import analytics
+
+    service = AppService(MemoryStorage(ctx.fresh_genres))
+    store = analytics.TaskStore(service)
+    cols = store.columns()
+    results: dict[str, Timing] = {"project": measure(lambda: analytics.project(service.genres), ctx.repeat)}
+    pairs = [(m, t) for g in service.genres for m in g.get("missions", []) for t in m["tasks"]]
+    if pairs:
+        cursor = iter(range(ctx.repeat))
+
+        def toggle() -> None:
+            m, t = pairs[next(cursor) * 7919 % len(pairs)]
+            service.toggle_task_done(m, t, not t["done"])
+        results["store_update"] = measure(store.columns, ctx.repeat, setup=toggle)
+    numpy = analytics._np
+    try:
+        if numpy is not None:
+            results["report_numpy"] = measure(lambda: analytics.report(cols), ctx.repeat)
+        analytics._np = None
+        results["report_array"] = measure(lambda: analytics.report(cols), ctx.repeat)
+    finally:
+        analytics._np = numpy
+    return results
+
+
+# ---------- メモリ ----------
+def scenario_memory(ctx: Context) -> dict[str, Memory]:
+    """AppService を作った後に残るメモリ：dict のままの場合と省メモリの表現（compact=True）の場合"""
+    tasks = max(1, sum(len(m["tasks"]) for g in ctx.genres for m in g.get("missions", [])))
+    # ストレージから読んだ時と同じく、文字列も要素ごとに別のオブジェクトになるよう JSON を経由する
+    text = json.dumps(ctx.genres, ensure_ascii=False)
+
+    results: dict[str, Memory] = {}
+    for name, compact in (("dict", False), ("compact", True)):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            service = AppService(MemoryStorage(lambda: json.loads(text)), compact=compact)
+            gc.collect()
+            used = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        del service
+        results[name] = {"bytes": used, "bytes_per_task": round(used / tasks, 1)}
+    return results
+
+
+# ---------- 描画（Qt offscreen） ----------
+def scenario_render(ctx: Context) -> dict[str, Timing]:
+    """
+    MainWindow の表示からカードを並べ終えるまで、ジャンルの切替、カードの展開。
+    画面のない環境でも動くよう QT_QPA_PLATFORM=offscreen を既定にする
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from missionmanager.ui.views import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+
+    service = AppService(MemoryStorage(ctx.fresh_genres))
+    windows: list[MainWindow] = []
+    populated = [False]
+
+    def on_populated() -> None:
+        populated[0] = True
+
+    def wait_populated() -> None:
+        while not populated[0]:
+            app.processEvents()
+
+    def open_window() -> None:
+        populated[0] = False
+        window = MainWindow(service)
+        window.populated.connect(on_populated)
+        window.show()
+        wait_populated()
+        windows.append(window)
+
+    def close_windows() -> None:
+        while windows:
+            windows.pop().deleteLater()
+        app.processEvents()
+
+    results: dict[str, Timing] = {"window": measure(open_window, ctx.repeat, setup=close_windows)}
+
+    window = windows[-1]
+    count = window.genre_combo.count()
+    if count > 1:
+        switches = iter(range(1, ctx.repeat * count + 1))
+
+        def switch_genre() -> None:
+            populated[0] = False
+            window.genre_combo.setCurrentIndex(next(switches) % count)
+            wait_populated()
+        results["genre_switch"] = measure(switch_genre, ctx.repeat)
+
+    def expand_cards() -> None:
+        for card in list(window._cards.values()):
+            card.reveal()
+        app.processEvents()
+
+    def collapse_cards() -> None:
+        populated[0] = False
+        window.genre_combo.setCurrentIndex((window.genre_combo.currentIndex() + 1) % count)
+        wait_populated()
+    results["expand_cards"] = measure(expand_cards, ctx.repeat, setup=collapse_cards if count > 1 else None)
+    close_windows()
+    return results
+
+
+SCENARIOS: dict[str, Callable[[Context], dict[str, Any]]] = {
+    "load": scenario_load,
+    "save": scenario_save,
+    "toggle_save": scenario_toggle_save,
+    "sort": scenario_sort,
+    "analytics": scenario_analytics,
+    "memory": scenario_memory,
+    "render": scenario_render,
+}
@@ -1,16 +1,58 @@
+import time
+_START = time.perf_counter()   # 起動時間の計測の起点（--startup-report）
+
 import sys
 from PySide6.QtWidgets import QApplication
-from missionmanager.storage import JsonStorage
+from missionmanager.storage import create_storage
 from missionmanager.app import AppService
 from missionmanager.ui.views import MainWindow
+from missionmanager.ui.startup import StartupReport, report_mode
+from missionmanager import compact, profiling
 
 
 def main() -> None:
-    app = QApplication(sys.argv)
-    storage = JsonStorage()
-    service = AppService(storage)
+    mode = report_mode(sys.argv)
+    report = StartupReport(_START, mode) if mode is not None else None
+    if report is not None:
+        report.mark("import")
+    # 計測（--profile）はサービス・ウィンドウを作る前に計測用の関数へ置き換えておく
+    profile_target = profiling.profile_target(sys.argv)
+    profiler = None
+    if profile_target is not None:
+        from missionmanager.ui import stats_panel
+        profiler = profiling.install()
+        stats_panel.install()
+    # 遅延の計測（--latency）は全イベントの処理時間を測る QApplication を使う
+    latency_ms = profiling.latency_threshold(sys.argv)
+    latency = None
+    if latency_ms is not None:
+        from missionmanager.ui.latency import LatencyApplication
+        latency = LatencyApplication(sys.argv, latency_ms)
+        app: QApplication = latency
+    else:
+        app = QApplication(sys.argv)
+    storage = create_storage()    # 環境変数 MISSIONMANAGER_STORAGE で切替（既定: json）
+    # 連続した変更はまとめてバックグラウンドで保存し、終了時に未保存分を書き込む
+    # ジャンル単位で読めるストレージ（sharded）では、表示したジャンルだけを読み込み、
+    # 読み込んだミッション・タスクが memory_budget 件を超えたら使っていないジャンルから手放す
+    # MISSIONMANAGER_COMPACT=1 ならミッション・タスクを省メモリの表現（compact.py）で持つ
+    service = AppService(storage, save_delay=0.5, memory_budget=200_000, compact=compact.enabled())
+    app.aboutToQuit.connect(service.close)
+    if profiler is not None:
+        # 終了時（未保存分の書き込み後）に結果を出力する
+        app.aboutToQuit.connect(lambda: profiler.dump(profile_target))
+    if report is not None:
+        report.mark("load")
 
+    # ウィンドウの枠を先に表示し、ミッションカードは表示後に少しずつ並べる
     window = MainWindow(service)
+    if report is not None:
+        report.mark("window")
+        report.watch(window)
+    if profiler is not None:
+        stats_panel.StatsPanel.attach(window, profiler)
+    if latency is not None:
+        latency.monitor.attach(window)
     window.show()
 
     sys.exit(app.exec())
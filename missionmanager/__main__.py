@@ -0,0 +1,5 @@
+"""python -m missionmanager でコマンドライン操作（GUI は main.py）"""
+import sys
+from missionmanager.cli import main
+
+sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+完了履歴の集計（統計表示・python -m missionmanager stats）
+タスクを列ごとの配列（array）に写し、日/週ごとの完了数・期限に対する遅れの分布・ジャンルごとの完了ペースを
+列単位の処理で求める。NumPy があれば配列をそのまま NumPy の配列として使い、なければ標準ライブラリの
+C 実装の処理（sorted / bisect / map / compress / Counter）で同じ結果を求める（要素ごとの Python のループなし）。
+"""
+from __future__ import annotations
+import functools
+import operator
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import date
+from itertools import compress
+from typing import TYPE_CHECKING, Any, Optional, Sequence, TypedDict
+from missionmanager.models import GenreDict, due_ordinal, today_ordinal
+
+if TYPE_CHECKING:
+    from missionmanager.app import AppService
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+def backend() -> str:
+    """集計に使う実装（"numpy" / "array"）"""
+    return "numpy" if _np is not None else "array"
+
+
+# 期限に対する完了日の差（完了日 - 期限、日数）の区分: (表示名, 下限。None は下限なし)
+LATENESS_BUCKETS: tuple[tuple[str, Optional[int]], ...] = (
+    ("7日以上前", None),
+    ("1〜6日前", -6),
+    ("当日", 0),
+    ("1〜3日遅れ", 1),
+    ("4〜7日遅れ", 4),
+    ("8〜30日遅れ", 8),
+    ("31日以上遅れ", 31),
+)
+
+
+class Lateness(TypedDict):
+    count: int                      # 期限と完了日のある完了済みタスクの数
+    on_time: int                    # そのうち期限当日までに完了した数
+    on_time_ratio: Optional[float]
+    mean_days: Optional[float]      # 平均の遅れ（日数。負は前倒し）
+    histogram: list[tuple[str, int]]
+
+
+class GenreVelocity(TypedDict):
+    genre_id: str
+    name: str
+    completed: int                  # 直近の期間に完了したタスク数
+    per_week: float
+    remaining: int                  # 未完了のタスク数
+    weeks_left: Optional[float]     # 今のペースで残りを終えるまでの週数（ペースが 0 なら None）
+
+
+class Report(TypedDict):
+    today: str
+    backend: str
+    tasks: int
+    done: int
+    unloaded_genres: int            # 遅延読み込みで集計に含まれていないジャンル数
+    daily: list[tuple[str, int]]    # 日付 -> 完了数
+    weekly: list[tuple[str, int]]   # 週の初日（月曜） -> 完了数
+    lateness: Lateness
+    velocity: list[GenreVelocity]
+    velocity_weeks: int
+
+
+# ---------- 列への写し ----------
+@functools.lru_cache(maxsize=4096)
+def _ordinal(day: str) -> int:
+    """"YYYY-MM-DD" の日付の序数（無効なら 0）"""
+    return due_ordinal(day) or 0
+
+
+def _day(text: Any) -> int:
+    """"YYYY-MM-DD" / "YYYY-MM-DD HH:MM" の日付の序数（無効・未設定は 0）"""
+    if not isinstance(text, str):
+        return 0
+    # 完了日時は分まで違うので、日付の部分だけをキャッシュのキーにする
+    return _ordinal(text[:10])
+
+
+class TaskColumns:
+    """
+    タスクを列ごとに持つ表（i 行目がそれぞれの列の i 番目）。
+    日付は序数で、未設定は 0。完了日は完了済みのタスクだけに入れる
+    """
+    __slots__ = ("genre", "done", "completed", "due", "genre_ids", "genre_names", "unloaded_genres")
+
+    def __init__(self) -> None:
+        self.genre = array("i")        # genre_ids の位置
+        self.done = array("b")
+        self.completed = array("q")
+        self.due = array("q")
+        self.genre_ids: list[str] = []
+        self.genre_names: list[str] = []
+        self.unloaded_genres = 0
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+
+def _project_genre(g: GenreDict) -> tuple[array, array, array]:
+    done, completed, due = array("b"), array("q"), array("q")
+    for m in g.get("missions", []):
+        for t in m.get("tasks", []):
+            is_done = bool(t.get("done", False))
+            done.append(is_done)
+            completed.append(_day(t.get("completed_at")) if is_done else 0)
+            due.append(_day(t.get("due_date")))
+    return done, completed, due
+
+
+def _assemble(genres: Sequence[GenreDict], parts: Sequence[tuple[array, array, array]]) -> TaskColumns:
+    cols = TaskColumns()
+    for gi, (g, (done, completed, due)) in enumerate(zip(genres, parts)):
+        cols.genre_ids.append(g.get("id", ""))
+        cols.genre_names.append(g.get("name", ""))
+        cols.genre.extend(array("i", [gi]) * len(done))
+        cols.done.extend(done)
+        cols.completed.extend(completed)
+        cols.due.extend(due)
+    return cols
+
+
+def project(genres: Sequence[GenreDict]) -> TaskColumns:
+    """ジャンルの並び（読み込み済みのもの）を列に写す"""
+    loaded = [g for g in genres if "missions" in g]
+    cols = _assemble(loaded, [_project_genre(g) for g in loaded])
+    cols.unloaded_genres = len(genres) - len(loaded)
+    return cols
+
+
+class TaskStore:
+    """
+    AppService のタスクの列。ジャンルの版数（子孫の変更で増える）を覚えておき、
+    変わったジャンルだけを写し直して残りは前回の列をつなぐ
+    """
+
+    def __init__(self, service: "AppService") -> None:
+        self.service = service
+        self._parts: dict[str, tuple[int, tuple[array, array, array]]] = {}
+
+    def columns(self) -> TaskColumns:
+        loaded = [g for g in self.service.genres if self.service.is_genre_loaded(g)]
+        parts: dict[str, tuple[int, tuple[array, array, array]]] = {}
+        for g in loaded:
+            version = self.service.version(g)
+            cached = self._parts.get(g["id"])
+            parts[g["id"]] = cached if cached is not None and cached[0] == version else (version, _project_genre(g))
+        # 削除・手放したジャンルの列は捨てる
+        self._parts = parts
+        cols = _assemble(loaded, [parts[g["id"]][1] for g in loaded])
+        cols.unloaded_genres = len(self.service.genres) - len(loaded)
+        return cols
+
+
+# ---------- 集計 ----------
+def week_start(ordinal: int) -> int:
+    """その日を含む週の月曜日の序数（序数 1 の 0001-01-01 は月曜日）"""
+    return ordinal - (ordinal - 1) % 7
+
+
+def throughput(cols: TaskColumns, unit: str = "day", periods: int = 30,
+               today: Optional[int] = None) -> list[tuple[int, int]]:
+    """
+    直近 periods 期間（unit: "day" / "week"）の完了数を古い順に (期間の初日の序数, 完了数) で返す。
+    完了のない期間も 0 件として含める
+    """
+    today = today_ordinal() if today is None else today
+    step = 7 if unit == "week" else 1
+    last = week_start(today) if unit == "week" else today
+    first = last - step * (periods - 1)
+    starts = [first + step * i for i in range(periods)]
+    end = last + step
+    if _np is not None:
+        c = _np.frombuffer(cols.completed, dtype=_np.int64)
+        recent = c[(c >= first) & (c < end)]
+        counts = _np.bincount((recent - first) // step, minlength=periods).tolist()
+    else:
+        days = sorted(compress(cols.completed, cols.completed))   # 完了日のあるものだけ（0 は偽）
+        counts = [bisect_left(days, s + step) - bisect_left(days, s) for s in starts]
+    return list(zip(starts, counts))
+
+
+def lateness(cols: TaskColumns) -> Lateness:
+    """期限と完了日のある完了済みタスクの、完了日 - 期限 の分布"""
+    if _np is not None:
+        c = _np.frombuffer(cols.completed, dtype=_np.int64)
+        d = _np.frombuffer(cols.due, dtype=_np.int64)
+        both = (c > 0) & (d > 0)
+        diffs = _np.sort(c[both] - d[both])
+        count = int(diffs.size)
+        total = int(diffs.sum())
+
+        def below(bound: int) -> int:
+            return int(_np.searchsorted(diffs, bound, side="left"))
+    else:
+        # 序数は正なので、両方設定されている（どちらも 0 でない）ことは小さい方が正であることと同じ
+        both = map(min, cols.completed, cols.due)
+        diffs_list = sorted(compress(map(operator.sub, cols.completed, cols.due), both))
+        count = len(diffs_list)
+        total = sum(diffs_list)
+
+        def below(bound: int) -> int:
+            return bisect_left(diffs_list, bound)
+    bounds = [below(lower) if lower is not None else 0 for _, lower in LATENESS_BUCKETS] + [count]
+    histogram = [(label, bounds[i + 1] - bounds[i]) for i, (label, _) in enumerate(LATENESS_BUCKETS)]
+    on_time = below(1)
+    return {
+        "count": count,
+        "on_time": on_time,
+        "on_time_ratio": round(on_time / count, 4) if count else None,
+        "mean_days": round(total / count, 2) if count else None,
+        "histogram": histogram,
+    }
+
+
+def velocity(cols: TaskColumns, weeks: int = 4, today: Optional[int] = None) -> list[GenreVelocity]:
+    """ジャンルごとの直近 weeks 週（今日を含む 7*weeks 日）の完了数・週あたりの完了数・未完了数"""
+    today = today_ordinal() if today is None else today
+    first = today - 7 * weeks + 1
+    n = len(cols.genre_ids)
+    if _np is not None:
+        g = _np.frombuffer(cols.genre, dtype=_np.int32)
+        c = _np.frombuffer(cols.completed, dtype=_np.int64)
+        done = _np.frombuffer(cols.done, dtype=_np.int8)
+        completed = _np.bincount(g[(c >= first) & (c <= today)], minlength=n).tolist()
+        remaining = _np.bincount(g[done == 0], minlength=n).tolist()
+    else:
+        recent = Counter(compress(cols.genre, map(range(first, today + 1).__contains__, cols.completed)))
+        pending = Counter(compress(cols.genre, map(operator.not_, cols.done)))
+        completed = [recent[i] for i in range(n)]
+        remaining = [pending[i] for i in range(n)]
+    result: list[GenreVelocity] = []
+    for i in range(n):
+        per_week = completed[i] / weeks if weeks else 0.0
+        result.append({
+            "genre_id": cols.genre_ids[i],
+            "name": cols.genre_names[i],
+            "completed": completed[i],
+            "per_week": round(per_week, 2),
+            "remaining": remaining[i],
+            "weeks_left": round(remaining[i] / per_week, 1) if per_week else None,
+        })
+    return result
+
+
+def report(cols: TaskColumns, today: Optional[int] = None, days: int = 30, weeks: int = 12,
+           velocity_weeks: int = 4) -> Report:
+    """統計表示・コマンドライン用にまとめた集計結果（日付は YYYY-MM-DD）"""
+    today = today_ordinal() if today is None else today
+
+    def iso(ordinal: int) -> str:
+        return date.fromordinal(ordinal).isoformat()
+    return {
+        "today": iso(today),
+        "backend": backend(),
+        "tasks": len(cols),
+        "done": sum(cols.done),
+        "unloaded_genres": cols.unloaded_genres,
+        "daily": [(iso(s), n) for s, n in throughput(cols, "day", days, today)],
+        "weekly": [(iso(s), n) for s, n in throughput(cols, "week", weeks, today)],
+        "lateness": lateness(cols),
+        "velocity": velocity(cols, velocity_weeks, today),
+        "velocity_weeks": velocity_weeks,
+    }
@@ -1,28 +1,594 @@
 from __future__ import annotations
-from typing import List, Optional
+import copy
+import functools
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
 from datetime import datetime
-from missionmanager.models import GenreDict, MissionDict, TaskDict, new_genre, new_mission, new_task, mission_progress
-from missionmanager.storage import StorageProtocol
+from missionmanager.models import (
+    GenreDict, MissionDict, TaskDict, new_genre, new_mission, new_task, ensure_ids, due_ordinal, days_until,
+)
+from missionmanager.storage import Change, StorageError, StorageProtocol
+from missionmanager.saver import SaveScheduler
+from missionmanager.ordering import OrderedIndex
+from missionmanager import compact as cp
+from missionmanager import events as ev
+from missionmanager.events import Event, EventBus
+
+F = TypeVar("F", bound=Callable[..., Any])
+Entity = Any  # GenreDict | MissionDict | TaskDict
+
+# 階層ごとの子リストのキー（0: ジャンル, 1: ミッション, 2: タスク）
+_CHILD_KEYS = ("missions", "tasks", None)
+# 並び順キーで期限未設定を後ろへ回すための序数（どの日付よりも大きい）
+_NO_DUE_ORDINAL = 10**9
 
 
 def now_str() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M")
 
 
+class _IndexEntry:
+    """id 索引の要素: エンティティ本体・親（ジャンルは None）・兄弟内の位置・手動順序の通し番号"""
+    __slots__ = ("entity", "parent", "pos", "level", "seq")
+
+    def __init__(self, entity: Entity, parent: Optional[Entity], pos: int, level: int) -> None:
+        self.entity = entity
+        self.parent = parent
+        self.pos = pos
+        self.level = level
+        self.seq = 0
+
+
+class _Batch:
+    """バッチ中に溜める変更レコード・イベントと、巻き戻し用のジャンルのスナップショット"""
+
+    def __init__(self, genres: List[GenreDict]) -> None:
+        self.genres = list(genres)                      # 開始時のジャンルの並び
+        self.snapshots: dict[str, list[tuple[Any, dict[str, Any]]]] = {}   # ジャンル id -> (要素, 元の内容)
+        self.changes: list[Change] = []
+        self.events: list[Event] = []
+        self.sync: dict[str, MissionDict] = {}         # completed_at を同期するミッション
+
+
+def _shallow(entity: Any, child_key: Optional[str]) -> dict[str, Any]:
+    copied = dict(entity)
+    if child_key is not None and child_key in copied:
+        copied[child_key] = list(copied[child_key])
+    return copied
+
+
+def _snapshot_genre(g: GenreDict) -> list[tuple[Any, dict[str, Any]]]:
+    """ジャンル配下の要素ごとに元の内容を浅くコピー（復元時も dict の同一性を保つ）"""
+    items: list[tuple[Any, dict[str, Any]]] = [(g, _shallow(g, "missions"))]
+    for m in g.get("missions", []):
+        items.append((m, _shallow(m, "tasks")))
+        items.extend((t, _shallow(t, None)) for t in m.get("tasks", []))
+    return items
+
+
+def _mutation(method: F) -> F:
+    """データを変更するメソッド: 保存スレッドと競合しないようデータロックを保持して実行"""
+    @functools.wraps(method)
+    def wrapper(self: "AppService", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+    wrapper.is_mutation = True  # type: ignore[attr-defined]   # 計測（profiling）で変更メソッドを見分ける
+    return wrapper  # type: ignore[return-value]
+
+
 class AppService:
     # UIに依存しないビジネスロジック層
     # 全データは List[GenreDict] データオブジェクトで管理
-    # 変更時に必ず _save() を呼んで永続化
+    # 変更時に必ず _save() を呼んで永続化（変更レコードを渡す）
+    # 変更後は events に変更イベント（対象の id と変更された項目）を発行
 
-    def __init__(self, storage: StorageProtocol) -> None:
+    def __init__(self, storage: StorageProtocol, save_delay: Optional[float] = None,
+                 memory_budget: Optional[int] = None, compact: bool = False) -> None:
         # コンストラクタインジェクション
         self._storage = storage   
-        self.genres: List[GenreDict] = self._storage.load_genres()    # データオブジェクト読み込み
-
-
-    def _save(self) -> None:
-        # DIされた_storage.save_genres 経由で現在のデータオブジェクトを保存
-        self._storage.save_genres(self.genres)
+        # compact を指定するとミッション・タスクを省メモリの Task / Mission（compact.py）で持つ
+        self._compact = compact
+        # memory_budget を指定し、ストレージがジャンル単位の読み込みに対応していれば遅延読み込み：
+        # 起動時は見出し（名前・概要・未完了数）だけを読み、ミッション・タスクは初めて表示する時に読む。
+        # 読み込んだ要素数（ミッション + タスク）が memory_budget を超えたら、使っていないジャンルから手放す
+        self._lazy = memory_budget is not None and hasattr(storage, "load_genre_headers")
+        self._memory_budget = memory_budget
+        self._loaded: "OrderedDict[str, None]" = OrderedDict()   # 読み込み済みジャンル id（古い順）
+        self._unloaded_incomplete: dict[str, int] = {}          # 未読み込みジャンルの未完了ミッション数
+        if self._lazy:
+            # 未読み込みのジャンルは "missions" キーを持たない
+            headers = self._storage.load_genre_headers()  # type: ignore[attr-defined]
+            self.genres: List[GenreDict] = [
+                {"id": h["id"], "name": h["name"], "summary": h["summary"]} for h in headers  # type: ignore[typeddict-item]
+            ]
+            self._unloaded_incomplete = {h["id"]: h["incomplete"] for h in headers}
+        else:
+            self.genres = self._storage.load_genres()    # データオブジェクト読み込み
+            # 既存データに id がなければ付与して保存（一度だけの移行）
+            if ensure_ids(self.genres):
+                self._storage.save_genres(self.genres)
+            if compact:
+                for g in self.genres:
+                    cp.pack_genre(g)
+        # id -> (親, 位置) の索引。検索・移動・削除を値比較なしで行う
+        self._index: dict[str, _IndexEntry] = {}
+        # 集計値（索引と同時に差分更新）: ミッション id -> [完了数, 総数] / ジャンル id -> 未完了ミッション数
+        self._progress: dict[str, list[int]] = {}
+        self._incomplete: dict[str, int] = {}
+        # 期限の解析結果のキャッシュ: ミッション/タスク id -> 日付の序数（未設定は None）
+        self._due: dict[str, Optional[int]] = {}
+        # 表示順の索引: ジャンル id -> ミッションの並び / ミッション id -> タスクの並び
+        # キーは (完了済み, 期限の序数, 手動順序の通し番号)。変更時は1要素だけ位置を直す
+        self._order: dict[str, OrderedIndex] = {}
+        # 全ジャンル共通の期限の索引（期限一覧用）: 期限のある未完了のミッション・タスク
+        # キーは (期限の序数, 階層, 通し番号)。期限・完了状態の変更、追加・削除のたびに1要素だけ直す
+        self._agenda = OrderedIndex()
+        # 表示の差分更新用の版数: 要素自身か子孫が変わるたびに増える
+        self._version: dict[str, int] = {}
+        for gi, g in enumerate(self.genres):
+            self._index_subtree(g, None, gi, 0)
+        # save_delay を指定すると保存を遅延・集約してバックグラウンドで実行（None なら変更ごとに同期保存）
+        self._lock = threading.RLock()
+        self._saver: Optional[SaveScheduler] = (
+            SaveScheduler(self._write, self._lock, save_delay) if save_delay is not None else None
+        )
+        # 変更の通知（UI は該当する行・ラベルだけを更新する）
+        self.events = EventBus()
+        # batch() の実行中だけ設定される
+        self._batch: Optional[_Batch] = None
+
+
+    def _save(self, *changes: Change) -> None:
+        if self._batch is not None:
+            # バッチ中はコミット時にまとめて保存
+            self._batch.changes.extend(changes)
+            return
+        if self._saver is not None:
+            self._saver.mark_dirty(list(changes))
+        else:
+            self._write(list(changes))
+
+    def _write(self, changes: list[Change]) -> None:
+        # 変更レコード単位で保存できるストレージ（apply_changes を持つ）には差分だけを渡す
+        # それ以外は DIされた_storage.save_genres 経由で現在のデータオブジェクト全体を保存
+        apply_changes = getattr(self._storage, "apply_changes", None)
+        if apply_changes is not None and changes:
+            apply_changes(changes, self.genres)
+        else:
+            self._storage.save_genres(self.genres)
+
+    @property
+    def dirty(self) -> bool:
+        """未保存の変更があるか"""
+        return self._saver is not None and self._saver.dirty
+
+    def flush(self) -> None:
+        """未保存の変更を書き込み、永続化が完了するまで待つ"""
+        if self._saver is not None:
+            self._saver.flush()
+
+    def close(self) -> None:
+        """未保存の変更を書き込み、保存スレッドを停止する（終了時に呼ぶ）"""
+        if self._saver is not None:
+            saver, self._saver = self._saver, None
+            saver.close()
+
+    # id 索引
+    def _index_subtree(self, entity: Entity, parent: Optional[Entity], pos: int, level: int) -> None:
+        entry = _IndexEntry(entity, parent, pos, level)
+        self._index[entity["id"]] = entry
+        if level == 0:
+            # 未読み込みのジャンルは見出しの未完了数を使う
+            self._incomplete[entity["id"]] = (
+                0 if "missions" in entity else self._unloaded_incomplete.get(entity["id"], 0)
+            )
+            self._order[entity["id"]] = OrderedIndex()
+        elif level == 1:
+            # タスクのないミッションは未完了として数える
+            self._progress[entity["id"]] = [0, 0]
+            self._incomplete[parent["id"]] += 1
+            self._due[entity["id"]] = due_ordinal(entity.get("due_date"))
+            self._order[entity["id"]] = OrderedIndex()
+            self._enter_order(entry)
+        else:
+            self._due[entity["id"]] = due_ordinal(entity.get("due_date"))
+            self._enter_order(entry)
+            self._adjust_progress(parent, 1 if entity.get("done", False) else 0, 1)
+        child_key = _CHILD_KEYS[level]
+        if child_key is not None:
+            for i, child in enumerate(entity.get(child_key, [])):
+                self._index_subtree(child, entity, i, level + 1)
+
+    def _unindex_subtree(self, entity: Entity, level: int, detach: bool = True) -> None:
+        """索引から外す。削除の起点（detach=True）だけ親の集計値と並び順から差し引く"""
+        eid = entity["id"]
+        entry = self._index.pop(eid)
+        if detach and entry.parent is not None:
+            self._order[entry.parent["id"]].remove(eid)
+            if level == 1:
+                if not self._complete(eid):
+                    self._incomplete[entry.parent["id"]] -= 1
+            else:
+                self._adjust_progress(entry.parent, -1 if entity.get("done", False) else 0, -1)
+        child_key = _CHILD_KEYS[level]
+        if child_key is not None:
+            for child in entity.get(child_key, []):
+                self._unindex_subtree(child, level + 1, detach=False)
+        self._incomplete.pop(eid, None)
+        self._progress.pop(eid, None)
+        self._due.pop(eid, None)
+        self._order.pop(eid, None)
+        self._version.pop(eid, None)
+        if eid in self._agenda:
+            self._agenda.remove(eid)
+
+    def _complete(self, mission_id: str) -> bool:
+        done, total = self._progress[mission_id]
+        return total > 0 and done >= total
+
+    def _adjust_progress(self, m: MissionDict, d_done: int, d_total: int) -> None:
+        """ミッションの完了数・総数を差分更新し、完了状態が変わればジャンルの未完了数と並び順も更新"""
+        was_complete = self._complete(m["id"])
+        counts = self._progress[m["id"]]
+        counts[0] += d_done
+        counts[1] += d_total
+        is_complete = self._complete(m["id"])
+        if was_complete != is_complete:
+            genre = self._index[m["id"]].parent
+            self._incomplete[genre["id"]] += 1 if was_complete else -1
+            self._reorder(m)
+
+    def _order_key(self, entry: _IndexEntry) -> tuple[int, int, int]:
+        eid = entry.entity["id"]
+        if entry.level == 1:
+            completed = 1 if self._complete(eid) else 0
+        else:
+            completed = 1 if entry.entity.get("done", False) else 0
+        due = self._due[eid]
+        return (completed, _NO_DUE_ORDINAL if due is None else due, entry.seq)
+
+    def _enter_order(self, entry: _IndexEntry) -> None:
+        """親の並びに追加（手動順序の末尾の通し番号を採番）"""
+        order = self._order[entry.parent["id"]]
+        entry.seq = order.next_seq
+        order.next_seq += 1
+        order.insert(entry.entity["id"], self._order_key(entry))
+        self._update_agenda(entry)
+
+    def _reorder(self, entity: Entity) -> None:
+        """キーが変わった1要素だけ並びの位置を直す"""
+        entry = self._index[entity["id"]]
+        self._order[entry.parent["id"]].update(entity["id"], self._order_key(entry))
+        self._update_agenda(entry)
+
+    def _update_agenda(self, entry: _IndexEntry) -> None:
+        """期限の索引に載せるか（期限があって未完了）を判定し、載せる場合は期限の位置へ置く"""
+        eid = entry.entity["id"]
+        due = self._due[eid]
+        if entry.level == 1:
+            pending = not self._complete(eid)
+        else:
+            pending = not entry.entity.get("done", False)
+        old = self._agenda.key_of(eid)
+        if due is None or not pending:
+            if old is not None:
+                self._agenda.remove(eid)
+            return
+        if old is not None:
+            if old[0] == due:
+                return
+            self._agenda.remove(eid)
+        self._agenda.insert(eid, (due, entry.level, self._agenda.next_seq))
+        self._agenda.next_seq += 1
+
+    def _touch(self, entity: Entity) -> None:
+        """要素とその祖先の版数を進める"""
+        entry: Optional[_IndexEntry] = self._index[entity["id"]]
+        while entry is not None:
+            eid = entry.entity["id"]
+            self._version[eid] = self._version.get(eid, 0) + 1
+            entry = self._index[entry.parent["id"]] if entry.parent is not None else None
+
+    def version(self, entity: Entity) -> int:
+        """要素の版数。UI は描画時の値と比べて変更の有無を判定する"""
+        return self._version.get(entity["id"], 0)
+
+    def _renumber(self, siblings: list[Any], start: int) -> None:
+        """削除位置以降の兄弟の位置を詰め直す（整数の更新のみ）"""
+        for i in range(start, len(siblings)):
+            self._index[siblings[i]["id"]].pos = i
+
+    def _swap(self, siblings: list[Any], i: int, j: int) -> None:
+        siblings[i], siblings[j] = siblings[j], siblings[i]
+        a = self._index[siblings[i]["id"]]
+        b = self._index[siblings[j]["id"]]
+        a.pos, b.pos = i, j
+        if a.parent is not None:
+            # 手動順序の通し番号を入れ替えて並びを直す（キーが一時的に重複しないよう両方外してから戻す）
+            order = self._order[a.parent["id"]]
+            order.remove(a.entity["id"])
+            order.remove(b.entity["id"])
+            a.seq, b.seq = b.seq, a.seq
+            order.insert(a.entity["id"], self._order_key(a))
+            order.insert(b.entity["id"], self._order_key(b))
+
+    def _entry(self, entity: Entity, label: str) -> _IndexEntry:
+        entry = self._index.get(entity.get("id")) if isinstance(entity, Mapping) else None
+        if entry is None or entry.entity is not entity:
+            raise ValueError(f"指定された{label}が見つかりません")
+        return entry
+
+    def _child_entry(self, parent: Entity, entity: Entity, label: str) -> _IndexEntry:
+        entry = self._entry(entity, label)
+        if entry.parent is not parent:
+            raise ValueError(f"指定された{label}が見つかりません")
+        return entry
+
+    def _path(self, entity: Entity) -> list[int]:
+        """genres からのインデックス列（変更レコード用）"""
+        entry = self._index[entity["id"]]
+        path = [entry.pos]
+        while entry.parent is not None:
+            entry = self._index[entry.parent["id"]]
+            path.append(entry.pos)
+        path.reverse()
+        return path
+
+    def find_by_id(self, entity_id: str) -> Optional[Entity]:
+        """id からジャンル・ミッション・タスクを取得（見つからなければ None）"""
+        entry = self._index.get(entity_id)
+        return entry.entity if entry is not None else None
+
+    def parent_of(self, entity: Entity) -> Optional[Entity]:
+        """ミッションならジャンル、タスクならミッションを返す（ジャンルは None）"""
+        return self._entry(entity, "要素").parent
+
+    # 表示順（再ソートなし）
+    def sorted_missions(self, g: GenreDict, start: int = 0, stop: Optional[int] = None) -> List[MissionDict]:
+        """未完了かつ期限が近い順のミッション（表示順の start〜stop の範囲、再ソートなし）"""
+        self._entry(g, "ジャンル")
+        self.load_genre(g)
+        return [self._index[i].entity for i in self._order[g["id"]].ids(start, stop)]
+
+    def sorted_tasks(self, m: MissionDict, start: int = 0, stop: Optional[int] = None) -> List[TaskDict]:
+        """未完了かつ期限が近い順のタスク（表示順の start〜stop の範囲、再ソートなし）"""
+        self._entry(m, "ミッション")
+        return [self._index[i].entity for i in self._order[m["id"]].ids(start, stop)]
+
+    def sorted_at(self, parent: Entity, pos: int) -> Optional[Entity]:
+        """
+        表示順で pos 番目の子（範囲外・未知の親は None）。
+        一覧の行の描画から1行ごとに呼ばれるので、要素の検証・遅延読み込み・ロックを行わない
+        （ジャンルは表示を切り替える時に load_genre しておく）
+        """
+        order = self._order.get(parent.get("id"))
+        if order is None or not 0 <= pos < len(order):
+            return None
+        return self._index[order.ids(pos, pos + 1)[0]].entity
+
+    def sorted_position(self, entity: Entity) -> int:
+        """ミッション/タスクの表示順での位置（ジャンルはリスト上の位置）"""
+        entry = self._entry(entity, "要素")
+        if entry.parent is None:
+            return entry.pos
+        return self._order[entry.parent["id"]].position(entity["id"])
+
+    # 集計値（O(1)）
+    def mission_counts(self, m: MissionDict) -> tuple[int, int]:
+        """(完了タスク数, タスク総数)"""
+        self._entry(m, "ミッション")
+        done, total = self._progress[m["id"]]
+        return done, total
+
+    def mission_progress(self, m: MissionDict) -> float:
+        done, total = self.mission_counts(m)
+        return done / total if total else 0.0
+
+    def is_mission_complete(self, m: MissionDict) -> bool:
+        self._entry(m, "ミッション")
+        return self._complete(m["id"])
+
+    def count_incomplete_missions(self, g: GenreDict) -> int:
+        """ジャンル内の未完了ミッション数（mission_progress < 1.0 のもの）"""
+        self._entry(g, "ジャンル")
+        return self._incomplete[g["id"]]
+
+    # ソートキー（期限はキャッシュ済みの序数、today は呼び出し側で1回だけ取得した models.today_ordinal()）
+    def due_ordinal(self, entity: Entity) -> Optional[int]:
+        """ミッション/タスクの期限（日付の序数、未設定は None）"""
+        self._entry(entity, "要素")
+        return self._due.get(entity["id"])
+
+    # 期限一覧（全ジャンル共通の期限の索引。読み込み済みのジャンルのみ）
+    def agenda_count(self, until: Optional[int] = None) -> int:
+        """期限のある未完了のミッション・タスクの数（until を指定するとその日付の序数以前のもの）"""
+        if until is None:
+            return len(self._agenda)
+        return self._agenda.bisect((until + 1,))
+
+    def agenda(self, start: int = 0, stop: Optional[int] = None) -> List[Entity]:
+        """期限のある未完了のミッション・タスクを期限の近い順に（同じ期限ではミッションが先）"""
+        return [self._index[eid].entity for eid in self._agenda.ids(start, stop)]
+
+    def mission_sort_key(self, m: MissionDict, idx: int, today: int) -> tuple[int, int, int]:
+        """(完了済み, 日数, 元インデックス)。models.mission_sort_key と同じ順序"""
+        completed = 1 if self.is_mission_complete(m) else 0
+        return (completed, days_until(self._due[m["id"]], today), idx)
+
+    def task_sort_key(self, t: TaskDict, idx: int, today: int) -> tuple[int, int, int]:
+        """(完了済み, 日数, 元インデックス)。models.task_sort_key と同じ順序"""
+        done = 1 if t.get("done", False) else 0
+        return (done, days_until(self._due[t["id"]], today), idx)
+
+    # 変更レコードの生成
+    @staticmethod
+    def _updated(path: list[int], entity: Any, *keys: str) -> Change:
+        return {"op": "update", "path": path, "value": {k: entity.get(k) for k in keys}}
+
+    # 変更イベント
+    def _event(self, kind: str, entity: Entity, fields: Optional[dict[str, Any]] = None) -> Event:
+        """索引に載っている要素のイベントを作る（削除は索引から外す前に作ること）"""
+        entry = self._index[entity["id"]]
+        genre = entry
+        while genre.parent is not None:
+            genre = self._index[genre.parent["id"]]
+        return {
+            "kind": kind,
+            "id": entity["id"],
+            "parent_id": entry.parent["id"] if entry.parent is not None else None,
+            "genre_id": genre.entity["id"],
+            "fields": fields if fields is not None else {},
+        }
+
+    def _fields_event(self, kind: str, entity: Entity, *keys: str) -> Event:
+        return self._event(kind, entity, {k: entity.get(k) for k in keys})
+
+    def _publish(self, *events: Event) -> None:
+        if self._batch is not None:
+            self._batch.events.extend(events)
+            return
+        for event in events:
+            self.events.publish(event)
+
+    # バッチ（トランザクション）
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        複数の変更をまとめて1回で反映する：
+        - 保存と変更イベントの発行はコミット時に1回だけ
+        - ミッションの completed_at の同期は対象ミッションごとにコミット時に1回だけ
+        - 例外が出たらメモリ上のデータを開始時の状態に戻す（保存もイベントも行わない）
+        入れ子のバッチは一番外側にまとめられる。
+        """
+        with self._lock:
+            if self._batch is not None:
+                yield
+                return
+            self._batch = b = _Batch(self.genres)
+            try:
+                yield
+            except BaseException:
+                self._batch = None
+                self._rollback(b)
+                raise
+            self._batch = None
+            self._commit(b)
+
+    def _will_change(self, *entities: Entity) -> None:
+        """バッチ中なら、要素が属するジャンルを初回の変更前にスナップショットする"""
+        b = self._batch
+        if b is None:
+            return
+        for entity in entities:
+            entry = self._index[entity["id"]]
+            while entry.parent is not None:
+                entry = self._index[entry.parent["id"]]
+            if entry.entity["id"] not in b.snapshots:
+                b.snapshots[entry.entity["id"]] = _snapshot_genre(entry.entity)
+
+    def _commit(self, b: _Batch) -> None:
+        changes = b.changes
+        events = b.events
+        for m in b.sync.values():
+            entry = self._index.get(m["id"])
+            if entry is None or entry.entity is not m:
+                continue   # バッチ中に削除された
+            before = m.get("completed_at")
+            self._sync_mission_completion(m)
+            if m.get("completed_at") != before:
+                changes.append(self._updated(self._path(m), m, "completed_at"))
+                events.append(self._fields_event(ev.MISSION_UPDATED, m, "completed_at"))
+        if changes:
+            self._save(*changes)
+        self._publish(*events)
+
+    def _rollback(self, b: _Batch) -> None:
+        for items in b.snapshots.values():
+            for entity, original in items:
+                entity.clear()
+                entity.update(original)
+        self.genres[:] = b.genres
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """索引・集計値・並び順を作り直す（版数は進めて UI に再描画させる）"""
+        versions = self._version
+        self._index = {}
+        self._progress = {}
+        self._incomplete = {}
+        self._due = {}
+        self._order = {}
+        self._agenda = OrderedIndex()
+        self._version = {}
+        for gi, g in enumerate(self.genres):
+            self._index_subtree(g, None, gi, 0)
+        self._version = {eid: versions.get(eid, 0) + 1 for eid in self._index}
+        if self._lazy:
+            loaded = [gid for gid in self._loaded if gid in self._index and "missions" in self._index[gid].entity]
+            loaded += [g["id"] for g in self.genres if "missions" in g and g["id"] not in self._loaded]
+            self._loaded = OrderedDict.fromkeys(loaded)
+
+    # 遅延読み込み
+    def is_genre_loaded(self, g: GenreDict) -> bool:
+        return "missions" in g
+
+    @_mutation
+    def load_genre(self, g: GenreDict) -> None:
+        """ジャンルのミッション・タスクを読み込む（読み込み済みなら最近使ったものとして記録するだけ）"""
+        self._entry(g, "ジャンル")
+        gid = g["id"]
+        if "missions" in g:
+            if gid in self._loaded:
+                self._loaded.move_to_end(gid)
+            return
+        missions = self._storage.load_genre(gid).get("missions", [])  # type: ignore[attr-defined]
+        if self._compact:
+            missions = [cp.pack_mission(m) for m in missions]
+        g["missions"] = missions
+        self._incomplete[gid] = 0
+        for i, m in enumerate(missions):
+            self._index_subtree(m, g, i, 1)
+        self._loaded[gid] = None
+        self._touch(g)
+        # 読み込みは巻き戻しの対象ではないので、バッチ中でもすぐに通知する
+        self.events.publish(self._event(ev.GENRE_LOADED, g))
+        self._evict()
+
+    def _loaded_size(self, gid: str) -> int:
+        missions = self._index[gid].entity.get("missions", [])
+        return len(missions) + sum(self._progress[m["id"]][1] for m in missions)
+
+    def _evict(self) -> None:
+        """読み込んだ要素数が予算を超えていれば、最近使っていないジャンルから手放す（最後に使ったものは残す）"""
+        if not self._lazy or self._batch is not None or self._memory_budget is None:
+            return
+        sizes = {gid: self._loaded_size(gid) for gid in self._loaded}
+        total = sum(sizes.values())
+        if total <= self._memory_budget:
+            return
+        # 未保存の変更は手放す前に書き込む（書けなければ手放さない）
+        try:
+            self.flush()
+        except StorageError:
+            return
+        for gid in list(self._loaded)[:-1]:
+            if total <= self._memory_budget:
+                break
+            self._unload(self._index[gid].entity)
+            total -= sizes[gid]
+
+    def _unload(self, g: GenreDict) -> None:
+        gid = g["id"]
+        self._unloaded_incomplete[gid] = self._incomplete[gid]
+        for m in g["missions"]:
+            self._unindex_subtree(m, 1, detach=False)
+        self._order[gid] = OrderedIndex()
+        del g["missions"]  # type: ignore[misc]
+        del self._loaded[gid]
+        self._touch(g)
 
 
     # ジャンルの処理
@@ -30,162 +596,384 @@ class AppService:
     def list_genres(self) -> List[GenreDict]:
         return self.genres
 
+    @_mutation
     def add_genre(self, name: str, summary: Optional[str] = None) -> None:
-        self.genres.append(new_genre(name, summary))
-        self._save()
-
+        g = new_genre(name, summary)
+        self.genres.append(g)
+        self._index_subtree(g, None, len(self.genres) - 1, 0)
+        if self._lazy:
+            self._loaded[g["id"]] = None
+        self._save({"op": "insert", "path": [len(self.genres) - 1], "value": copy.deepcopy(g)})
+        self._publish(self._event(ev.GENRE_ADDED, g, copy.deepcopy(g)))
+
+    @_mutation
     def rename_genre(self, index: int, new_name: str) -> None:
         if index < 0 or index >= len(self.genres):
             raise IndexError(f"ジャンルインデックス {index} が範囲外です")
+        self.load_genre(self.genres[index])
+        self._will_change(self.genres[index])
         self.genres[index]["name"] = new_name
-        self._save()
+        self._touch(self.genres[index])
+        self._save(self._updated([index], self.genres[index], "name"))
+        self._publish(self._fields_event(ev.GENRE_UPDATED, self.genres[index], "name"))
 
+    @_mutation
     def set_genre_summary(self, index: int, summary: Optional[str]) -> None:
         if index < 0 or index >= len(self.genres):
             raise IndexError(f"ジャンルインデックス {index} が範囲外です")
+        self.load_genre(self.genres[index])
+        self._will_change(self.genres[index])
         self.genres[index]["summary"] = summary or None
-        self._save()
+        self._touch(self.genres[index])
+        self._save(self._updated([index], self.genres[index], "summary"))
+        self._publish(self._fields_event(ev.GENRE_UPDATED, self.genres[index], "summary"))
 
+    @_mutation
     def delete_genre(self, index: int) -> None:
         if index < 0 or index >= len(self.genres):
             raise IndexError(f"ジャンルインデックス {index} が範囲外です")
+        event = self._event(ev.GENRE_DELETED, self.genres[index])
+        self._loaded.pop(self.genres[index]["id"], None)
+        self._unloaded_incomplete.pop(self.genres[index]["id"], None)
+        self._unindex_subtree(self.genres[index], 0)
         del self.genres[index]
-        self._save()
+        self._renumber(self.genres, index)
+        self._save({"op": "delete", "path": [index]})
+        self._publish(event)
 
+    @_mutation
     def move_genre_up(self, index: int) -> None:
         if index < 0 or index >= len(self.genres):
             raise IndexError(f"ジャンルインデックス {index} が範囲外です")
         if index <= 0:
             return
-        self.genres[index-1], self.genres[index] = self.genres[index], self.genres[index-1]
-        self._save()
+        self._swap(self.genres, index-1, index)
+        self._save({"op": "swap", "path": [index], "other": index-1})
+        self._publish(self._event(ev.GENRE_MOVED, self.genres[index-1], {"index": index-1}))
 
+    @_mutation
     def move_genre_down(self, index: int) -> None:
         if index < 0 or index >= len(self.genres):
             raise IndexError(f"ジャンルインデックス {index} が範囲外です")
         if index >= len(self.genres) - 1:
             return
-        self.genres[index+1], self.genres[index] = self.genres[index], self.genres[index+1]
-        self._save()
+        self._swap(self.genres, index, index+1)
+        self._save({"op": "swap", "path": [index], "other": index+1})
+        self._publish(self._event(ev.GENRE_MOVED, self.genres[index+1], {"index": index+1}))
 
 
     # ミッションの処理
+    @_mutation
     def add_mission(self, g: GenreDict, name: str, summary: Optional[str] = None, due_date: Optional[str] = None) -> None:
+        self._entry(g, "ジャンル")
+        self.load_genre(g)
+        self._will_change(g)
         m = new_mission(name)
         if summary:
             m["summary"] = summary
         if due_date:
             m["due_date"] = due_date
-        g.setdefault("missions", []).append(m)
-        self._save()
+        if self._compact:
+            m = cp.pack_mission(m)
+        missions = g.setdefault("missions", [])
+        missions.append(m)
+        self._index_subtree(m, g, len(missions) - 1, 1)
+        self._touch(g)
+        self._save({"op": "insert", "path": self._path(m), "value": copy.deepcopy(m)})
+        self._publish(self._event(ev.MISSION_ADDED, m, copy.deepcopy(m)))
 
     def find_mission_index(self, g: GenreDict, m: MissionDict) -> int:
-        missions = g.get("missions", [])
-        try:
-            return missions.index(m)
-        except ValueError:
-            raise ValueError("指定されたミッションが見つかりません")
+        return self._child_entry(g, m, "ミッション").pos
 
+    @_mutation
     def rename_mission(self, m: MissionDict, new_name: str) -> None:
+        self._entry(m, "ミッション")
+        self._will_change(m)
         m["name"] = new_name
-        self._save()
+        self._touch(m)
+        self._save(self._updated(self._path(m), m, "name"))
+        self._publish(self._fields_event(ev.MISSION_UPDATED, m, "name"))
 
+    @_mutation
     def set_mission_due(self, m: MissionDict, due_text: Optional[str]) -> None:
+        self._entry(m, "ミッション")
+        self._will_change(m)
         m["due_date"] = due_text or None
-        self._save()
+        self._due[m["id"]] = due_ordinal(m["due_date"])
+        self._reorder(m)
+        self._touch(m)
+        self._save(self._updated(self._path(m), m, "due_date"))
+        self._publish(self._fields_event(ev.MISSION_UPDATED, m, "due_date"))
 
+    @_mutation
     def set_mission_summary(self, m: MissionDict, summary: Optional[str]) -> None:
+        self._entry(m, "ミッション")
+        self._will_change(m)
         m["summary"] = summary or None
-        self._save()
+        self._touch(m)
+        self._save(self._updated(self._path(m), m, "summary"))
+        self._publish(self._fields_event(ev.MISSION_UPDATED, m, "summary"))
 
+    @_mutation
     def delete_mission(self, g: GenreDict, m: MissionDict) -> None:
-        missions = g.get("missions", [])
-        try:
-            missions.remove(m)
-        except ValueError:
-            raise ValueError("指定されたミッションが見つかりません")
-        self._save()
-
+        idx = self._child_entry(g, m, "ミッション").pos
+        self._will_change(g)
+        path = self._path(m)
+        missions = g["missions"]
+        event = self._event(ev.MISSION_DELETED, m)
+        self._unindex_subtree(m, 1)
+        del missions[idx]
+        self._renumber(missions, idx)
+        self._touch(g)
+        self._save({"op": "delete", "path": path})
+        self._publish(event)
+
+    @_mutation
     def move_mission_up(self, g: GenreDict, m: MissionDict) -> None:
-        missions = g.get("missions", [])
-        try:
-            idx = missions.index(m)
-        except ValueError:
-            raise ValueError("指定されたミッションが見つかりません")
+        idx = self._child_entry(g, m, "ミッション").pos
         if idx <= 0:
             return
-        missions[idx-1], missions[idx] = missions[idx], missions[idx-1]
-        self._save()
-
+        self._will_change(g)
+        path = self._path(m)
+        self._swap(g["missions"], idx-1, idx)
+        self._touch(g)
+        self._save({"op": "swap", "path": path, "other": idx-1})
+        self._publish(self._event(ev.MISSION_MOVED, m, {"index": idx-1}))
+
+    @_mutation
     def move_mission_down(self, g: GenreDict, m: MissionDict) -> None:
-        missions = g.get("missions", [])
-        try:
-            idx = missions.index(m)
-        except ValueError:
-            raise ValueError("指定されたミッションが見つかりません")
-        if idx < 0 or idx >= len(missions) - 1:
+        idx = self._child_entry(g, m, "ミッション").pos
+        missions = g["missions"]
+        if idx >= len(missions) - 1:
             return
-        missions[idx+1], missions[idx] = missions[idx], missions[idx+1]
-        self._save()
+        self._will_change(g)
+        path = self._path(m)
+        self._swap(missions, idx, idx+1)
+        self._touch(g)
+        self._save({"op": "swap", "path": path, "other": idx+1})
+        self._publish(self._event(ev.MISSION_MOVED, m, {"index": idx+1}))
 
 
     # タスクの処理
     def _sync_mission_completion(self, m: MissionDict) -> None:
-        """タスクの完了状況に応じてミッションの completed_at を同期"""
-        if mission_progress(m) >= 1.0:
+        """タスクの完了状況に応じてミッションの completed_at を同期（バッチ中はコミット時に1回）"""
+        if self._batch is not None:
+            self._batch.sync[m["id"]] = m
+            return
+        if self.is_mission_complete(m):
             m["completed_at"] = now_str()
         else:
             m["completed_at"] = None
 
+    @_mutation
     def add_task(self, m: MissionDict, name: str, due_date: Optional[str] = None) -> None:
+        self._entry(m, "ミッション")
+        self._will_change(m)
         t = new_task(name)
         if due_date:
             t["due_date"] = due_date
-        m.setdefault("tasks", []).append(t)
+        if self._compact:
+            t = cp.pack_task(t)
+        tasks = m.setdefault("tasks", [])
+        tasks.append(t)
+        self._index_subtree(t, m, len(tasks) - 1, 2)
         self._sync_mission_completion(m)
-        self._save()
-
+        path = self._path(m)
+        self._touch(m)
+        self._save(
+            {"op": "insert", "path": path + [len(tasks) - 1], "value": copy.deepcopy(t)},
+            self._updated(path, m, "completed_at"),
+        )
+        self._publish(self._event(ev.TASK_ADDED, t, copy.deepcopy(t)),
+                      self._fields_event(ev.MISSION_UPDATED, m, "completed_at"))
+
+    @_mutation
     def rename_task(self, t: TaskDict, new_name: str) -> None:
+        self._entry(t, "タスク")
+        self._will_change(t)
         t["name"] = new_name
-        self._save()
+        self._touch(t)
+        self._save(self._updated(self._path(t), t, "name"))
+        self._publish(self._fields_event(ev.TASK_UPDATED, t, "name"))
 
+    @_mutation
     def set_task_due(self, t: TaskDict, due_text: Optional[str]) -> None:
+        self._entry(t, "タスク")
+        self._will_change(t)
         t["due_date"] = due_text or None
-        self._save()
+        self._due[t["id"]] = due_ordinal(t["due_date"])
+        self._reorder(t)
+        self._touch(t)
+        self._save(self._updated(self._path(t), t, "due_date"))
+        self._publish(self._fields_event(ev.TASK_UPDATED, t, "due_date"))
 
+    @_mutation
     def delete_task(self, m: MissionDict, t: TaskDict) -> None:
-        tasks = m.get("tasks", [])
-        try:
-            tasks.remove(t)
-        except ValueError:
-            raise ValueError("指定されたタスクが見つかりません")
+        idx = self._child_entry(m, t, "タスク").pos
+        self._will_change(m)
+        path = self._path(m)
+        tasks = m["tasks"]
+        event = self._event(ev.TASK_DELETED, t)
+        self._unindex_subtree(t, 2)
+        del tasks[idx]
+        self._renumber(tasks, idx)
         self._sync_mission_completion(m)
-        self._save()
+        self._touch(m)
+        self._save({"op": "delete", "path": path + [idx]}, self._updated(path, m, "completed_at"))
+        self._publish(event, self._fields_event(ev.MISSION_UPDATED, m, "completed_at"))
 
+    @_mutation
     def move_task_up(self, m: MissionDict, t: TaskDict) -> None:
-        tasks = m.get("tasks", [])
-        try:
-            idx = tasks.index(t)
-        except ValueError:
-            raise ValueError("指定されたタスクが見つかりません")
+        idx = self._child_entry(m, t, "タスク").pos
         if idx <= 0:
             return
-        tasks[idx-1], tasks[idx] = tasks[idx], tasks[idx-1]
-        self._save()
-
+        self._will_change(m)
+        path = self._path(t)
+        self._swap(m["tasks"], idx-1, idx)
+        self._touch(m)
+        self._save({"op": "swap", "path": path, "other": idx-1})
+        self._publish(self._event(ev.TASK_MOVED, t, {"index": idx-1}))
+
+    @_mutation
     def move_task_down(self, m: MissionDict, t: TaskDict) -> None:
-        tasks = m.get("tasks", [])
-        try:
-            idx = tasks.index(t)
-        except ValueError:
-            raise ValueError("指定されたタスクが見つかりません")
-        if idx < 0 or idx >= len(tasks) - 1:
+        idx = self._child_entry(m, t, "タスク").pos
+        tasks = m["tasks"]
+        if idx >= len(tasks) - 1:
             return
-        tasks[idx+1], tasks[idx] = tasks[idx], tasks[idx+1]
-        self._save()
-
+        self._will_change(m)
+        path = self._path(t)
+        self._swap(tasks, idx, idx+1)
+        self._touch(m)
+        self._save({"op": "swap", "path": path, "other": idx+1})
+        self._publish(self._event(ev.TASK_MOVED, t, {"index": idx+1}))
+
+    @_mutation
     def toggle_task_done(self, m: MissionDict, t: TaskDict, checked: bool) -> None:
+        self._child_entry(m, t, "タスク")
+        self._will_change(m)
+        was_done = bool(t.get("done", False))
         t["done"] = checked
         t["completed_at"] = now_str() if checked else None
+        if was_done != checked:
+            self._reorder(t)
+            self._adjust_progress(m, 1 if checked else -1, 0)
         self._sync_mission_completion(m)
-        self._save()
+        path = self._path(t)
+        self._touch(t)
+        self._save(self._updated(path, t, "done", "completed_at"), self._updated(path[:-1], m, "completed_at"))
+        self._publish(self._fields_event(ev.TASK_UPDATED, t, "done", "completed_at"),
+                      self._fields_event(ev.MISSION_UPDATED, m, "completed_at"))
+
+    # 別の親への移動（移動先の末尾に追加）
+    @_mutation
+    def move_task_to(self, t: TaskDict, dest: MissionDict) -> None:
+        entry = self._entry(t, "タスク")
+        self._entry(dest, "ミッション")
+        src = entry.parent
+        if src is dest:
+            return
+        self._will_change(src, dest)
+        idx = entry.pos
+        src_path = self._path(src)
+        removed = self._event(ev.TASK_DELETED, t)
+        self._unindex_subtree(t, 2)
+        del src["tasks"][idx]
+        self._renumber(src["tasks"], idx)
+        tasks = dest.setdefault("tasks", [])
+        tasks.append(t)
+        self._index_subtree(t, dest, len(tasks) - 1, 2)
+        self._sync_mission_completion(src)
+        self._sync_mission_completion(dest)
+        dest_path = self._path(dest)
+        self._touch(src)
+        self._touch(dest)
+        self._save(
+            {"op": "delete", "path": src_path + [idx]},
+            self._updated(src_path, src, "completed_at"),
+            {"op": "insert", "path": dest_path + [len(tasks) - 1], "value": copy.deepcopy(t)},
+            self._updated(dest_path, dest, "completed_at"),
+        )
+        self._publish(
+            removed,
+            self._fields_event(ev.MISSION_UPDATED, src, "completed_at"),
+            self._event(ev.TASK_ADDED, t, copy.deepcopy(t)),
+            self._fields_event(ev.MISSION_UPDATED, dest, "completed_at"),
+        )
+
+    @_mutation
+    def move_mission_to(self, m: MissionDict, dest: GenreDict) -> None:
+        entry = self._entry(m, "ミッション")
+        self._entry(dest, "ジャンル")
+        src = entry.parent
+        if src is dest:
+            return
+        self.load_genre(dest)
+        self._will_change(src, dest)
+        idx = entry.pos
+        src_path = self._path(src)
+        removed = self._event(ev.MISSION_DELETED, m)
+        self._unindex_subtree(m, 1)
+        del src["missions"][idx]
+        self._renumber(src["missions"], idx)
+        missions = dest.setdefault("missions", [])
+        missions.append(m)
+        self._index_subtree(m, dest, len(missions) - 1, 1)
+        self._touch(src)
+        self._touch(m)
+        self._save(
+            {"op": "delete", "path": src_path + [idx]},
+            {"op": "insert", "path": self._path(m), "value": copy.deepcopy(m)},
+        )
+        self._publish(removed, self._event(ev.MISSION_ADDED, m, copy.deepcopy(m)))
+
+    # 一括操作（batch() で1回の保存・1回の completed_at 同期にまとめる）
+    @_mutation
+    def set_tasks_done(self, tasks: Iterable[TaskDict], checked: bool) -> None:
+        with self.batch():
+            for t in list(tasks):
+                # 既に同じ状態のタスクは完了日時を書き換えない
+                if bool(t.get("done", False)) != checked:
+                    self.toggle_task_done(self.parent_of(t), t, checked)
+
+    @_mutation
+    def set_tasks_due(self, tasks: Iterable[TaskDict], due_text: Optional[str]) -> None:
+        with self.batch():
+            for t in list(tasks):
+                self.set_task_due(t, due_text)
+
+    @_mutation
+    def delete_tasks(self, tasks: Iterable[TaskDict]) -> None:
+        with self.batch():
+            for t in list(tasks):
+                self.delete_task(self.parent_of(t), t)
+
+    @_mutation
+    def delete_done_tasks(self, m: MissionDict) -> int:
+        """完了済みタスクをすべて削除し、削除した数を返す"""
+        done = [t for t in m.get("tasks", []) if t.get("done", False)]
+        self.delete_tasks(done)
+        return len(done)
+
+    @_mutation
+    def move_tasks_to(self, tasks: Iterable[TaskDict], dest: MissionDict) -> None:
+        with self.batch():
+            for t in list(tasks):
+                self.move_task_to(t, dest)
+
+    @_mutation
+    def set_missions_due(self, missions: Iterable[MissionDict], due_text: Optional[str]) -> None:
+        with self.batch():
+            for m in list(missions):
+                self.set_mission_due(m, due_text)
+
+    @_mutation
+    def delete_missions(self, missions: Iterable[MissionDict]) -> None:
+        with self.batch():
+            for m in list(missions):
+                self.delete_mission(self.parent_of(m), m)
+
+    @_mutation
+    def move_missions_to(self, missions: Iterable[MissionDict], dest: GenreDict) -> None:
+        with self.batch():
+            for m in list(missions):
+                self.move_mission_to(m, dest)
@@ -0,0 +1,308 @@
+"""
+コマンドライン操作（python -m missionmanager）
+Qt を読み込まず、AppService とストレージだけで動く（シェルのループや cron から呼べるよう起動を軽くする）。
+結果は JSON で標準出力に書く。エラーは標準エラーにメッセージを出して終了コード 1。
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+from typing import Any, Optional, Sequence
+from missionmanager.models import GenreDict, MissionDict, TaskDict, due_ordinal, today_ordinal
+from missionmanager.storage import StorageError, create_storage
+from missionmanager.app import AppService, Entity
+from missionmanager import profiling
+
+
+class CliError(Exception):
+    """利用者の指定に誤りがある（終了コード 1）"""
+    pass
+
+
+# ---------- 指定の解決 ----------
+def _resolve(service: AppService, ref: str, level: int, label: str,
+             scope: Optional[Sequence[Entity]] = None) -> Entity:
+    """id か名前で要素を探す。名前が複数に一致する場合はエラー（id で指定させる）"""
+    entity = service.find_by_id(ref)
+    if entity is not None and _level(service, entity) == level:
+        return entity
+    candidates = scope if scope is not None else _all(service, level)
+    matches = [e for e in candidates if e.get("name") == ref]
+    if not matches:
+        raise CliError(f"{label}が見つかりません: {ref}")
+    if len(matches) > 1:
+        ids = ", ".join(e["id"] for e in matches)
+        raise CliError(f"{label}「{ref}」が複数あります。id で指定してください: {ids}")
+    return matches[0]
+
+
+def _level(service: AppService, entity: Entity) -> int:
+    level = 0
+    parent = service.parent_of(entity)
+    while parent is not None:
+        level += 1
+        parent = service.parent_of(parent)
+    return level
+
+
+def _all(service: AppService, level: int) -> list[Entity]:
+    if level == 0:
+        return list(service.genres)
+    missions = [m for g in service.genres for m in g.get("missions", [])]
+    if level == 1:
+        return missions
+    return [t for m in missions for t in m.get("tasks", [])]
+
+
+def _due(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    if due_ordinal(text) is None:
+        raise CliError(f"期限は YYYY-MM-DD 形式で指定してください: {text}")
+    return text
+
+
+# ---------- 出力 ----------
+def _task_json(t: TaskDict) -> dict[str, Any]:
+    return {
+        "id": t["id"],
+        "name": t.get("name", ""),
+        "done": bool(t.get("done", False)),
+        "due_date": t.get("due_date"),
+        "completed_at": t.get("completed_at"),
+    }
+
+
+def _mission_json(service: AppService, m: MissionDict, with_tasks: bool = True) -> dict[str, Any]:
+    done, total = service.mission_counts(m)
+    result: dict[str, Any] = {
+        "id": m["id"],
+        "name": m.get("name", ""),
+        "summary": m.get("summary"),
+        "due_date": m.get("due_date"),
+        "completed_at": m.get("completed_at"),
+        "complete": service.is_mission_complete(m),
+        "done": done,
+        "total": total,
+    }
+    if with_tasks:
+        result["tasks"] = [_task_json(t) for t in service.sorted_tasks(m)]
+    return result
+
+
+def _genre_json(service: AppService, g: GenreDict, missions: Optional[list[dict[str, Any]]] = None) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "id": g["id"],
+        "name": g.get("name", ""),
+        "summary": g.get("summary"),
+        "incomplete": service.count_incomplete_missions(g),
+    }
+    if missions is not None:
+        result["missions"] = missions
+    return result
+
+
+def _print(value: Any, pretty: bool) -> None:
+    if pretty:
+        text = json.dumps(value, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    sys.stdout.write(text + "\n")
+
+
+# ---------- サブコマンド ----------
+def cmd_list(service: AppService, args: argparse.Namespace) -> Any:
+    """ジャンル（--genre 指定時はそのジャンルだけ）のミッション・タスクを表示順で返す"""
+    genres = [_resolve(service, args.genre, 0, "ジャンル")] if args.genre else service.genres
+    result = []
+    for g in genres:
+        missions = None
+        if not args.genres_only:
+            missions = [
+                _mission_json(service, m, with_tasks=not args.no_tasks)
+                for m in service.sorted_missions(g)
+                if args.all or not service.is_mission_complete(m)
+            ]
+        result.append(_genre_json(service, g, missions))
+    return result
+
+
+def cmd_due(service: AppService, args: argparse.Namespace) -> Any:
+    """期限のある未完了のミッション・タスクを期限の近い順に返す"""
+    today = today_ordinal()
+    limit: Optional[int] = None
+    if args.overdue:
+        limit = today - 1
+    elif args.within is not None:
+        limit = today + args.within
+    if args.before is not None:
+        before = due_ordinal(_due(args.before))
+        assert before is not None
+        limit = before - 1 if limit is None else min(limit, before - 1)
+    genres = [_resolve(service, args.genre, 0, "ジャンル")] if args.genre else service.genres
+    items: list[tuple[int, int, dict[str, Any]]] = []
+
+    def add(kind: str, entity: Entity, g: GenreDict, m: Optional[MissionDict]) -> None:
+        due = service.due_ordinal(entity)
+        if due is None or (limit is not None and due > limit):
+            return
+        item = {
+            "type": kind,
+            "id": entity["id"],
+            "name": entity.get("name", ""),
+            "due_date": entity.get("due_date"),
+            "days_left": due - today,
+            "genre": {"id": g["id"], "name": g.get("name", "")},
+        }
+        if m is not None:
+            item["mission"] = {"id": m["id"], "name": m.get("name", "")}
+        items.append((due, 0 if kind == "mission" else 1, item))
+
+    for g in genres:
+        for m in g.get("missions", []):
+            if args.all or not service.is_mission_complete(m):
+                add("mission", m, g, None)
+            if args.missions_only:
+                continue
+            for t in m.get("tasks", []):
+                if args.all or not t.get("done", False):
+                    add("task", t, g, m)
+    # 同じ期限ではミッション → タスクの順（sort は安定なので元の並びは保たれる）
+    items.sort(key=lambda x: (x[0], x[1]))
+    return [item for _, _, item in items]
+
+
+def cmd_add(service: AppService, args: argparse.Namespace) -> Any:
+    if args.kind == "genre":
+        service.add_genre(args.name, args.summary)
+        return _genre_json(service, service.genres[-1])
+    if args.kind == "mission":
+        g = _resolve(service, args.parent, 0, "ジャンル")
+        service.add_mission(g, args.name, args.summary, _due(args.due))
+        return _mission_json(service, g["missions"][-1])
+    m = _resolve(service, args.parent, 1, "ミッション")
+    service.add_task(m, args.name, _due(args.due))
+    return _task_json(m["tasks"][-1])
+
+
+def cmd_complete(service: AppService, args: argparse.Namespace) -> Any:
+    """タスクを完了にする（ミッションを指定するとその全タスク）。--undo で未完了に戻す"""
+    tasks: list[TaskDict] = []
+    for ref in args.refs:
+        entity = service.find_by_id(ref)
+        level = _level(service, entity) if entity is not None else None
+        if level == 1:
+            tasks.extend(entity.get("tasks", []))
+        elif level == 2:
+            tasks.append(entity)
+        else:
+            # 名前はタスク・ミッションのどちらか一方にだけ一致すること
+            is_task = any(t.get("name") == ref for t in _all(service, 2))
+            is_mission = any(m.get("name") == ref for m in _all(service, 1))
+            if is_task and is_mission:
+                raise CliError(f"「{ref}」はタスクとミッションの両方にあります。id で指定してください")
+            if is_mission:
+                tasks.extend(_resolve(service, ref, 1, "ミッション").get("tasks", []))
+            elif is_task:
+                tasks.append(_resolve(service, ref, 2, "タスク"))
+            else:
+                raise CliError(f"タスク・ミッションが見つかりません: {ref}")
+    service.set_tasks_done(tasks, not args.undo)
+    return [_task_json(t) for t in tasks]
+
+
+def cmd_stats(service: AppService, args: argparse.Namespace) -> Any:
+    """日/週ごとの完了数・期限に対する完了日の分布・ジャンルごとのペース"""
+    from missionmanager import analytics
+    return analytics.report(analytics.project(service.genres), days=args.days, weeks=args.weeks,
+                            velocity_weeks=args.velocity_weeks)
+
+
+def cmd_search(service: AppService, args: argparse.Namespace) -> Any:
+    """名前・概要に全語を含む要素（ジャンル → ミッション → タスクの順）"""
+    from missionmanager.search import SearchIndex
+    return SearchIndex(service).search(" ".join(args.query), args.limit)
+
+
+# ---------- 引数 ----------
+def build_parser() -> argparse.ArgumentParser:
+    # 共通オプションはサブコマンドの前後どちらにも書ける（後ろの指定で上書きしないよう既定値は SUPPRESS）
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--storage", default=argparse.SUPPRESS,
+                        help="保存方式（json / journal / sqlite / sharded）。既定は MISSIONMANAGER_STORAGE か json")
+    common.add_argument("--pretty", action="store_true", default=argparse.SUPPRESS,
+                        help="JSON をインデント付きで出力する")
+    common.add_argument("--profile", action="store_true", default=argparse.SUPPRESS,
+                        help="処理時間の計測結果を標準エラーに出力する（環境変数 MISSIONMANAGER_PROFILE でも可）")
+    parser = argparse.ArgumentParser(
+        prog="python -m missionmanager",
+        description="MissionManager のデータをコマンドラインで操作する（出力は JSON）",
+        parents=[common],
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", parents=[common], help="ジャンル・ミッション・タスクの一覧")
+    p.add_argument("--genre", help="ジャンル（id か名前）")
+    p.add_argument("--all", action="store_true", help="完了済みのミッションも含める")
+    p.add_argument("--no-tasks", action="store_true", help="タスクを含めない")
+    p.add_argument("--genres-only", action="store_true", help="ジャンルの見出しだけ")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("due", parents=[common], help="期限のあるミッション・タスクを期限順に")
+    p.add_argument("--genre", help="ジャンル（id か名前）")
+    p.add_argument("--overdue", action="store_true", help="期限切れのものだけ")
+    p.add_argument("--within", type=int, metavar="DAYS", help="今日から DAYS 日以内（期限切れを含む）")
+    p.add_argument("--before", metavar="YYYY-MM-DD", help="指定日より前")
+    p.add_argument("--missions-only", action="store_true", help="ミッションだけ")
+    p.add_argument("--all", action="store_true", help="完了済みも含める")
+    p.set_defaults(func=cmd_due)
+
+    p = sub.add_parser("search", parents=[common], help="名前・概要の全文検索")
+    p.add_argument("query", nargs="+", help="検索語（複数指定は AND）")
+    p.add_argument("--limit", type=int, default=50, help="最大件数（既定: 50）")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("stats", parents=[common], help="完了履歴の統計（完了数の推移・期限に対する遅れ・ペース）")
+    p.add_argument("--days", type=int, default=30, help="日別の完了数の日数（既定: 30）")
+    p.add_argument("--weeks", type=int, default=12, help="週別の完了数の週数（既定: 12）")
+    p.add_argument("--velocity-weeks", type=int, default=4, help="ジャンルごとのペースを測る週数（既定: 4）")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("add", parents=[common], help="ジャンル・ミッション・タスクの追加（追加した要素を出力）")
+    add_sub = p.add_subparsers(dest="kind", required=True)
+    q = add_sub.add_parser("genre", help="ジャンルを追加")
+    q.add_argument("name")
+    q.add_argument("--summary")
+    q = add_sub.add_parser("mission", help="ミッションを追加")
+    q.add_argument("parent", metavar="GENRE", help="ジャンル（id か名前）")
+    q.add_argument("name")
+    q.add_argument("--summary")
+    q.add_argument("--due", metavar="YYYY-MM-DD")
+    q = add_sub.add_parser("task", help="タスクを追加")
+    q.add_argument("parent", metavar="MISSION", help="ミッション（id か名前）")
+    q.add_argument("name")
+    q.add_argument("--due", metavar="YYYY-MM-DD")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("complete", parents=[common], help="タスクを完了にする（ミッション指定でその全タスク）")
+    p.add_argument("refs", nargs="+", metavar="ID", help="タスクかミッション（id か名前）")
+    p.add_argument("--undo", action="store_true", help="未完了に戻す")
+    p.set_defaults(func=cmd_complete)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    profile_target = profiling.profile_target(["--profile"] if getattr(args, "profile", False) else [])
+    profiler = profiling.install() if profile_target is not None else None
+    try:
+        # 1回の実行で完結するので保存は同期（save_delay なし）
+        service = AppService(create_storage(getattr(args, "storage", None)))
+        result = args.func(service, args)
+    except (CliError, StorageError) as e:
+        sys.stderr.write(f"エラー: {e}\n")
+        return 1
+    _print(result, getattr(args, "pretty", False))
+    if profiler is not None:
+        profiler.dump(profile_target)
+    return 0
@@ -0,0 +1,258 @@
+"""
+省メモリのミッション・タスク（AppService(compact=True) / 環境変数 MISSIONMANAGER_COMPACT=1）
+- __slots__ のクラスで、キー文字列を要素ごとに持たない（dict より1要素あたり百数十バイト小さい）
+- 期限（YYYY-MM-DD）は日付の序数、完了日時（YYYY-MM-DD HH:MM）は分単位の整数で持つ
+- MutableMapping として TaskDict / MissionDict と同じキーで読み書きでき、UI・ストレージはそのまま使える
+- 形式の違う値・未知のキー・キーの並びも保持し、to_dict で読み込んだ時の dict に戻る
+ジャンルは数が少なく、遅延読み込みの判定（"missions" の有無）にも使うので dict のまま
+"""
+from __future__ import annotations
+import functools
+import os
+from collections.abc import Mapping, MutableMapping
+from datetime import date
+from typing import Any, Iterator, Optional
+from missionmanager.models import GenreDict
+
+ENV_VAR = "MISSIONMANAGER_COMPACT"
+
+_PLAIN, _DATE, _STAMP = 0, 1, 2
+
+
+def enabled() -> bool:
+    """環境変数 MISSIONMANAGER_COMPACT=1 なら省メモリの表現を使う"""
+    return os.environ.get(ENV_VAR, "").strip() not in ("", "0")
+
+
+class _Missing:
+    """キーが無いことを表す値"""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING: Any = _Missing()
+
+
+class _Raw:
+    """日付・日時の形式に合わない値（序数に変換せずそのまま持つ）"""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+# 同じ日付の序数は1つの int を共有する（期限は数百日分に集中するので）
+_ordinals: dict[int, int] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _date_text(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _stamp_text(minutes: int) -> str:
+    day, rest = divmod(minutes, 1440)
+    return f"{_date_text(day)} {rest // 60:02d}:{rest % 60:02d}"
+
+
+def _encode(kind: int, value: Any) -> Any:
+    if kind == _PLAIN or value is None or value is _MISSING:
+        return value
+    if isinstance(value, str):
+        try:
+            if kind == _DATE and len(value) == 10:
+                ordinal = date.fromisoformat(value).toordinal()
+                if _date_text(ordinal) == value:
+                    return _ordinals.setdefault(ordinal, ordinal)
+            elif kind == _STAMP and len(value) == 16 and value[10] == " " and value[13] == ":":
+                ordinal = date.fromisoformat(value[:10]).toordinal()
+                minutes = ordinal * 1440 + int(value[11:13]) * 60 + int(value[14:16])
+                if _stamp_text(minutes) == value:
+                    return minutes
+        except ValueError:
+            pass
+    return _Raw(value)
+
+
+def _decode(kind: int, stored: Any) -> Any:
+    if kind == _PLAIN or stored is None:
+        return stored
+    if isinstance(stored, _Raw):
+        return stored.value
+    return _date_text(stored) if kind == _DATE else _stamp_text(stored)
+
+
+class _Compact(MutableMapping):  # type: ignore[type-arg]
+    """
+    _FIELDS の各キーを同名の slot に（無いキーは _MISSING）、それ以外のキーを _extra に持つ。
+    キーの並びが _FIELDS の順（その後に _extra）と違う場合だけ _order に並びを持つ
+    """
+    __slots__ = ("_extra", "_order")
+    _FIELDS: tuple[tuple[str, int], ...] = ()
+    _KIND: dict[str, int] = {}
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None) -> None:
+        for name, _ in self._FIELDS:
+            object.__setattr__(self, name, _MISSING)
+        self._extra: Optional[dict[str, Any]] = None
+        self._order: Optional[tuple[str, ...]] = None
+        if data is not None:
+            kinds = self._KIND
+            for key, value in data.items():
+                kind = kinds.get(key)
+                if kind is None:
+                    if self._extra is None:
+                        self._extra = {}
+                    self._extra[key] = value
+                else:
+                    object.__setattr__(self, key, _encode(kind, value))
+            self._set_order(list(data))
+
+    def __init_subclass__(cls) -> None:
+        cls._KIND = dict(cls._FIELDS)
+
+    # ---------- Mapping ----------
+    def __getitem__(self, key: str) -> Any:
+        kind = self._KIND.get(key)
+        if kind is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        stored = getattr(self, key)
+        if stored is _MISSING:
+            raise KeyError(key)
+        return _decode(kind, stored)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # UI・並び替えで頻繁に呼ばれるので KeyError を経由しない
+        kind = self._KIND.get(key)
+        if kind is None:
+            return self._extra.get(key, default) if self._extra is not None else default
+        stored = getattr(self, key)
+        return default if stored is _MISSING else _decode(kind, stored)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._KIND:
+            return getattr(self, key) is not _MISSING  # type: ignore[arg-type]
+        return self._extra is not None and key in self._extra
+
+    def _present(self) -> list[str]:
+        keys = [name for name, _ in self._FIELDS if getattr(self, name) is not _MISSING]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order if self._order is not None else self._present())
+
+    def __len__(self) -> int:
+        return len(self._order) if self._order is not None else len(self._present())
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        is_new = key not in self
+        if is_new:
+            order = list(self) + [key]
+        kind = self._KIND.get(key)
+        if kind is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            object.__setattr__(self, key, _encode(kind, value))
+        if is_new:
+            self._set_order(order)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        order = [k for k in self if k != key]
+        if key in self._KIND:
+            object.__setattr__(self, key, _MISSING)
+        else:
+            assert self._extra is not None
+            del self._extra[key]
+            if not self._extra:
+                self._extra = None
+        self._set_order(order)
+
+    def _set_order(self, order: list[str]) -> None:
+        self._order = None
+        if order != self._present():
+            self._order = tuple(order)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Mapping):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    # ---------- 変換・複製 ----------
+    def to_dict(self) -> dict[str, Any]:
+        """読み込んだ時と同じ dict（キーの並びも同じ）"""
+        return {key: self[key] for key in self}
+
+    def __copy__(self) -> "_Compact":
+        return type(self)(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        # 変更レコード・イベントに入れる複製は JSON にそのまま書ける dict にする
+        return plain(self)
+
+
+class Task(_Compact):
+    __slots__ = ("id", "name", "done", "completed_at", "due_date")
+    _FIELDS = (("id", _PLAIN), ("name", _PLAIN), ("done", _PLAIN),
+               ("completed_at", _STAMP), ("due_date", _DATE))
+
+
+class Mission(_Compact):
+    __slots__ = ("id", "name", "tasks", "due_date", "completed_at", "summary")
+    _FIELDS = (("id", _PLAIN), ("name", _PLAIN), ("tasks", _PLAIN), ("due_date", _DATE),
+               ("completed_at", _STAMP), ("summary", _PLAIN))
+
+
+def pack_task(t: Any) -> Any:
+    """dict のタスクを Task に（dict 以外はそのまま）"""
+    return Task(t) if type(t) is dict else t
+
+
+def pack_mission(m: Any) -> Any:
+    """dict のミッション（タスクも含む）を Mission に"""
+    if type(m) is not dict:
+        return m
+    tasks = m.get("tasks")
+    if isinstance(tasks, list):
+        m = {**m, "tasks": [pack_task(t) for t in tasks]}
+    return Mission(m)
+
+
+def pack_genre(g: GenreDict) -> GenreDict:
+    """ジャンルのミッション・タスクをその場で置き換える（ジャンル自身は dict のまま）"""
+    missions = g.get("missions")
+    if isinstance(missions, list):
+        missions[:] = [pack_mission(m) for m in missions]
+    return g
+
+
+def plain(value: Any) -> Any:
+    """Task / Mission を含む値を dict / list だけの値に（JSON に書く・外に渡す用）"""
+    if isinstance(value, _Compact):
+        return {key: plain(value[key]) for key in value}
+    if isinstance(value, dict):
+        return {key: plain(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [plain(v) for v in value]
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps の default: Task / Mission を dict として書く"""
+    if isinstance(value, _Compact):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
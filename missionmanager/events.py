@@ -0,0 +1,55 @@
+"""AppService のデータ変更を通知するイベント"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Optional, TypedDict
+
+# イベント種別
+GENRE_ADDED = "genre_added"
+GENRE_UPDATED = "genre_updated"        # fields: 変更された項目（name / summary）
+GENRE_DELETED = "genre_deleted"
+GENRE_MOVED = "genre_moved"            # fields: {"index": 移動後の位置}
+GENRE_LOADED = "genre_loaded"          # 遅延読み込みでミッション・タスクを読み込んだ（データの変更ではない）
+MISSION_ADDED = "mission_added"
+MISSION_UPDATED = "mission_updated"    # fields: 変更された項目（name / summary / due_date / completed_at）
+MISSION_DELETED = "mission_deleted"
+MISSION_MOVED = "mission_moved"        # fields: {"index": 移動後の位置}
+TASK_ADDED = "task_added"
+TASK_UPDATED = "task_updated"          # fields: 変更された項目（name / due_date / done / completed_at）
+TASK_DELETED = "task_deleted"
+TASK_MOVED = "task_moved"              # fields: {"index": 移動後の位置}
+
+
+class Event(TypedDict):
+    kind: str                   # イベント種別（上の定数）
+    id: str                     # 対象のジャンル/ミッション/タスクの id
+    parent_id: Optional[str]    # 親の id（ジャンルは None）
+    genre_id: str               # 対象が属するジャンルの id（ジャンル自身なら id と同じ）
+    fields: dict[str, Any]      # 変更後の値（追加時はエンティティのコピー、削除時は空）
+
+
+Handler = Callable[[Event], None]
+
+
+class EventBus:
+    """
+    同期型の発行/購読。発行したスレッドでハンドラを登録順に呼ぶ。
+    Qt に依存しないので UI 以外（CLI・テスト）からも購読できる。
+    """
+
+    def __init__(self) -> None:
+        self._handlers: list[tuple[Handler, Optional[frozenset[str]]]] = []
+
+    def subscribe(self, handler: Handler, kinds: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """ハンドラを登録（kinds 指定時はその種別のみ）。戻り値を呼ぶと購読を解除する"""
+        item = (handler, frozenset(kinds) if kinds is not None else None)
+        self._handlers.append(item)
+
+        def unsubscribe() -> None:
+            if item in self._handlers:
+                self._handlers.remove(item)
+        return unsubscribe
+
+    def publish(self, event: Event) -> None:
+        # ハンドラ内での購読・解除に備えて複製を回す
+        for handler, kinds in list(self._handlers):
+            if kinds is None or event["kind"] in kinds:
+                handler(event)
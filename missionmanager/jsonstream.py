@@ -0,0 +1,253 @@
+"""
+データファイル（{"genres": [...]}）の逐次読み書き
+- 読み込み: ファイルを少しずつ読み、ミッション単位で json に解析する（ファイル全体の文字列を作らない）
+- 書き込み: ジャンル・ミッションを1つずつ書き出す（データ全体の JSON 文字列を作らない）
+どちらも一度にメモリに載る文字列は最大のミッション1つ分程度に収まる。
+"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+from missionmanager.compact import json_default
+from missionmanager.models import GenreDict
+
+_CHUNK = 1 << 16
+_WS = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+class StreamError(ValueError):
+    """データファイルの形式が不正"""
+    pass
+
+
+class _Reader:
+    """バッファを伸ばしながら JSON を先頭から読み進める"""
+
+    def __init__(self, fp: TextIO, chunk: int = _CHUNK) -> None:
+        self._fp = fp
+        self._chunk = chunk
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """読み済みの部分を捨てて続きを読む。読めなければ False"""
+        if self._eof:
+            return False
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        # 大きな値の途中なら読む量を倍々に増やす（再解析の回数を抑える）
+        data = self._fp.read(max(self._chunk, len(self._buf)))
+        if not data:
+            self._eof = True
+            return False
+        self._buf += data
+        return True
+
+    def peek(self) -> str:
+        """空白を飛ばして次の1文字を返す（終端なら空文字）"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise StreamError(f"'{ch}' が必要な位置に '{self.peek()}' があります")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """次の JSON 値を1つ解析する"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise StreamError(str(e)) from e
+            # 数値はバッファの末尾で切れている可能性があるので、区切り文字が見えるまで続きを読む
+            if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and self._buf[end:].strip(_NUMBER_CHARS) == "" and self._fill()):
+                continue
+            self._pos = end
+            return value
+
+    def key(self) -> str:
+        k = self.value()
+        if not isinstance(k, str):
+            raise StreamError("オブジェクトのキーが文字列ではありません")
+        self.expect(":")
+        return k
+
+    def items(self) -> Iterator[str]:
+        """オブジェクトのキーを順に返す（呼び出し側が値を読み進める）"""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            yield self.key()
+            ch = self.peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise StreamError(f"',' か '}}' が必要な位置に '{ch}' があります")
+
+    def elements(self) -> Iterator[None]:
+        """配列の要素ごとに1回返す（呼び出し側が要素を読み進める）"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            ch = self.peek()
+            self._pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise StreamError(f"',' か ']' が必要な位置に '{ch}' があります")
+
+
+def _read_genre(r: _Reader) -> Any:
+    if r.peek() != "{":
+        return r.value()   # 不正な要素はそのまま返す（検証は呼び出し側）
+    genre: dict[str, Any] = {}
+    for k in r.items():
+        if k == "missions" and r.peek() == "[":
+            genre[k] = [r.value() for _ in r.elements()]
+        else:
+            genre[k] = r.value()
+    return genre
+
+
+def iter_genres(fp: TextIO) -> Iterator[Any]:
+    """データファイルのジャンルを1つずつ返す（"genres" 以外のキーは読み飛ばす）"""
+    r = _Reader(fp)
+    for k in r.items():
+        if k == "genres" and r.peek() == "[":
+            for _ in r.elements():
+                yield _read_genre(r)
+        else:
+            r.value()
+
+
+def load(fp: TextIO) -> dict[str, Any]:
+    """データファイル全体を読み込む（json.load と同じ結果）"""
+    r = _Reader(fp)
+    if r.peek() != "{":
+        return r.value()
+    data: dict[str, Any] = {}
+    for k in r.items():
+        if k == "genres" and r.peek() == "[":
+            data[k] = [_read_genre(r) for _ in r.elements()]
+        else:
+            data[k] = r.value()
+    return data
+
+
+class _Writer:
+    """json.dumps(..., indent=2) / 区切りの空白なしの出力を、値を小分けにして書き出す"""
+
+    def __init__(self, write: Callable[[str], Any], pretty: bool) -> None:
+        self.write = write
+        self.pretty = pretty
+
+    def newline(self, depth: int) -> None:
+        if self.pretty:
+            self.write("\n" + "  " * depth)
+
+    def key(self, k: str) -> None:
+        self.write(json.dumps(k, ensure_ascii=False) + (": " if self.pretty else ":"))
+
+    def value(self, v: Any, depth: int) -> None:
+        # 省メモリの Task / Mission（compact.py）は json_default で dict として書く
+        if self.pretty:
+            self.write(json.dumps(v, ensure_ascii=False, indent=2, default=json_default)
+                       .replace("\n", "\n" + "  " * depth))
+        else:
+            self.write(json.dumps(v, ensure_ascii=False, separators=(",", ":"), default=json_default))
+
+    def array(self, items: Iterable[Any], depth: int, write_item: Callable[[Any, int], None]) -> None:
+        self.write("[")
+        empty = True
+        for item in items:
+            self.write("" if empty else ",")
+            self.newline(depth + 1)
+            write_item(item, depth + 1)
+            empty = False
+        if not empty:
+            self.newline(depth)
+        self.write("]")
+
+    def obj(self, pairs: Iterable[tuple[str, Any]], depth: int,
+            write_value: Callable[[str, Any, int], None]) -> None:
+        self.write("{")
+        empty = True
+        for k, v in pairs:
+            self.write("" if empty else ",")
+            self.newline(depth + 1)
+            self.key(k)
+            write_value(k, v, depth + 1)
+            empty = False
+        if not empty:
+            self.newline(depth)
+        self.write("}")
+
+    def genre(self, g: Any, depth: int) -> None:
+        if not isinstance(g, dict):
+            self.value(g, depth)
+            return
+
+        def write_value(k: str, v: Any, d: int) -> None:
+            if k == "missions" and isinstance(v, list):
+                self.array(v, d, self.value)
+            else:
+                self.value(v, d)
+        self.obj(g.items(), depth, write_value)
+
+
+def dump_genres(fp: TextIO, genres: Iterable[GenreDict], pretty: bool = False,
+                extra: Optional[dict[str, Any]] = None) -> None:
+    """
+    {"genres": [...], **extra} を書き出す。genres はジェネレータでもよい（全体をリストにしない）。
+    pretty=True なら json.dumps(indent=2) と同じ整形、既定は空白なしの出力。
+    """
+    w = _Writer(fp.write, pretty)
+
+    def write_value(k: str, v: Any, d: int) -> None:
+        if k == "genres":
+            w.array(v, d, w.genre)
+        else:
+            w.value(v, d)
+    w.obj([("genres", genres), *(extra or {}).items()], 0, write_value)
+
+
+def write_file(path: Path | str, genres: Iterable[GenreDict], pretty: bool = False,
+               extra: Optional[dict[str, Any]] = None) -> None:
+    """一時ファイルに書き出してから置き換える（書き込み途中で落ちても元のファイルは壊れない）"""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            dump_genres(f, genres, pretty, extra)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def read_file(path: Path | str) -> dict[str, Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return load(f)
@@ -1,9 +1,13 @@
 from __future__ import annotations
+import uuid
 from datetime import date
-from typing import TypedDict, NotRequired
+from collections.abc import Mapping
+from typing import Any, TypedDict, NotRequired
 
 # 型定義
+# id は永続的な識別子（読み込み時に未設定なら ensure_ids で付与）
 class TaskDict(TypedDict):
+    id: NotRequired[str]
     name: str
     done: bool
     completed_at: NotRequired[str | None]
@@ -11,6 +15,7 @@ class TaskDict(TypedDict):
 
 
 class MissionDict(TypedDict):
+    id: NotRequired[str]
     name: str
     tasks: list[TaskDict]
     due_date: NotRequired[str | None]
@@ -19,21 +24,49 @@ class MissionDict(TypedDict):
 
 
 class GenreDict(TypedDict):
+    id: NotRequired[str]
     name: str
     missions: list[MissionDict]
     summary: NotRequired[str | None]
 
 
+def new_id() -> str:
+    return uuid.uuid4().hex
+
+
 def new_task(name: str) -> TaskDict:
-    return {"name": name, "done": False, "completed_at": None, "due_date": None}
+    return {"id": new_id(), "name": name, "done": False, "completed_at": None, "due_date": None}
 
 
 def new_mission(name: str) -> MissionDict:
-    return {"name": name, "tasks": [], "due_date": None, "completed_at": None, "summary": None}
+    return {"id": new_id(), "name": name, "tasks": [], "due_date": None, "completed_at": None, "summary": None}
 
 
 def new_genre(name: str, summary: str | None = None) -> GenreDict:
-    return {"name": name, "missions": [], "summary": summary or None}
+    return {"id": new_id(), "name": name, "missions": [], "summary": summary or None}
+
+
+def ensure_ids(genres: list[GenreDict]) -> bool:
+    """id が未設定・重複しているエンティティに新しい id を付与する。付与した場合は True"""
+    seen: set[str] = set()
+    changed = False
+
+    def visit(entity: Any) -> None:
+        nonlocal changed
+        entity_id = entity.get("id")
+        if not isinstance(entity_id, str) or not entity_id or entity_id in seen:
+            entity_id = new_id()
+            entity["id"] = entity_id
+            changed = True
+        seen.add(entity_id)
+
+    for g in genres:
+        visit(g)
+        for m in g.get("missions", []):
+            visit(m)
+            for t in m.get("tasks", []):
+                visit(t)
+    return changed
 
 
 def mission_progress(m: MissionDict) -> float:
@@ -41,14 +74,14 @@ def mission_progress(m: MissionDict) -> float:
     tasks: list[TaskDict] = m.get("tasks", [])
     if not isinstance(tasks, list) or not tasks:
         return 0.0
-    done = sum(1 for t in tasks if isinstance(t, dict) and t.get("done", False))
+    done = sum(1 for t in tasks if isinstance(t, Mapping) and t.get("done", False))
     return done / len(tasks)
 
 
 def count_incomplete_missions(genre: GenreDict) -> int:
     """ジャンル内の未完了ミッション数を返す（mission_progress < 1.0 のもの）"""
     missions = genre.get("missions", [])
-    return sum(1 for m in missions if isinstance(m, dict) and mission_progress(m) < 1.0)
+    return sum(1 for m in missions if isinstance(m, Mapping) and mission_progress(m) < 1.0)
 
 
 def _parse_due_date(text: str | None) -> date | None:
@@ -65,22 +98,45 @@ def _parse_due_date(text: str | None) -> date | None:
     return None
 
 
+# 期限未設定の日数（ソートで後ろへ回す）
+NO_DUE_DAYS = 99999
+
+
+def due_ordinal(text: str | None) -> int | None:
+    """YYYY-MM-DD 形式を日付の序数（date.toordinal）に変換。無効な場合は None"""
+    due = _parse_due_date(text)
+    return due.toordinal() if due is not None else None
+
+
+def today_ordinal() -> int:
+    """今日の日付の序数。ソート1回につき1度だけ取得して各キーに渡す"""
+    return date.today().toordinal()
+
+
+def days_until(due_ord: int | None, today: int) -> int:
+    """期限までの日数（序数同士の差）。過去は負、今日は0、未設定は大きな値（後ろへ）"""
+    if due_ord is None:
+        return NO_DUE_DAYS
+    return due_ord - today
+
+
 def _days_until_due(due: date | None) -> int:
     """期限までの日数。過去は負、今日は0、未設定は大きな値（後ろへ）"""
-    if due is None:
-        return 99999
-    return (due - date.today()).days
+    return days_until(due.toordinal() if due is not None else None, today_ordinal())
 
 
-def mission_sort_key(m: MissionDict, idx: int) -> tuple[int, int, int]:
-    """ソート用キー: 未完了かつ期限が近いものを上に。(完了済み, 日数, 元インデックス)"""
-    completed = 1 if mission_progress(m) >= 1.0 else 0
-    days = _days_until_due(_parse_due_date(m.get("due_date")))
+def mission_sort_key(m: MissionDict, idx: int, progress: float | None = None, today: int | None = None) -> tuple[int, int, int]:
+    """ソート用キー: 未完了かつ期限が近いものを上に。(完了済み, 日数, 元インデックス)
+    progress を渡すとタスクの走査を省略する（AppService.mission_progress の値）"""
+    if progress is None:
+        progress = mission_progress(m)
+    completed = 1 if progress >= 1.0 else 0
+    days = days_until(due_ordinal(m.get("due_date")), today if today is not None else today_ordinal())
     return (completed, days, idx)
 
 
-def task_sort_key(t: TaskDict, idx: int) -> tuple[int, int, int]:
+def task_sort_key(t: TaskDict, idx: int, today: int | None = None) -> tuple[int, int, int]:
     """ソート用キー: 未完了かつ期限が近いものを上に。(完了済み, 日数, 元インデックス)"""
     done = 1 if t.get("done", False) else 0
-    days = _days_until_due(_parse_due_date(t.get("due_date")))
+    days = days_until(due_ordinal(t.get("due_date")), today if today is not None else today_ordinal())
     return (done, days, idx)
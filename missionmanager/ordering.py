@@ -0,0 +1,64 @@
+"""キー順に整列した id 列（並び順の差分更新用）"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any, Optional
+
+
+class OrderedIndex:
+    """
+    (キー, id) を昇順に保持する列。
+    挿入・削除・キー変更は二分探索で1要素の位置だけを直し、全体の再ソートは行わない。
+    キーは要素ごとに一意であること（末尾に通し番号などを含める）。
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[Any, ...]] = []
+        self._ids: list[str] = []
+        self._key_of: dict[str, tuple[Any, ...]] = {}
+        self.next_seq = 0   # 手動順序の通し番号（呼び出し側が採番に使う）
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._key_of
+
+    def key_of(self, item_id: str) -> Optional[tuple[Any, ...]]:
+        return self._key_of.get(item_id)
+
+    def insert(self, item_id: str, key: tuple[Any, ...]) -> int:
+        """要素を追加し、その位置を返す"""
+        pos = bisect_left(self._keys, key)
+        self._keys.insert(pos, key)
+        self._ids.insert(pos, item_id)
+        self._key_of[item_id] = key
+        return pos
+
+    def remove(self, item_id: str) -> int:
+        """要素を削除し、削除前の位置を返す"""
+        pos = self.position(item_id)
+        del self._keys[pos]
+        del self._ids[pos]
+        del self._key_of[item_id]
+        return pos
+
+    def update(self, item_id: str, key: tuple[Any, ...]) -> tuple[int, int]:
+        """キーを変更して位置を直す。(旧位置, 新位置) を返す"""
+        if self._key_of.get(item_id) == key:
+            pos = self.position(item_id)
+            return pos, pos
+        old = self.remove(item_id)
+        return old, self.insert(item_id, key)
+
+    def bisect(self, key: tuple[Any, ...]) -> int:
+        """key より小さいキーの要素数（キーの先頭部分だけを渡すと、その値より前の要素数）"""
+        return bisect_left(self._keys, key)
+
+    def position(self, item_id: str) -> int:
+        """整列順での位置"""
+        key = self._key_of[item_id]
+        return bisect_left(self._keys, key)
+
+    def ids(self, start: int = 0, stop: Optional[int] = None) -> list[str]:
+        """整列順で start から stop までの id"""
+        return self._ids[start:stop]
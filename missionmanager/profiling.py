@@ -0,0 +1,237 @@
+"""
+処理時間の計測（--profile または環境変数 MISSIONMANAGER_PROFILE で有効）。
+有効にした時だけ AppService の変更メソッド・ストレージの読み書き・UI の描画処理を計測用の関数で包む。
+無効なら何も置き換えないので、通常の実行には計測のコストがかからない。
+記録するのは 呼び出し回数・合計/最大時間・時間の分布（ヒストグラム）・書き込んだバイト数。
+"""
+from __future__ import annotations
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Sequence, TypedDict
+
+PROFILE_FLAG = "--profile"
+ENV_VAR = "MISSIONMANAGER_PROFILE"
+# 操作の応答時間の計測（ui/latency.py）の指定。Qt を読み込まずに判定できるようここに置く
+LATENCY_FLAG = "--latency"
+LATENCY_ENV_VAR = "MISSIONMANAGER_LATENCY"
+DEFAULT_LATENCY_MS = 50.0
+
+# ヒストグラムの区間の上限（ms）。最後の区間は上限なし
+BUCKETS_MS: tuple[float, ...] = (0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000)
+
+
+class CallStats(TypedDict):
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    histogram: dict[str, int]   # "<=1ms" -> 回数（最後は ">1000ms"）
+    bytes: int
+
+
+def bucket_labels() -> list[str]:
+    return [f"<={b:g}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]:g}ms"]
+
+
+def profile_target(argv: Sequence[str]) -> Optional[str]:
+    """
+    計測の出力先を返す（None: 計測しない / "-": 終了時に標準エラーへ表 / それ以外: 終了時にその JSON ファイルへ）。
+    環境変数の値が 1 以外ならファイルのパスとみなす
+    """
+    value = os.environ.get(ENV_VAR, "").strip()
+    if value and value not in ("0", "1"):
+        return value
+    if value == "1" or PROFILE_FLAG in argv:
+        return "-"
+    return None
+
+
+def latency_threshold(argv: Sequence[str]) -> Optional[float]:
+    """操作の応答時間の計測で停止とみなすしきい値（ms）。計測しない場合は None"""
+    value = os.environ.get(LATENCY_ENV_VAR, "").strip()
+    if value and value != "0":
+        try:
+            return float(value)
+        except ValueError:
+            return DEFAULT_LATENCY_MS
+    if LATENCY_FLAG in argv:
+        return DEFAULT_LATENCY_MS
+    return None
+
+
+class _Entry:
+    __slots__ = ("count", "total", "max", "buckets", "bytes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.bytes = 0
+
+
+class Profiler:
+    """計測結果の集計（保存スレッドからも記録されるのでロックで守る）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def record(self, name: str, seconds: float, written: int = 0) -> None:
+        ms = seconds * 1000
+        bucket = len(BUCKETS_MS)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                bucket = i
+                break
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry()
+            entry.count += 1
+            entry.total += ms
+            entry.max = max(entry.max, ms)
+            entry.buckets[bucket] += 1
+            entry.bytes += written
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict[str, CallStats]:
+        labels = bucket_labels()
+        with self._lock:
+            return {
+                name: {
+                    "count": e.count,
+                    "total_ms": round(e.total, 3),
+                    "mean_ms": round(e.total / e.count, 3),
+                    "max_ms": round(e.max, 3),
+                    "histogram": {label: n for label, n in zip(labels, e.buckets) if n},
+                    "bytes": e.bytes,
+                }
+                for name, e in sorted(self._entries.items())
+            }
+
+    def format(self) -> str:
+        """合計時間の多い順の表"""
+        stats = self.snapshot()
+        lines = [f"{'name':<44} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'bytes':>11}"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]["total_ms"]):
+            written = f"{s['bytes']:,}" if s["bytes"] else "-"
+            lines.append(f"{name:<44} {s['count']:>7} {s['total_ms']:>10.1f} {s['mean_ms']:>9.3f} "
+                         f"{s['max_ms']:>9.1f} {written:>11}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, target: str) -> None:
+        """"-" なら標準エラーに表、それ以外はそのパスに JSON で書く"""
+        if target == "-":
+            sys.stderr.write("profile:\n" + self.format())
+            return
+        Path(target).write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+_profiler: Optional[Profiler] = None
+
+
+def current() -> Optional[Profiler]:
+    """有効な計測（install していなければ None）"""
+    return _profiler
+
+
+# ---------- 計測用の関数で包む ----------
+def _timed(profiler: Profiler, name: str, fn: Callable[..., Any],
+           written: Optional[Callable[[tuple[Any, ...], Any], int]] = None) -> Callable[..., Any]:
+    # written は呼び出し前に (args, None) で前の状態を、呼び出し後に (args, 前の状態) で書き込んだバイト数を返す
+    if getattr(fn, "__profiled__", False):
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        before = written(args, None) if written is not None else 0
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            n = written(args, before) if written is not None else 0
+            profiler.record(name, elapsed, n)
+    wrapper.__profiled__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def wrap_methods(cls: type, names: Iterable[str], prefix: str,
+                 written: Optional[dict[str, Callable[[tuple[Any, ...], Any], int]]] = None) -> None:
+    """cls 自身が定義しているメソッドを計測用に置き換える（"prefix.メソッド名" で記録）"""
+    profiler = _profiler
+    if profiler is None:
+        return
+    for name in names:
+        fn = cls.__dict__.get(name)
+        if callable(fn):
+            setattr(cls, name, _timed(profiler, f"{prefix}.{name}", fn, (written or {}).get(name)))
+
+
+def _size(path: Any) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _file_written(path_of: Callable[[tuple[Any, ...]], Any]) -> Callable[[tuple[Any, ...], Any], int]:
+    """書き出したファイルの大きさ（呼び出し後に測る）"""
+    def measure(args: tuple[Any, ...], before: Any) -> int:
+        return 0 if before is None else _size(path_of(args))
+    return measure
+
+
+def _file_growth(path_of: Callable[[tuple[Any, ...]], Any]) -> Callable[[tuple[Any, ...], Any], int]:
+    """追記したバイト数（呼び出し前後のファイルの大きさの差。切り詰められた場合は 0）"""
+    def measure(args: tuple[Any, ...], before: Any) -> int:
+        size = _size(path_of(args))
+        return size if before is None else max(0, size - before)
+    return measure
+
+
+def install() -> Profiler:
+    """
+    AppService の変更メソッドとストレージの読み書きを計測する（UI は ui.stats_panel.install）。
+    プロセスで一度だけ、AppService・ストレージを作る前に呼ぶ
+    """
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    _profiler = Profiler()
+    from missionmanager import jsonstream
+    from missionmanager.app import AppService
+    from missionmanager.storage import JournalStorage, JsonStorage
+    from missionmanager.sharded_storage import ShardedJsonStorage
+    from missionmanager.sqlite_storage import SqliteStorage
+
+    mutations = [name for name, fn in vars(AppService).items() if getattr(fn, "is_mutation", False)]
+    wrap_methods(AppService, mutations, "service")
+    wrap_methods(AppService, ["__init__", "sorted_missions", "sorted_tasks"], "service")
+
+    storage_calls = ["load_genres", "save_genres", "apply_changes", "load_genre_headers", "load_genre"]
+    wrap_methods(JsonStorage, storage_calls, "storage.json")
+    wrap_methods(JournalStorage, storage_calls, "storage.journal", {
+        "apply_changes": _file_growth(lambda args: args[0].journal_path),
+    })
+    wrap_methods(ShardedJsonStorage, storage_calls, "storage.sharded")
+    # SQLite はページ単位で WAL に書くので、WAL の増分を書き込み量とする（チェックポイント後は 0 から数え直し）
+    wrap_methods(SqliteStorage, storage_calls, "storage.sqlite", {
+        name: _file_growth(lambda args: f"{args[0].path}-wal") for name in ("save_genres", "apply_changes")
+    })
+
+    # JSON の書き出し（JsonStorage 全体・ジャーナルの圧縮）とシャード1つの書き出し
+    jsonstream.write_file = _timed(_profiler, "write.jsonstream", jsonstream.write_file,  # type: ignore[assignment]
+                                   _file_written(lambda args: args[0]))
+    wrap_methods(ShardedJsonStorage, ["_write_json"], "write.sharded",
+                 {"_write_json": _file_written(lambda args: args[1])})
+    return _profiler
@@ -0,0 +1,102 @@
+"""変更をまとめて別スレッドで保存するスケジューラ"""
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Optional
+from missionmanager.storage import Change, StorageError
+
+
+class SaveScheduler:
+    """
+    AppService の保存要求をまとめて遅延実行する。
+    - mark_dirty() で変更レコードを溜め、最後の変更から delay 秒操作が止まったら1回だけ書き込む
+    - 書き込み（シリアライズ + I/O）はワーカースレッドで行う
+    - データとの整合性のため、書き込み中は AppService と共有するロックを保持する
+    - flush() で未保存の変更を呼び出し元スレッドで即座に書き込み、永続化を待てる
+    """
+
+    def __init__(self, write: Callable[[list[Change]], None], lock: threading.RLock, delay: float = 0.5) -> None:
+        self._write = write
+        self._lock = lock                          # AppService のデータロック
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending: list[Change] = []
+        self._full = False                         # 変更レコードなしの保存要求（全体保存）があったか
+        self._dirty = False
+        self._last_mark = 0.0
+        self._closed = False
+        self.last_error: Optional[StorageError] = None
+        self._thread = threading.Thread(target=self._run, name="SaveScheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        with self._cond:
+            return self._dirty
+
+    def mark_dirty(self, changes: list[Change]) -> None:
+        """変更を登録し、静止期間のタイマーをリセットする。空リストは全体保存の要求"""
+        with self._cond:
+            if self._closed:
+                raise StorageError("保存スケジューラは終了しています")
+            self._pending.extend(changes)
+            self._full = self._full or not changes
+            self._dirty = True
+            self._last_mark = time.monotonic()
+            self._cond.notify()
+
+    def _write_pending(self) -> None:
+        """溜まった変更を書き込む（呼び出し元はデータロックを保持していること）"""
+        with self._cond:
+            if not self._dirty:
+                return
+            changes, self._pending = self._pending, []
+            full, self._full = self._full, False
+            self._dirty = False
+        try:
+            self._write([] if full else changes)
+        except StorageError as e:
+            # 失敗した変更は戻して次回に再試行する
+            with self._cond:
+                self._pending[:0] = changes
+                self._full = self._full or full
+                self._dirty = True
+                self.last_error = e
+            raise
+        self.last_error = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._dirty:
+                        remaining = self._last_mark + self.delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+            with self._lock:
+                try:
+                    self._write_pending()
+                except StorageError:
+                    # last_error に記録済み。次の変更か flush() で再試行する
+                    with self._cond:
+                        self._last_mark = time.monotonic()
+
+    def flush(self) -> None:
+        """未保存の変更を今すぐ書き込み、完了まで待つ。失敗時は StorageError"""
+        with self._lock:
+            self._write_pending()
+
+    def close(self) -> None:
+        """未保存の変更を書き込んでワーカースレッドを停止する"""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify()
+            self._thread.join()
@@ -0,0 +1,185 @@
+"""ジャンル・ミッション・タスクの名前と概要の全文検索"""
+from __future__ import annotations
+import unicodedata
+from typing import Any, Literal, Optional, TypedDict
+from missionmanager.app import AppService
+from missionmanager import events as ev
+from missionmanager.events import Event
+
+# 階層ごとの種別と子リストのキー
+_KINDS: tuple[Literal["genre", "mission", "task"], ...] = ("genre", "mission", "task")
+_CHILD_KEYS = ("missions", "tasks", None)
+_ADDED = {ev.GENRE_ADDED: 0, ev.MISSION_ADDED: 1, ev.TASK_ADDED: 2}
+_UPDATED = {ev.GENRE_UPDATED, ev.MISSION_UPDATED, ev.TASK_UPDATED}
+_DELETED = {ev.GENRE_DELETED, ev.MISSION_DELETED, ev.TASK_DELETED}
+
+
+class SearchHit(TypedDict):
+    id: str
+    kind: Literal["genre", "mission", "task"]
+    name: str
+    parent_id: Optional[str]
+    genre_id: str
+
+
+def normalize(text: str) -> str:
+    """全角/半角・大文字/小文字の違いを吸収する"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _grams(text: str) -> set[str]:
+    """連続する2文字（bigram）。分かち書きのない日本語もそのまま部分一致で引ける"""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """
+    名前と概要（summary）の転置索引（階層ごとに 文字 bigram -> 要素 id の並び）。
+    - 作成時に AppService の現在のデータから作り、以後は変更イベントで差分更新する（作り直さない）
+    - 検索は一番短い bigram の並びを先頭から見て、他の bigram を含み正規化した本文に全語が
+      部分一致するものを limit 件集めたら打ち切る（よくある語でも全件は調べない）
+    - 1文字の語は bigram を作れないので、その階層の要素を順に本文で確かめる
+    - 遅延読み込みのジャンルは読み込んだ時点（GENRE_LOADED）で中身を索引に加え、手放した後も残す
+      （ヒットした要素はジャンルを読み込めば find_by_id で引ける）
+    """
+
+    def __init__(self, service: AppService) -> None:
+        self._service = service
+        # 階層ごと（0: ジャンル, 1: ミッション, 2: タスク）の bigram -> id の並び（dict を順序付き集合として使う）
+        self._postings: tuple[dict[str, dict[str, None]], ...] = ({}, {}, {})
+        self._ids: tuple[dict[str, None], ...] = ({}, {}, {})   # 階層ごとの全 id（索引に加えた順）
+        self._text: dict[str, str] = {}                 # id -> 正規化した「名前\n概要」
+        self._fields: dict[str, tuple[str, str]] = {}   # id -> (名前, 概要)
+        self._level: dict[str, int] = {}
+        self._parent: dict[str, Optional[str]] = {}
+        self._genre: dict[str, str] = {}
+        self._children: dict[str, set[str]] = {}
+        for g in service.genres:
+            self._add_tree(g, None, g["id"], 0)
+        self._unsubscribe = service.events.subscribe(self._on_event)
+
+    def close(self) -> None:
+        """変更イベントの購読をやめる"""
+        self._unsubscribe()
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    # ---------- 索引の更新 ----------
+    def _set_text(self, eid: str, level: int, name: str, summary: str) -> None:
+        old = self._text.get(eid)
+        text = normalize(f"{name}\n{summary}")
+        self._fields[eid] = (name, summary)
+        if old == text:
+            return
+        postings = self._postings[level]
+        new_grams = _grams(text)
+        if old is not None:
+            old_grams = _grams(old)
+            self._discard(postings, eid, old_grams - new_grams)
+            new_grams -= old_grams
+        for gram in new_grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {eid: None}
+            else:
+                ids[eid] = None
+        self._text[eid] = text
+
+    @staticmethod
+    def _discard(postings: dict[str, dict[str, None]], eid: str, grams: set[str]) -> None:
+        for gram in grams:
+            ids = postings[gram]
+            del ids[eid]
+            if not ids:
+                del postings[gram]
+
+    def _add_tree(self, entity: Any, parent_id: Optional[str], genre_id: str, level: int) -> None:
+        eid = entity["id"]
+        if eid in self._text:
+            # 読み込み直したジャンルの要素などは入れ直す
+            self._remove_tree(eid)
+        self._set_text(eid, level, entity.get("name") or "", entity.get("summary") or "")
+        self._ids[level][eid] = None
+        self._level[eid] = level
+        self._parent[eid] = parent_id
+        self._genre[eid] = genre_id
+        self._children[eid] = set()
+        if parent_id is not None and parent_id in self._children:
+            self._children[parent_id].add(eid)
+        child_key = _CHILD_KEYS[level]
+        if child_key is not None:
+            for child in entity.get(child_key) or []:
+                self._add_tree(child, eid, genre_id, level + 1)
+
+    def _remove_tree(self, eid: str) -> None:
+        if eid not in self._text:
+            return
+        for child in list(self._children.get(eid, ())):
+            self._remove_tree(child)
+        level = self._level.pop(eid)
+        self._discard(self._postings[level], eid, _grams(self._text.pop(eid)))
+        del self._ids[level][eid]
+        parent_id = self._parent.pop(eid)
+        if parent_id is not None and parent_id in self._children:
+            self._children[parent_id].discard(eid)
+        for table in (self._fields, self._genre, self._children):
+            table.pop(eid, None)
+
+    def _on_event(self, event: Event) -> None:
+        kind = event["kind"]
+        if kind in _ADDED:
+            self._add_tree(event["fields"], event["parent_id"], event["genre_id"], _ADDED[kind])
+        elif kind in _UPDATED:
+            fields = event["fields"]
+            if event["id"] in self._fields and ("name" in fields or "summary" in fields):
+                name, summary = self._fields[event["id"]]
+                self._set_text(event["id"], self._level[event["id"]],
+                               fields.get("name", name) or "", fields.get("summary", summary) or "")
+        elif kind in _DELETED:
+            self._remove_tree(event["id"])
+        elif kind == ev.GENRE_LOADED:
+            g = self._service.find_by_id(event["id"])
+            if g is not None:
+                for m in g.get("missions", []):
+                    self._add_tree(m, g["id"], g["id"], 1)
+
+    # ---------- 検索 ----------
+    def search(self, query: str, limit: int = 50) -> list[SearchHit]:
+        """
+        空白区切りの全語を名前か概要に含む要素を返す（ジャンル → ミッション → タスクの順、最大 limit 件）
+        """
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        grams: set[str] = set()
+        for term in terms:
+            grams |= _grams(term)
+        text = self._text
+        found: list[str] = []
+        for level in range(len(self._postings)):
+            postings = self._postings[level]
+            if grams:
+                lists = [postings.get(gram) for gram in grams]
+                if not all(lists):
+                    continue
+                lists.sort(key=len)  # type: ignore[arg-type]
+                first: dict[str, None] = lists[0]  # type: ignore[assignment]
+                rest = lists[1:]
+            else:
+                first, rest = self._ids[level], []
+            for eid in first:
+                if all(eid in ids for ids in rest) and all(term in text[eid] for term in terms):  # type: ignore[operator]
+                    found.append(eid)
+                    if len(found) >= limit:
+                        return [self.hit(eid) for eid in found]
+        return [self.hit(eid) for eid in found]
+
+    def hit(self, eid: str) -> SearchHit:
+        return {
+            "id": eid,
+            "kind": _KINDS[self._level[eid]],
+            "name": self._fields[eid][0],
+            "parent_id": self._parent[eid],
+            "genre_id": self._genre[eid],
+        }
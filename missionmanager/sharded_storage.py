@@ -0,0 +1,237 @@
+"""ジャンルごとのファイルに分割して保存するストレージ"""
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any
+from missionmanager.compact import json_default
+from missionmanager.models import GenreDict, ensure_ids, count_incomplete_missions
+from missionmanager.storage import Change, GenreHeader, JsonStorage, StorageError, validate_genres
+
+_MANIFEST = "manifest.json"
+
+
+class ShardedJsonStorage:
+    """
+    マニフェスト + ジャンルごとの JSON ファイル（シャード）によるストレージ
+    - マニフェストはジャンルの並び・各シャードのファイル名・見出し（名前・概要・未完了数）を持つ
+    - load_genre_headers / load_genre でジャンルごとに遅延読み込みできる（LazyStorageProtocol）
+    - apply_changes では変更レコードが触れたジャンルのシャードだけを書き直す（書き込み量は触れたジャンルに比例）
+    - シャードは版ごとに別名で書き、マニフェストの置き換え（os.replace）でまとめて切り替える
+      → ジャンル間の移動など複数シャードにまたがる変更も、途中で落ちたら全体が変更前のまま
+    - 初回起動時、既存の app_data.json があれば一度だけ取り込む
+    - 既定は空白なしの出力、pretty=True でインデント付き（JsonStorage と同じ）
+    """
+
+    def __init__(self, directory: Path | str | None = None, import_json: Path | str | None = None,
+                 pretty: bool = False) -> None:
+        project_root = Path(__file__).parent.parent
+        data_dir: Path = project_root / "data"
+        self.directory: Path = Path(directory) if directory is not None else data_dir / "shards"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise StorageError(f"データディレクトリの作成に失敗しました: {e}")
+        self.manifest_path: Path = self.directory / _MANIFEST
+        self.pretty = pretty
+        # ジャンル id -> 現在のシャードのファイル名（マニフェストの並び順）と見出し
+        self._files: dict[str, str] = {}
+        self._headers: dict[str, GenreHeader] = {}
+        self._order: list[str] | None = None
+        self._rev = 0   # シャードのファイル名に付ける通し番号
+        self._failed = False   # 前回の書き込みが失敗した（次回は全シャードを書き直す）
+        if not self.manifest_path.exists():
+            json_path = Path(import_json) if import_json is not None else data_dir / "app_data.json"
+            genres: list[GenreDict] = []
+            if json_path.exists():
+                genres = JsonStorage(json_path).load_genres()
+                ensure_ids(genres)
+            self.save_genres(genres)
+
+    # ---------- ファイル ----------
+    def _read_json(self, path: Path) -> Any:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except OSError as e:
+            raise StorageError(f"ファイルの読み込みに失敗しました ({path}): {e}")
+        except json.JSONDecodeError as e:
+            raise StorageError(f"JSONの解析に失敗しました ({path}): {e}")
+
+    def _write_json(self, path: Path, data: Any) -> None:
+        try:
+            if self.pretty:
+                text = json.dumps(data, ensure_ascii=False, indent=2, default=json_default)
+            else:
+                text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default)
+            path.write_text(text, encoding="utf-8")
+        except OSError as e:
+            raise StorageError(f"ファイルの書き込みに失敗しました ({path}): {e}")
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"データのシリアライズに失敗しました: {e}")
+
+    def _read_manifest(self) -> list[dict[str, Any]]:
+        raw = self._read_json(self.manifest_path)
+        entries = raw.get("genres") if isinstance(raw, dict) else None
+        if not isinstance(entries, list):
+            raise StorageError(f"マニフェストの形式が不正です ({self.manifest_path})")
+        self._rev = int(raw.get("rev", 0))
+        return [e for e in entries if isinstance(e, dict) and isinstance(e.get("id"), str) and isinstance(e.get("file"), str)]
+
+    def _remove_orphans(self) -> None:
+        """マニフェストから参照されていないシャード（書き込み途中で落ちた残りなど）を消す"""
+        alive = set(self._files.values())
+        for path in self.directory.glob("*.json*"):
+            if path.name != _MANIFEST and path.name not in alive:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _read_shard(self, file: str) -> GenreDict | None:
+        valid = validate_genres([self._read_json(self.directory / file)])
+        return valid[0] if valid else None
+
+    @staticmethod
+    def _header(g: GenreDict) -> GenreHeader:
+        return {
+            "id": g["id"],
+            "name": g.get("name", ""),
+            "summary": g.get("summary"),
+            "incomplete": count_incomplete_missions(g),
+        }
+
+    # ---------- StorageProtocol ----------
+    def load_genres(self) -> list[GenreDict]:
+        genres: list[GenreDict] = []
+        self._files = {}
+        self._headers = {}
+        for entry in self._read_manifest():
+            g = self._read_shard(entry["file"])
+            if g is None:
+                continue
+            genres.append(g)
+            self._files[entry["id"]] = entry["file"]
+            self._headers[entry["id"]] = self._header(g)
+        self._order = [g["id"] for g in genres]
+        self._remove_orphans()
+        return genres
+
+    # ---------- LazyStorageProtocol ----------
+    def load_genre_headers(self) -> list[GenreHeader]:
+        """マニフェストだけを読んでジャンルの見出しを返す（見出しのない古いマニフェストはシャードから求める）"""
+        self._files = {}
+        self._headers = {}
+        for entry in self._read_manifest():
+            if isinstance(entry.get("name"), str) and isinstance(entry.get("incomplete"), int):
+                header: GenreHeader = {
+                    "id": entry["id"],
+                    "name": entry["name"],
+                    "summary": entry.get("summary"),
+                    "incomplete": entry["incomplete"],
+                }
+            else:
+                g = self._read_shard(entry["file"])
+                if g is None:
+                    continue
+                header = self._header({**g, "id": entry["id"]})
+            self._files[entry["id"]] = entry["file"]
+            self._headers[entry["id"]] = header
+        self._order = list(self._files)
+        self._remove_orphans()
+        return list(self._headers.values())
+
+    def load_genre(self, genre_id: str) -> GenreDict:
+        """1ジャンル分のシャードを読む"""
+        if self._order is None:
+            self.load_genre_headers()
+        file = self._files.get(genre_id)
+        g = self._read_shard(file) if file is not None else None
+        if g is None:
+            raise StorageError(f"ジャンルのデータが見つかりません: {genre_id}")
+        return g
+
+    def save_genres(self, genres: list[GenreDict]) -> None:
+        if not isinstance(genres, list):
+            raise StorageError("genresはリストである必要があります")
+        self._commit(genres, {g.get("id") for g in genres})
+
+    def apply_changes(self, changes: list[Change], genres: list[GenreDict]) -> None:
+        """変更レコードからジャンルの並びの変化と書き直すジャンルを求め、そのシャードだけを書く"""
+        if not changes:
+            return
+        if self._order is None:
+            self.load_genres()
+        assert self._order is not None
+        order = list(self._order)
+        dirty: set[str] = set()
+        try:
+            for change in changes:
+                path = change["path"]
+                op = change["op"]
+                if len(path) > 1 or op == "update":
+                    dirty.add(order[path[0]])
+                elif op == "insert":
+                    order.insert(path[0], change["value"]["id"])
+                    dirty.add(change["value"]["id"])
+                elif op == "delete":
+                    del order[path[0]]
+                elif op == "swap":
+                    i, j = path[0], change["other"]
+                    order[i], order[j] = order[j], order[i]
+        except (IndexError, KeyError) as e:
+            raise StorageError(f"変更レコードを適用できません: {e}")
+        if self._failed or order != [g.get("id") for g in genres]:
+            # 前回の失敗で取りこぼした変更がある、または記録と実データの並びが食い違う場合は全体を書き直す
+            self.save_genres(genres)
+            return
+        self._commit(genres, dirty)
+
+    def _commit(self, genres: list[GenreDict], dirty: set[Any]) -> None:
+        """dirty のジャンルのシャードを新しい名前で書き、マニフェストを原子的に置き換える"""
+        files: dict[str, str] = {}
+        written: list[Path] = []
+        self._rev += 1
+        try:
+            headers: dict[str, GenreHeader] = {}
+            for g in genres:
+                gid = g.get("id")
+                if not isinstance(gid, str) or not gid:
+                    raise StorageError("ジャンルに id がありません")
+                if "missions" not in g and gid in self._files:
+                    # 未読み込みのジャンルは保存済みのシャードをそのまま使う
+                    files[gid] = self._files[gid]
+                    headers[gid] = self._headers[gid]
+                elif gid in dirty or gid not in self._files:
+                    files[gid] = f"{gid}.{self._rev}.json"
+                    self._write_json(self.directory / files[gid], g)
+                    written.append(self.directory / files[gid])
+                    headers[gid] = self._header(g)
+                else:
+                    files[gid] = self._files[gid]
+                    headers[gid] = self._headers[gid]
+            manifest = {"rev": self._rev, "genres": [{**headers[gid], "file": f} for gid, f in files.items()]}
+            tmp = self.manifest_path.with_suffix(".json.tmp")
+            self._write_json(tmp, manifest)
+            try:
+                os.replace(tmp, self.manifest_path)
+            except OSError as e:
+                raise StorageError(f"マニフェストの書き込みに失敗しました ({self.manifest_path}): {e}")
+        except StorageError:
+            # 切り替え前なので、書いたシャードを消せば変更前の状態のまま
+            self._failed = True
+            for path in written:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            raise
+        stale = set(self._files.values()) - set(files.values())
+        self._failed = False
+        self._files = files
+        self._headers = headers
+        self._order = list(files)
+        for name in stale:
+            try:
+                (self.directory / name).unlink()
+            except OSError:
+                pass
@@ -0,0 +1,314 @@
+"""SQLite によるストレージ（変更レコードを行単位の更新として反映）"""
+from __future__ import annotations
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable
+from missionmanager.models import GenreDict, MissionDict, TaskDict
+from missionmanager.storage import Change, JsonStorage, StorageError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS genres (
+    id      INTEGER PRIMARY KEY,
+    pos     INTEGER NOT NULL,
+    name    TEXT NOT NULL,
+    summary TEXT,
+    extra   TEXT
+);
+CREATE TABLE IF NOT EXISTS missions (
+    id           INTEGER PRIMARY KEY,
+    genre_id     INTEGER NOT NULL REFERENCES genres(id) ON DELETE CASCADE,
+    pos          INTEGER NOT NULL,
+    name         TEXT NOT NULL,
+    summary      TEXT,
+    due_date     TEXT,
+    completed_at TEXT,
+    extra        TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id           INTEGER PRIMARY KEY,
+    mission_id   INTEGER NOT NULL REFERENCES missions(id) ON DELETE CASCADE,
+    pos          INTEGER NOT NULL,
+    name         TEXT NOT NULL,
+    done         INTEGER NOT NULL DEFAULT 0,
+    due_date     TEXT,
+    completed_at TEXT,
+    extra        TEXT
+);
+CREATE INDEX IF NOT EXISTS genres_pos ON genres(pos);
+CREATE INDEX IF NOT EXISTS missions_parent_pos ON missions(genre_id, pos);
+CREATE INDEX IF NOT EXISTS tasks_parent_pos ON tasks(mission_id, pos);
+"""
+
+# 階層ごとの (テーブル名, 親IDの列名, 列として持つフィールド)。列にないフィールドは extra に JSON で保持
+_LEVELS: tuple[tuple[str, str | None, tuple[str, ...]], ...] = (
+    ("genres", None, ("name", "summary")),
+    ("missions", "genre_id", ("name", "summary", "due_date", "completed_at")),
+    ("tasks", "mission_id", ("name", "done", "due_date", "completed_at")),
+)
+_CHILD_KEYS = ("missions", "tasks", None)
+
+
+class SqliteStorage:
+    """
+    genres / missions / tasks テーブルに保存するストレージ（WAL モード）
+    - apply_changes で変更レコードを行単位の INSERT / UPDATE / DELETE に変換（編集コストはデータ量に依存しない）
+    - 初回起動時、既存の app_data.json があれば一度だけ取り込む
+    """
+
+    def __init__(self, path: Path | str | None = None, import_json: Path | str | None = None) -> None:
+        project_root = Path(__file__).parent.parent
+        data_dir: Path = project_root / "data"
+        # data ディレクトリは保存先の指定がない時だけ作る
+        if path is None:
+            try:
+                data_dir.mkdir(exist_ok=True)
+            except OSError as e:
+                raise StorageError(f"データディレクトリの作成に失敗しました: {e}")
+
+        self.path: Path = Path(path) if path is not None else data_dir / "app_data.sqlite3"
+        json_path = Path(import_json) if import_json is not None else data_dir / "app_data.json"
+        try:
+            # 保存はバックグラウンドスレッドからも行われる（AppService のロックで直列化済み）
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise StorageError(f"データベースを開けませんでした ({self.path}): {e}")
+        self._import_json_once(json_path)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---------- 取り込み ----------
+    def _import_json_once(self, json_path: Path) -> None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+        if row is not None:
+            return
+        genres: list[GenreDict] = []
+        if json_path.exists():
+            genres = JsonStorage(json_path).load_genres()
+        with self._transaction():
+            if genres:
+                self._insert_all(genres)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                (str(json_path) if genres else "",),
+            )
+
+    # ---------- 変換 ----------
+    @staticmethod
+    def _split(level: int, entity: dict[str, Any]) -> tuple[list[Any], str | None]:
+        """エンティティを (列の値, extra JSON) に分解"""
+        _, _, columns = _LEVELS[level]
+        child_key = _CHILD_KEYS[level]
+        values = [entity.get(c) for c in columns]
+        if level == 2:
+            values[columns.index("done")] = 1 if entity.get("done") else 0
+        extra = {k: v for k, v in entity.items() if k not in columns and k != child_key}
+        return values, (json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    @staticmethod
+    def _join(level: int, row: sqlite3.Row | tuple[Any, ...]) -> dict[str, Any]:
+        """(id, parent, pos, 列..., extra) の行をエンティティの辞書に戻す"""
+        _, _, columns = _LEVELS[level]
+        entity: dict[str, Any] = dict(zip(columns, row[3:3 + len(columns)]))
+        if level == 2:
+            entity["done"] = bool(entity["done"])
+        extra = row[3 + len(columns)]
+        if extra:
+            entity.update(json.loads(extra))
+        child_key = _CHILD_KEYS[level]
+        if child_key is not None:
+            entity[child_key] = []
+        return entity
+
+    # ---------- StorageProtocol ----------
+    def load_genres(self) -> list[GenreDict]:
+        try:
+            genre_rows = self._conn.execute(
+                "SELECT id, NULL, pos, name, summary, extra FROM genres ORDER BY pos"
+            ).fetchall()
+            mission_rows = self._conn.execute(
+                "SELECT id, genre_id, pos, name, summary, due_date, completed_at, extra"
+                " FROM missions ORDER BY genre_id, pos"
+            ).fetchall()
+            task_rows = self._conn.execute(
+                "SELECT id, mission_id, pos, name, done, due_date, completed_at, extra"
+                " FROM tasks ORDER BY mission_id, pos"
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise StorageError(f"データベースの読み込みに失敗しました ({self.path}): {e}")
+        genres: list[GenreDict] = []
+        genre_by_id: dict[int, GenreDict] = {}
+        for row in genre_rows:
+            g: GenreDict = self._join(0, row)  # type: ignore[assignment]
+            genres.append(g)
+            genre_by_id[row[0]] = g
+        mission_by_id: dict[int, MissionDict] = {}
+        for row in mission_rows:
+            m: MissionDict = self._join(1, row)  # type: ignore[assignment]
+            genre_by_id[row[1]]["missions"].append(m)
+            mission_by_id[row[0]] = m
+        for row in task_rows:
+            t: TaskDict = self._join(2, row)  # type: ignore[assignment]
+            mission_by_id[row[1]]["tasks"].append(t)
+        return genres
+
+    def save_genres(self, genres: list[GenreDict]) -> None:
+        if not isinstance(genres, list):
+            raise StorageError("genresはリストである必要があります")
+        try:
+            with self._transaction():
+                self._conn.execute("DELETE FROM genres")
+                self._insert_all(genres)
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"データのシリアライズに失敗しました: {e}")
+
+    def apply_changes(self, changes: list[Change], genres: list[GenreDict]) -> None:
+        """変更レコードを1トランザクションで行単位に反映（genres は使用しない）"""
+        try:
+            with self._transaction():
+                for change in changes:
+                    op = change["op"]
+                    path = change["path"]
+                    if op == "insert":
+                        self.insert(path, change["value"])
+                    elif op == "update":
+                        self.update(path, change["value"])
+                    elif op == "delete":
+                        self.delete(path)
+                    elif op == "swap":
+                        self.reorder(path, change["other"])
+                    else:
+                        raise StorageError(f"不明な変更操作です: {op}")
+        except (TypeError, ValueError, KeyError) as e:
+            raise StorageError(f"変更レコードを適用できません: {e}")
+
+    # ---------- 行単位の操作 ----------
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn, self.path)
+
+    def _row_id(self, path: list[int]) -> int:
+        """インデックスのパスを行IDに解決（親ID + 位置の索引で引く）"""
+        row_id: int | None = None
+        for level, pos in enumerate(path):
+            table, parent_col, _ = _LEVELS[level]
+            if parent_col is None:
+                row = self._conn.execute(f"SELECT id FROM {table} WHERE pos = ?", (pos,)).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT id FROM {table} WHERE {parent_col} = ? AND pos = ?", (row_id, pos)
+                ).fetchone()
+            if row is None:
+                raise StorageError(f"パス {path} に対応する行がありません")
+            row_id = row[0]
+        assert row_id is not None
+        return row_id
+
+    def _sibling_scope(self, path: list[int]) -> tuple[str, str, tuple[Any, ...]]:
+        """path の兄弟を絞り込む (テーブル名, WHERE 句, パラメータ)"""
+        level = len(path) - 1
+        table, parent_col, _ = _LEVELS[level]
+        if parent_col is None:
+            return table, "1 = 1", ()
+        return table, f"{parent_col} = ?", (self._row_id(path[:-1]),)
+
+    def _insert_row(self, level: int, parent_id: int | None, pos: int, entity: dict[str, Any]) -> None:
+        table, parent_col, columns = _LEVELS[level]
+        values, extra = self._split(level, entity)
+        if parent_col is None:
+            names = ["pos", *columns, "extra"]
+            params = [pos, *values, extra]
+        else:
+            names = [parent_col, "pos", *columns, "extra"]
+            params = [parent_id, pos, *values, extra]
+        cur = self._conn.execute(
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", params
+        )
+        child_key = _CHILD_KEYS[level]
+        if child_key is not None:
+            for i, child in enumerate(entity.get(child_key) or []):
+                self._insert_row(level + 1, cur.lastrowid, i, child)
+
+    def _insert_all(self, genres: Iterable[GenreDict]) -> None:
+        for i, g in enumerate(genres):
+            self._insert_row(0, None, i, g)  # type: ignore[arg-type]
+
+    def insert(self, path: list[int], entity: dict[str, Any]) -> None:
+        """path の位置にエンティティ（子要素を含む）を挿入し、後続の兄弟の位置をずらす"""
+        table, where, params = self._sibling_scope(path)
+        pos = path[-1]
+        self._conn.execute(f"UPDATE {table} SET pos = pos + 1 WHERE {where} AND pos >= ?", (*params, pos))
+        parent_id = params[0] if params else None
+        self._insert_row(len(path) - 1, parent_id, pos, entity)
+
+    def update(self, path: list[int], fields: dict[str, Any]) -> None:
+        """エンティティのフィールドを更新（タスクの upsert を含む）"""
+        level = len(path) - 1
+        table, _, columns = _LEVELS[level]
+        row_id = self._row_id(path)
+        assignments: list[str] = []
+        params: list[Any] = []
+        extra_fields: dict[str, Any] = {}
+        for key, value in fields.items():
+            if key in columns:
+                assignments.append(f"{key} = ?")
+                params.append((1 if value else 0) if key == "done" else value)
+            elif key != _CHILD_KEYS[level]:
+                extra_fields[key] = value
+        if extra_fields:
+            row = self._conn.execute(f"SELECT extra FROM {table} WHERE id = ?", (row_id,)).fetchone()
+            extra = json.loads(row[0]) if row and row[0] else {}
+            extra.update(extra_fields)
+            assignments.append("extra = ?")
+            params.append(json.dumps(extra, ensure_ascii=False))
+        if assignments:
+            self._conn.execute(f"UPDATE {table} SET {', '.join(assignments)} WHERE id = ?", (*params, row_id))
+
+    def delete(self, path: list[int]) -> None:
+        """エンティティを削除（子要素は外部キーで連鎖削除）し、後続の兄弟の位置を詰める"""
+        table, where, params = self._sibling_scope(path)
+        row_id = self._row_id(path)
+        self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+        self._conn.execute(f"UPDATE {table} SET pos = pos - 1 WHERE {where} AND pos > ?", (*params, path[-1]))
+
+    def reorder(self, path: list[int], other: int) -> None:
+        """path の要素と同じ親の other 番目の要素を入れ替える"""
+        table = _LEVELS[len(path) - 1][0]
+        a = self._row_id(path)
+        b = self._row_id(path[:-1] + [other])
+        self._conn.execute(f"UPDATE {table} SET pos = ? WHERE id = ?", (other, a))
+        self._conn.execute(f"UPDATE {table} SET pos = ? WHERE id = ?", (path[-1], b))
+
+
+class _Transaction:
+    """BEGIN / COMMIT / ROLLBACK をまとめ、sqlite3 のエラーを StorageError に変換する"""
+
+    def __init__(self, conn: sqlite3.Connection, path: Path) -> None:
+        self._conn = conn
+        self._path = path
+
+    def __enter__(self) -> None:
+        try:
+            self._conn.execute("BEGIN")
+        except sqlite3.Error as e:
+            raise StorageError(f"トランザクションを開始できません ({self._path}): {e}")
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        try:
+            if exc_type is None:
+                self._conn.execute("COMMIT")
+                return False
+            self._conn.execute("ROLLBACK")
+        except sqlite3.Error as e:
+            raise StorageError(f"データベースの書き込みに失敗しました ({self._path}): {e}")
+        if isinstance(exc, sqlite3.Error):
+            raise StorageError(f"データベースの書き込みに失敗しました ({self._path}): {exc}")
+        return False
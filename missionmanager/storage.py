@@ -1,8 +1,18 @@
 from __future__ import annotations
 import json
+import os
 from pathlib import Path
-from typing import Any, Protocol
+from typing import Any, Literal, Protocol, TypedDict, NotRequired
 from missionmanager.models import GenreDict
+from missionmanager import jsonstream
+
+
+class Change(TypedDict):
+    """1操作分の変更レコード。path は genres からのインデックス列（[ジャンル, ミッション, タスク]）"""
+    op: Literal["insert", "update", "delete", "swap"]
+    path: list[int]
+    value: NotRequired[dict[str, Any]]   # insert: エンティティ全体 / update: 変更したフィールド
+    other: NotRequired[int]              # swap: 入れ替え先の兄弟インデックス
 
 
 class StorageProtocol(Protocol):
@@ -11,28 +21,97 @@ class StorageProtocol(Protocol):
     def save_genres(self, genres: list[GenreDict]) -> None: ...
 
 
+class IncrementalStorageProtocol(StorageProtocol, Protocol):
+    """変更レコード単位で永続化できるストレージのインターフェース"""
+    def apply_changes(self, changes: list[Change], genres: list[GenreDict]) -> None: ...
+
+
+class GenreHeader(TypedDict):
+    """ジャンルの見出し（一覧表示に必要な情報だけ。ミッション・タスクは含まない）"""
+    id: str
+    name: str
+    summary: str | None
+    incomplete: int      # 未完了ミッション数
+
+
+class LazyStorageProtocol(IncrementalStorageProtocol, Protocol):
+    """
+    ジャンル単位で読み込めるストレージのインターフェース。
+    save_genres / apply_changes に渡す genres のうち "missions" キーのない要素は未読み込みのジャンルで、
+    保存済みの内容をそのまま残すこと。
+    """
+    def load_genre_headers(self) -> list[GenreHeader]: ...
+    def load_genre(self, genre_id: str) -> GenreDict: ...
+
+
 class StorageError(Exception):
     """ストレージ操作に関するエラー"""
     pass
 
 
+# path の深さごとの子リストのキー
+_CHILD_KEYS = ("missions", "tasks")
+
+
+def apply_change(genres: list[GenreDict], change: Change) -> None:
+    """変更レコードを genres に適用する（ジャーナル再生用）"""
+    path = change["path"]
+    container: list[Any] = genres
+    try:
+        for depth, i in enumerate(path[:-1]):
+            container = container[i].setdefault(_CHILD_KEYS[depth], [])
+        last = path[-1]
+        op = change["op"]
+        if op == "insert":
+            container.insert(last, change["value"])
+        elif op == "update":
+            container[last].update(change["value"])
+        elif op == "delete":
+            del container[last]
+        elif op == "swap":
+            other = change["other"]
+            container[last], container[other] = container[other], container[last]
+        else:
+            raise StorageError(f"不明な変更操作です: {op}")
+    except (IndexError, KeyError, TypeError, AttributeError) as e:
+        raise StorageError(f"変更レコードを適用できません ({change}): {e}")
+
+
+def validate_genres(genres: Any) -> list[GenreDict]:
+    """genres の構造を検証し、不正な要素をスキップして返す"""
+    if not isinstance(genres, list):
+        raise StorageError("データ形式が不正です: 'genres'はリストである必要があります")
+    result: list[GenreDict] = []
+    for g in genres:
+        if not isinstance(g, dict) or "name" not in g or not isinstance(g.get("name"), str):
+            continue
+        if "missions" not in g or not isinstance(g.get("missions"), list):
+            g = {**g, "missions": []}
+        result.append(g)
+    return result
+
+
 class JsonStorage:
-    
-    def __init__(self, path: Path | str | None = None) -> None:
-        # プロジェクトルート（missionmanager の親）の data ディレクトリを使用
-        project_root = Path(__file__).parent.parent
-        data_dir: Path = project_root / "data"
-        # ディレクトリを作成
-        try:
-            data_dir.mkdir(exist_ok=True)
-        except OSError as e:
-            raise StorageError(f"データディレクトリの作成に失敗しました: {e}")
+    """
+    1つの JSON ファイルに全体を保存するストレージ。
+    読み書きは jsonstream でミッション単位に逐次処理する（巨大なファイルでも全体の文字列を作らない）。
+    既定は空白なしの出力、pretty=True でインデント付き。
+    """
 
+    def __init__(self, path: Path | str | None = None, pretty: bool = False) -> None:
+        # 保存先の指定がなければプロジェクトルート（missionmanager の親）の data ディレクトリを使用
         if path is None:
+            data_dir: Path = Path(__file__).parent.parent / "data"
+            # ディレクトリを作成
+            try:
+                data_dir.mkdir(exist_ok=True)
+            except OSError as e:
+                raise StorageError(f"データディレクトリの作成に失敗しました: {e}")
             path = data_dir / "app_data.json"
 
         self.path: Path = Path(path)
-        
+        self.pretty = pretty
+
         # 保存先ファイルが存在しない場合の処理
         if not self.path.exists():
             try:
@@ -43,39 +122,27 @@ class JsonStorage:
 
     def _read(self) -> dict[str, Any]:
         try:
-            content = self.path.read_text(encoding="utf-8")
+            return jsonstream.read_file(self.path)
         except FileNotFoundError:
             # ファイルが存在しない場合は空のデータを返す
             return {"genres": []}
         except OSError as e:
             raise StorageError(f"ファイルの読み込みに失敗しました ({self.path}): {e}")
-        
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
+        except (jsonstream.StreamError, UnicodeDecodeError) as e:
             raise StorageError(f"JSONの解析に失敗しました ({self.path}): {e}")
 
     def _write(self, data: dict[str, Any]) -> None:
+        """一時ファイルに逐次書き出してから置き換える"""
+        extra = {k: v for k, v in data.items() if k != "genres"}
         try:
-            json_str = json.dumps(data, ensure_ascii=False, indent=2)
-            self.path.write_text(json_str, encoding="utf-8")
+            jsonstream.write_file(self.path, data.get("genres", []), self.pretty, extra)
         except OSError as e:
             raise StorageError(f"ファイルの書き込みに失敗しました ({self.path}): {e}")
         except (TypeError, ValueError) as e:
             raise StorageError(f"データのシリアライズに失敗しました: {e}")
 
     def _validate_genres(self, genres: Any) -> list[GenreDict]:
-        """genres の構造を検証し、不正な要素をスキップして返す"""
-        if not isinstance(genres, list):
-            raise StorageError("データ形式が不正です: 'genres'はリストである必要があります")
-        result: list[GenreDict] = []
-        for g in genres:
-            if not isinstance(g, dict) or "name" not in g or not isinstance(g.get("name"), str):
-                continue
-            if "missions" not in g or not isinstance(g.get("missions"), list):
-                g = {**g, "missions": []}
-            result.append(g)
-        return result
+        return validate_genres(genres)
 
     def load_genres(self) -> list[GenreDict]:
         raw: dict[str, Any] = self._read()
@@ -87,3 +154,116 @@ class JsonStorage:
             raise StorageError("genresはリストである必要があります")
         data: dict[str, Any] = {"genres": genres}
         self._write(data)
+
+
+class JournalStorage(JsonStorage):
+    """
+    スナップショット + 追記型ジャーナルによるストレージ
+    - 変更は1操作ごとの小さなレコードとしてジャーナルに追記（保存コストは変更量に比例）
+    - 一定件数たまったらスナップショット（JsonStorage と同じ形式）に圧縮してジャーナルを空にする
+    - 読み込み時はスナップショットにジャーナルを再生
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        journal_path: Path | str | None = None,
+        compact_every: int = 1000,
+        pretty: bool = False,
+    ) -> None:
+        super().__init__(path, pretty)
+        self.journal_path: Path = Path(journal_path) if journal_path is not None else self.path.with_suffix(".journal")
+        self.compact_every = compact_every
+        self._seq: int | None = None   # 最後に書いたレコードの通し番号（load_genres で確定）
+        self._pending = 0              # 前回の圧縮以降のレコード数
+
+    def _read_journal(self, after_seq: int) -> list[dict[str, Any]]:
+        """after_seq より新しいレコードを返す。書き込み途中で壊れた末尾行は無視する"""
+        try:
+            lines = self.journal_path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            raise StorageError(f"ジャーナルの読み込みに失敗しました ({self.journal_path}): {e}")
+        records: list[dict[str, Any]] = []
+        for n, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                if n == len(lines) - 1:
+                    break
+                raise StorageError(f"ジャーナルの解析に失敗しました ({self.journal_path}:{n + 1}): {e}")
+            if record.get("seq", 0) > after_seq:
+                records.append(record)
+        return records
+
+    def load_genres(self) -> list[GenreDict]:
+        raw: dict[str, Any] = self._read()
+        genres = self._validate_genres(raw.get("genres", []))
+        self._seq = int(raw.get("journal_seq", 0))
+        records = self._read_journal(self._seq)
+        for record in records:
+            apply_change(genres, record)
+            self._seq = record["seq"]
+        self._pending = len(records)
+        return genres
+
+    def save_genres(self, genres: list[GenreDict]) -> None:
+        if not isinstance(genres, list):
+            raise StorageError("genresはリストである必要があります")
+        self._compact(genres)
+
+    def apply_changes(self, changes: list[Change], genres: list[GenreDict]) -> None:
+        if not changes:
+            return
+        if self._seq is None:
+            self.load_genres()
+        assert self._seq is not None
+        lines: list[str] = []
+        for change in changes:
+            self._seq += 1
+            lines.append(json.dumps({"seq": self._seq, **change}, ensure_ascii=False, separators=(",", ":")))
+        try:
+            with self.journal_path.open("a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            raise StorageError(f"ジャーナルへの追記に失敗しました ({self.journal_path}): {e}")
+        except (TypeError, ValueError) as e:
+            raise StorageError(f"データのシリアライズに失敗しました: {e}")
+        self._pending += len(changes)
+        if self._pending >= self.compact_every:
+            self._compact(genres)
+
+    def _compact(self, genres: list[GenreDict]) -> None:
+        """スナップショットを書き出してジャーナルを空にする"""
+        if self._seq is None:
+            self._seq = max((r["seq"] for r in self._read_journal(0)), default=0)
+        # スナップショットの置き換えは _write が原子的に行う（journal_seq で再生済みレコードを判別）
+        self._write({"genres": genres, "journal_seq": self._seq})
+        try:
+            self.journal_path.write_text("", encoding="utf-8")
+        except OSError as e:
+            raise StorageError(f"ジャーナルの初期化に失敗しました ({self.journal_path}): {e}")
+        self._pending = 0
+
+
+def create_storage(kind: str | None = None) -> StorageProtocol:
+    """
+    ストレージを種類名から生成する。
+    kind が未指定の場合は環境変数 MISSIONMANAGER_STORAGE を参照（既定: json）
+    """
+    kind = (kind or os.environ.get("MISSIONMANAGER_STORAGE") or "json").strip().lower()
+    if kind == "json":
+        return JsonStorage()
+    if kind == "journal":
+        return JournalStorage()
+    if kind == "sqlite":
+        # sqlite3 は使う時だけ読み込む
+        from missionmanager.sqlite_storage import SqliteStorage
+        return SqliteStorage()
+    if kind == "sharded":
+        from missionmanager.sharded_storage import ShardedJsonStorage
+        return ShardedJsonStorage()
+    raise StorageError(f"不明なストレージ種別です: {kind}")
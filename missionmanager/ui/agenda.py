@@ -0,0 +1,145 @@
+"""全ジャンル共通の期限一覧（期限の近い未完了のミッション・タスク）"""
+from __future__ import annotations
+from typing import Any, Optional
+from PySide6.QtCore import Qt, Signal, QAbstractListModel, QModelIndex, QPersistentModelIndex
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QListView, QVBoxLayout, QWidget
+from missionmanager.app import AppService, Entity
+from missionmanager.models import today_ordinal
+
+ModelIndex = QModelIndex | QPersistentModelIndex
+
+# 絞り込み: (表示名, 今日から何日後までか。None は全て)
+FILTERS: tuple[tuple[str, Optional[int]], ...] = (
+    ("全て", None),
+    ("期限切れ", -1),
+    ("今日まで", 0),
+    ("7日以内", 7),
+    ("30日以内", 30),
+)
+
+
+def is_mission(entity: Entity) -> bool:
+    return "tasks" in entity
+
+
+class AgendaModel(QAbstractListModel):
+    """
+    AppService の期限の索引をそのまま行にするモデル。
+    行数は索引の二分探索、行の中身は表示される行だけ範囲指定で取り出す（全件の走査・ソートなし）
+    """
+    OVERDUE_COLOR = QColor("#C62828")
+    TODAY_COLOR = QColor("#EF6C00")
+
+    def __init__(self, service: AppService, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.service = service
+        self.within: Optional[int] = None
+        self.today = today_ordinal()
+
+    def set_within(self, within: Optional[int]) -> None:
+        self.within = within
+        self.refresh()
+
+    def refresh(self) -> None:
+        """データ変更・日付の変わり目の後に行を取り直す"""
+        self.beginResetModel()
+        self.today = today_ordinal()
+        self.endResetModel()
+
+    def entity(self, index: ModelIndex) -> Optional[Entity]:
+        if not index.isValid():
+            return None
+        found = self.service.agenda(index.row(), index.row() + 1)
+        return found[0] if found else None
+
+    def rowCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        until = None if self.within is None else self.today + self.within
+        return self.service.agenda_count(until)
+
+    def data(self, index: ModelIndex, role: int = Qt.DisplayRole) -> Any:
+        e = self.entity(index)
+        if e is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self._label(e)
+        if role == Qt.ForegroundRole:
+            days = (self.service.due_ordinal(e) or self.today) - self.today
+            if days < 0:
+                return self.OVERDUE_COLOR
+            if days == 0:
+                return self.TODAY_COLOR
+            return None
+        if role == Qt.ToolTipRole:
+            return e.get("summary") or None
+        return None
+
+    def _label(self, e: Entity) -> str:
+        days = (self.service.due_ordinal(e) or self.today) - self.today
+        if days < 0:
+            when = f"{-days}日超過"
+        elif days == 0:
+            when = "今日"
+        else:
+            when = f"あと{days}日"
+        path = []
+        parent = self.service.parent_of(e)
+        while parent is not None:
+            path.append(parent.get("name", ""))
+            parent = self.service.parent_of(parent)
+        kind = "ミッション" if is_mission(e) else "タスク"
+        return f"{e.get('due_date')}（{when}）  [{kind}] {e.get('name', '')}  — {' / '.join(reversed(path))}"
+
+
+class AgendaView(QWidget):
+    """
+    期限一覧の表示。上部の絞り込みで期限切れ・○日以内に限定できる。
+    行をダブルクリックすると、その要素のジャンルに切り替えて表示する（activated_entity）
+    """
+    activated_entity = Signal(object)
+
+    def __init__(self, service: AppService, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.model = AgendaModel(service, self)
+
+        self.filter_combo = QComboBox()
+        for label, _ in FILTERS:
+            self.filter_combo.addItem(label)
+        self.filter_combo.currentIndexChanged.connect(self._on_filter_changed)
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("color:#888; font-size:11px;")
+
+        self.list = QListView()
+        self.list.setModel(self.model)
+        # 行の高さを揃えて、スクロール時に表示範囲の行だけ問い合わせる
+        self.list.setUniformItemSizes(True)
+        self.list.setAlternatingRowColors(True)
+        self.list.doubleClicked.connect(self._on_double_clicked)
+        self.model.modelReset.connect(self._update_count)
+
+        bar = QHBoxLayout()
+        bar.addWidget(QLabel("期限一覧"))
+        bar.addWidget(self.filter_combo)
+        bar.addStretch(1)
+        bar.addWidget(self.count_label)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar)
+        layout.addWidget(self.list, 1)
+        self._update_count()
+
+    def refresh(self) -> None:
+        self.model.refresh()
+
+    def _on_filter_changed(self, idx: int) -> None:
+        self.model.set_within(FILTERS[idx][1])
+
+    def _update_count(self) -> None:
+        self.count_label.setText(f"{self.model.rowCount()} 件")
+
+    def _on_double_clicked(self, index: QModelIndex) -> None:
+        e = self.model.entity(index)
+        if e is not None:
+            self.activated_entity.emit(e)
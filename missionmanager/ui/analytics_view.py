@@ -0,0 +1,158 @@
+"""完了履歴の統計（日/週ごとの完了数・期限に対する遅れの分布・ジャンルごとのペース）"""
+from __future__ import annotations
+from typing import Optional
+from PySide6.QtCore import Qt, QRectF, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import (
+    QComboBox, QHBoxLayout, QHeaderView, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget,
+)
+from missionmanager import analytics
+from missionmanager.analytics import Report, TaskStore
+from missionmanager.app import AppService
+
+# 完了数の表示単位: (表示名, 単位, 期間数)
+UNITS: tuple[tuple[str, str, int], ...] = (
+    ("日別（30日）", "day", 30),
+    ("週別（12週）", "week", 12),
+)
+VELOCITY_WEEKS = 4
+_VELOCITY_COLUMNS = ("ジャンル", f"完了（{VELOCITY_WEEKS}週）", "週あたり", "未完了", "残り週数")
+
+
+class BarChart(QWidget):
+    """(ラベル, 値) の棒グラフ。ラベルは間引いて下に、値は棒の上に出す"""
+    BAR_COLOR = QColor("#4C8BF5")
+    LATE_COLOR = QColor("#C62828")
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.items: list[tuple[str, int]] = []
+        self.late_from: Optional[int] = None   # この位置以降の棒を遅れの色にする
+        self.setMinimumHeight(140)
+
+    def set_items(self, items: list[tuple[str, int]], late_from: Optional[int] = None) -> None:
+        self.items = items
+        self.late_from = late_from
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        if not self.items:
+            return
+        painter = QPainter(self)
+        metrics = painter.fontMetrics()
+        text_h = metrics.height()
+        width = self.width() / len(self.items)
+        top, bottom = text_h + 2, self.height() - text_h - 4
+        peak = max(n for _, n in self.items) or 1
+        # ラベルが重ならないよう、最も長いラベルの幅に合わせて間引く
+        label_w = max(metrics.horizontalAdvance(label) for label, _ in self.items) + 8
+        every = max(1, int(label_w // width) + 1)
+        for i, (label, n) in enumerate(self.items):
+            x = i * width
+            h = (bottom - top) * n / peak
+            late = self.late_from is not None and i >= self.late_from
+            painter.fillRect(QRectF(x + 1, bottom - h, max(1.0, width - 2), h),
+                             self.LATE_COLOR if late else self.BAR_COLOR)
+            painter.setPen(self.palette().text().color())
+            if n and width >= metrics.horizontalAdvance(str(n)):
+                painter.drawText(QRectF(x, bottom - h - text_h, width, text_h), Qt.AlignCenter, str(n))
+            if i % every == 0:
+                painter.setPen(QColor("#888"))
+                painter.drawText(QRectF(x, bottom + 2, width * every, text_h), Qt.AlignLeft, label)
+        painter.end()
+
+
+class AnalyticsView(QWidget):
+    """
+    統計の表示。タスクの列（TaskStore）は変更のあったジャンルだけ写し直すので、表示中の更新は軽い。
+    ペースの表の行をダブルクリックすると、そのジャンルに切り替える（activated_genre）
+    """
+    activated_genre = Signal(object)
+
+    def __init__(self, service: AppService, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.service = service
+        self.store = TaskStore(service)
+        self.report: Optional[Report] = None
+
+        self.unit_combo = QComboBox()
+        for label, _, _ in UNITS:
+            self.unit_combo.addItem(label)
+        self.unit_combo.currentIndexChanged.connect(self.refresh)
+        self.note = QLabel("")
+        self.note.setStyleSheet("color:#888; font-size:11px;")
+
+        self.throughput_chart = BarChart()
+        self.lateness_label = QLabel("")
+        self.lateness_chart = BarChart()
+
+        self.table = QTableWidget(0, len(_VELOCITY_COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(_VELOCITY_COLUMNS))
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.cellDoubleClicked.connect(self._on_double_clicked)
+
+        bar = QHBoxLayout()
+        bar.addWidget(QLabel("統計"))
+        bar.addWidget(self.unit_combo)
+        bar.addStretch(1)
+        bar.addWidget(self.note)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar)
+        layout.addWidget(QLabel("完了したタスク数"))
+        layout.addWidget(self.throughput_chart)
+        layout.addWidget(self.lateness_label)
+        layout.addWidget(self.lateness_chart)
+        layout.addWidget(QLabel(f"ジャンルごとのペース（直近{VELOCITY_WEEKS}週）"))
+        layout.addWidget(self.table, 1)
+
+    def refresh(self) -> None:
+        """データ変更の後に集計し直す"""
+        _, unit, periods = UNITS[self.unit_combo.currentIndex()]
+        cols = self.store.columns()
+        if unit == "week":
+            rep = analytics.report(cols, weeks=periods, velocity_weeks=VELOCITY_WEEKS)
+            series = rep["weekly"]
+        else:
+            rep = analytics.report(cols, days=periods, velocity_weeks=VELOCITY_WEEKS)
+            series = rep["daily"]
+        self.report = rep
+        # ラベルは月-日（週別は週の初日）
+        self.throughput_chart.set_items([(day[5:], n) for day, n in series])
+
+        note = f"タスク {rep['tasks']:,} 件（完了 {rep['done']:,}）"
+        if rep["unloaded_genres"]:
+            note += f"・未読み込みのジャンル {rep['unloaded_genres']} 件は含まない"
+        self.note.setText(note)
+
+        late = rep["lateness"]
+        if late["count"]:
+            self.lateness_label.setText(
+                f"期限に対する完了日: 期限内 {late['on_time_ratio']:.0%}"
+                f"（{late['on_time']:,} / {late['count']:,} 件）・平均 {late['mean_days']:+.1f} 日"
+            )
+        else:
+            self.lateness_label.setText("期限に対する完了日: 期限と完了日のあるタスクがありません")
+        late_from = next(i for i, (_, lower) in enumerate(analytics.LATENESS_BUCKETS)
+                         if lower is not None and lower > 0)
+        self.lateness_chart.set_items(late["histogram"], late_from)
+
+        self.table.setRowCount(len(rep["velocity"]))
+        for row, v in enumerate(rep["velocity"]):
+            weeks_left = "-" if v["weeks_left"] is None else f"{v['weeks_left']:,.1f}"
+            values = (v["name"], f"{v['completed']:,}", f"{v['per_week']:,.1f}", f"{v['remaining']:,}", weeks_left)
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def _on_double_clicked(self, row: int, _col: int) -> None:
+        if self.report is None:
+            return
+        g = self.service.find_by_id(self.report["velocity"][row]["genre_id"])
+        if g is not None:
+            self.activated_genre.emit(g)
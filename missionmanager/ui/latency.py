@@ -0,0 +1,333 @@
+"""
+イベントループの遅延の計測（--latency または環境変数 MISSIONMANAGER_LATENCY=しきい値ms で有効）
+- 入力 → 描画: クリック・キー入力から、それに続く QTimer.singleShot(0, ...) の連鎖も含めて
+  処理を終え、イベントループが待機に戻る前の最後の描画が終わるまでの時間
+- 停止: 1つのイベントの処理がしきい値を超えたもの。監視スレッドがその最中のメインスレッドの
+  Python のスタックを取り、どのハンドラで止まっていたかを記録する
+- フレーム: イベントループ1周の中で描画（ウィンドウの再描画）にかかった時間
+結果は右上の表示と停止の一覧（Ctrl+Shift+L）で見られ、JSON に書き出せる。停止は標準エラーにも1行ずつ出す
+"""
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence, TypedDict
+from PySide6.QtCore import QAbstractEventDispatcher, QEvent, QObject, Qt, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
+from PySide6.QtWidgets import (
+    QApplication, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton, QTableWidget,
+    QTableWidgetItem, QVBoxLayout, QWidget,
+)
+
+HISTORY = 500   # 保持する停止・操作・フレームの件数
+
+_INPUT_EVENTS = {QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick,
+                 QEvent.KeyPress, QEvent.Wheel}
+INPUT_TIMEOUT = 2.0   # この秒数のうちに描画されなかった入力は描画を伴わないものとして捨てる
+# ウィジェットの Paint はウィンドウの UpdateRequest / Expose の処理の中で送られるので、これらを描画として測る
+_PAINT_EVENTS = {QEvent.Paint, QEvent.UpdateRequest, QEvent.Expose}
+_PACKAGE_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+class Stall(TypedDict):
+    at_s: float            # 計測開始からの時刻
+    duration_ms: float
+    event: str             # イベントの種類
+    receiver: str          # 受け取ったオブジェクト（クラス名と objectName）
+    handler: str           # 止まっていた処理（missionmanager 内で最も内側の関数。Qt 内なら空）
+    stack: list[str]       # その時の呼び出し（外側から）
+
+
+class Interaction(TypedDict):
+    at_s: float
+    event: str
+    latency_ms: float      # 入力から最後の描画が終わるまで
+
+
+def _event_name(etype: QEvent.Type) -> str:
+    name = getattr(etype, "name", None)
+    return name if isinstance(name, str) else str(int(etype))
+
+
+def _stack(frame: Any) -> list[str]:
+    """
+    止まっていた処理の呼び出し（外側から、"ファイル名:行 関数名"）。
+    missionmanager 内のフレームに絞り、無ければ（ライブラリ内など）内側の数フレーム
+    """
+    frames: list[str] = []
+    ours: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        if not code.co_filename.endswith("latency.py"):
+            text = f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}"
+            frames.append(text)
+            if code.co_filename.startswith(_PACKAGE_DIR):
+                ours.append(text)
+        frame = frame.f_back
+    found = ours or frames[:3]
+    found.reverse()
+    return found
+
+
+class LatencyMonitor(QObject):
+    """
+    LatencyApplication.notify からイベントごとに呼ばれて時間を測る。
+    入れ子の sendEvent は外側のイベントの時間に含める（停止は外側のイベント単位で記録）
+    """
+    updated = Signal()
+
+    def __init__(self, threshold_ms: float) -> None:
+        super().__init__()
+        self.threshold = threshold_ms / 1000
+        self._start = time.perf_counter()
+        self._depth = 0
+        self._dispatch: Optional[tuple[int, float]] = None   # 処理中のイベントの (通し番号, 開始時刻)
+        self._seq = 0
+        self._samples: dict[int, list[str]] = {}             # 通し番号 -> 監視スレッドが取ったスタック
+        self._main_thread = threading.get_ident()
+        self._input: Optional[tuple[float, str]] = None     # 応答待ちの入力の (時刻, 種類)
+        self._last_paint: Optional[float] = None
+        self._frame_paint = 0.0
+
+        self.stalls: deque[Stall] = deque(maxlen=HISTORY)
+        self.interactions: deque[Interaction] = deque(maxlen=HISTORY)
+        self.frames: deque[float] = deque(maxlen=HISTORY)   # ms
+
+        dispatcher = QAbstractEventDispatcher.instance()
+        if dispatcher is not None:
+            dispatcher.aboutToBlock.connect(self._on_idle)
+        self._watchdog = threading.Thread(target=self._watch, name="latency-watchdog", daemon=True)
+        self._watchdog.start()
+
+    # ---------- 計測 ----------
+    def dispatch(self, receiver: QObject, event: QEvent, call: Callable[[], bool]) -> bool:
+        if self._depth:
+            return call()
+        etype = event.type()
+        receiver_class = type(receiver).__name__
+        t0 = time.perf_counter()
+        self._seq += 1
+        seq = self._seq
+        self._dispatch = (seq, t0)
+        self._depth = 1
+        if etype in _INPUT_EVENTS:
+            # 前の入力への応答は次の入力までで区切る
+            self._finish_input()
+            self._input = (t0, _event_name(etype))
+        try:
+            return call()
+        finally:
+            t1 = time.perf_counter()
+            self._dispatch = None
+            self._depth = 0
+            if etype in _PAINT_EVENTS:
+                self._frame_paint += t1 - t0
+                if self._input is not None:
+                    self._last_paint = t1
+            stack = self._samples.pop(seq, None)
+            if t1 - t0 >= self.threshold:
+                self._record_stall(t0, t1, etype, receiver, receiver_class, stack)
+
+    def _record_stall(self, t0: float, t1: float, etype: QEvent.Type, receiver: QObject, receiver_class: str,
+                      stack: Optional[list[str]]) -> None:
+        try:
+            name = receiver.objectName()
+        except RuntimeError:   # 処理中に削除された
+            name = ""
+        stall: Stall = {
+            "at_s": round(t0 - self._start, 3),
+            "duration_ms": round((t1 - t0) * 1000, 1),
+            "event": _event_name(etype),
+            "receiver": f"{receiver_class}({name})" if name else receiver_class,
+            "handler": stack[-1] if stack else "",
+            "stack": stack or [],
+        }
+        self.stalls.append(stall)
+        sys.stderr.write(f"stall {stall['duration_ms']:.0f} ms  {stall['event']} -> {stall['receiver']}"
+                         f"  {stall['handler'] or '(Qt)'}\n")
+        self.updated.emit()
+
+    def _on_idle(self) -> None:
+        """
+        イベントループが待機に入る: 1周分の描画時間を記録し、入力の後に描画されていれば応答を確定する
+        （再描画は少し後にまとめて行われることがあるので、描画がまだなら次の待機まで待つ）
+        """
+        if self._frame_paint:
+            self.frames.append(round(self._frame_paint * 1000, 2))
+            self._frame_paint = 0.0
+        if self._input is None:
+            return
+        if self._last_paint is not None:
+            self._finish_input()
+        elif time.perf_counter() - self._input[0] > INPUT_TIMEOUT:
+            self._input = None
+
+    def _finish_input(self) -> None:
+        if self._input is None:
+            return
+        t0, name = self._input
+        last_paint, self._input, self._last_paint = self._last_paint, None, None
+        if last_paint is None:
+            return   # 描画を伴わない入力
+        self.interactions.append({
+            "at_s": round(t0 - self._start, 3),
+            "event": name,
+            "latency_ms": round((last_paint - t0) * 1000, 1),
+        })
+        self.updated.emit()
+
+    def _watch(self) -> None:
+        """しきい値を超えて処理中のイベントがあれば、その時点のメインスレッドのスタックを取る"""
+        interval = max(0.005, self.threshold / 4)
+        while True:
+            time.sleep(interval)
+            current = self._dispatch
+            if current is None:
+                continue
+            seq, t0 = current
+            if seq in self._samples or time.perf_counter() - t0 < self.threshold:
+                continue
+            stack = _stack(sys._current_frames().get(self._main_thread))
+            if self._dispatch is current:   # 取っている間に処理が終わっていなければ記録する
+                self._samples[seq] = stack
+
+    # ---------- 結果 ----------
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "stalls": list(self.stalls),
+            "interactions": list(self.interactions),
+            "frames_ms": list(self.frames),
+        }
+
+    def export(self, path: str) -> None:
+        Path(path).write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def attach(self, window: QWidget) -> None:
+        """window の右上に計測値を表示し、Ctrl+Shift+L で停止の一覧を開けるようにする"""
+        overlay = LatencyOverlay(self, window)
+        log = StallLog(self, window)
+        QShortcut(QKeySequence("Ctrl+Shift+L"), window, activated=log.toggle)
+        overlay.raise_()
+
+
+class LatencyApplication(QApplication):
+    """全イベントの処理時間を LatencyMonitor に渡す QApplication"""
+
+    def __init__(self, argv: Sequence[str], threshold_ms: float) -> None:
+        super().__init__(list(argv))
+        self.monitor: Optional[LatencyMonitor] = None   # 作成中に届くイベントは測らない
+        self.monitor = LatencyMonitor(threshold_ms)
+
+    def notify(self, receiver: QObject, event: QEvent) -> bool:
+        monitor = self.__dict__.get("monitor")
+        if monitor is None:
+            return super().notify(receiver, event)
+        return monitor.dispatch(receiver, event, lambda: super(LatencyApplication, self).notify(receiver, event))
+
+
+class LatencyOverlay(QLabel):
+    """ウィンドウ右上の半透明の表示（直近の 入力→描画 / フレーム / 停止）。マウス操作は下に通す"""
+
+    def __init__(self, monitor: LatencyMonitor, window: QWidget) -> None:
+        super().__init__(window)
+        self.monitor = monitor
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(0,0,0,150); color: white; font-size: 10px; padding: 3px;"
+                           " border-radius: 3px;")
+        monitor.updated.connect(self._update_text)
+        window.installEventFilter(self)
+        self._update_text()
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self.parent() and event.type() == QEvent.Resize:
+            self._place()
+        return False
+
+    def _place(self) -> None:
+        self.adjustSize()
+        parent: QWidget = self.parentWidget()
+        self.move(parent.width() - self.width() - 4, 4)
+
+    def _update_text(self) -> None:
+        m = self.monitor
+        lines = []
+        if m.interactions:
+            last = m.interactions[-1]["latency_ms"]
+            worst = max(i["latency_ms"] for i in m.interactions)
+            lines.append(f"入力→描画 {last:.0f} ms（最大 {worst:.0f}）")
+        if m.frames:
+            lines.append(f"フレーム {m.frames[-1]:.1f} ms")
+        lines.append(f"停止 {len(m.stalls)} 件（Ctrl+Shift+L）")
+        self.setText("\n".join(lines))
+        self._place()
+
+
+class StallLog(QWidget):
+    """停止と入力への応答の一覧（計測のたびに更新。JSON で保存）"""
+    _COLUMNS = ("時刻 s", "ms", "イベント", "受け取り", "処理", "呼び出し")
+
+    def __init__(self, monitor: LatencyMonitor, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("イベントループの停止")
+        self.resize(900, 420)
+        self.monitor = monitor
+
+        self.table = QTableWidget(0, len(self._COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(self._COLUMNS))
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(len(self._COLUMNS) - 1, QHeaderView.Stretch)
+        self.summary = QLabel("")
+        self.summary.setStyleSheet("color:#888; font-size:11px;")
+        clear_btn = QPushButton("消去")
+        clear_btn.clicked.connect(self._clear)
+        export_btn = QPushButton("JSON で保存")
+        export_btn.clicked.connect(self._export)
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.summary, 1)
+        bar.addWidget(clear_btn)
+        bar.addWidget(export_btn)
+        layout = QVBoxLayout(self)
+        layout.addLayout(bar)
+        layout.addWidget(self.table, 1)
+        monitor.updated.connect(self._refresh_if_visible)
+
+    def toggle(self) -> None:
+        self.setVisible(not self.isVisible())
+        self._refresh_if_visible()
+
+    def _refresh_if_visible(self) -> None:
+        if not self.isVisible():
+            return
+        m = self.monitor
+        stalls = list(m.stalls)
+        self.table.setRowCount(len(stalls))
+        for row, s in enumerate(reversed(stalls)):   # 新しい順
+            values = (f"{s['at_s']:.3f}", f"{s['duration_ms']:.1f}", s["event"], s["receiver"],
+                      s["handler"] or "(Qt)", " → ".join(s["stack"]))
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(value))
+        latencies = sorted(i["latency_ms"] for i in m.interactions)
+        if latencies:
+            median = latencies[len(latencies) // 2]
+            self.summary.setText(f"しきい値 {m.threshold * 1000:.0f} ms ・ 入力→描画 {len(latencies)} 回"
+                                 f"（中央値 {median:.0f} ms / 最大 {latencies[-1]:.0f} ms）")
+        else:
+            self.summary.setText(f"しきい値 {m.threshold * 1000:.0f} ms")
+
+    def _clear(self) -> None:
+        self.monitor.stalls.clear()
+        self.monitor.interactions.clear()
+        self.monitor.frames.clear()
+        self.monitor.updated.emit()
+
+    def _export(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "計測結果の保存", "latency.json", "JSON (*.json)")
+        if path:
+            self.monitor.export(path)
@@ -1,26 +1,30 @@
 from __future__ import annotations
 from typing import Optional
-from PySide6.QtCore import Qt, Signal, QPoint, QTimer
+from PySide6.QtCore import Qt, QPoint
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar,
     QFrame, QMenu, QInputDialog, QMessageBox
 )
-from missionmanager.models import GenreDict, MissionDict, TaskDict, mission_progress, task_sort_key
+from missionmanager.models import GenreDict, MissionDict, TaskDict
 from missionmanager.app import AppService
 from missionmanager.ui.task_item import TaskItem
-from missionmanager.ui.date_dialog import get_due_date
-from missionmanager.ui.add_dialogs import get_task_add_input
+from missionmanager.ui.selection import Selection, is_select_click, exec_mission_bulk_menu
 
 # 1ミッションのUI
 class MissionCard(QFrame):
-    changed = Signal()  # タスクの変更、追加、期限変更で通知
+    TASK_PAGE_SIZE = 50  # 一度に表示するタスク数（「さらに表示」で追加）
 
-    def __init__(self, service: AppService, genre: GenreDict, mission: MissionDict, parent: Optional[QWidget] = None) -> None:
+    def __init__(self, service: AppService, genre: GenreDict, mission: MissionDict, parent: Optional[QWidget] = None,
+                 mission_selection: Optional[Selection] = None, task_selection: Optional[Selection] = None) -> None:
         # コンストラクタインジェクション
         super().__init__(parent)
         self.service = service
         self.genre = genre
         self.mission = mission
+        # 複数選択（MainWindow と共有。None なら選択操作なし）
+        self.mission_selection = mission_selection
+        self.task_selection = task_selection
+        self._selected = False
         
         # フレーム形状をパネル風に設定
         self.setFrameShape(QFrame.StyledPanel)
@@ -88,30 +92,43 @@ class MissionCard(QFrame):
         header.addWidget(self.progress, 2)
         root.addLayout(header)
 
-        # ボディーレイアウト設定（カードを開いた時のみ表示）
+        # ボディー（概要・タスク一覧・追加ボタン）は初めて開いた時に _build_body で作る
+        self.body: Optional[QWidget] = None
+        self.summary_label: Optional[QLabel] = None
+        self.more_btn: Optional[QPushButton] = None
+        self.task_items: list[TaskItem] = []
+        self._task_item_by_id: dict[str, TaskItem] = {}
+        self._task_limit = self.TASK_PAGE_SIZE
+
+        # 右クリックメニュー
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._open_mission_menu)
+
+        # UI更新処理
+        self._refresh_meta_labels()
+        self._update_mission_completion()
+        self.apply_selection()
+        self.rendered_version = self.service.version(self.mission)   # 描画時のデータ版数
+
+    def _build_body(self) -> None:
+        """ボディーを作る（カードを開いた時のみ表示）"""
         self.body = QWidget()
         body_layout = QVBoxLayout(self.body)
         body_layout.setContentsMargins(0, 0, 0, 0)
         body_layout.setSpacing(4)
 
-        # 概要（カードを開いた時のみ表示）
+        # 概要
         self.summary_label = QLabel(self.mission.get("summary") or "")
         self.summary_label.setStyleSheet("color:#888; font-size:11px;")
         self.summary_label.setWordWrap(True)
         body_layout.addWidget(self.summary_label)
 
-        # タスク一覧の描画処理（期限が近く未完了のものを上にソート）
-        self.task_items: list[TaskItem] = []
-        tasks = self.mission.get("tasks", [])
-        sorted_tasks = sorted(
-            enumerate(tasks),
-            key=lambda x: task_sort_key(x[1], x[0])
-        )
-        for _, t in sorted_tasks:
-            item = TaskItem(self.service, self.mission, t)    # TaskItemインスタンスを生成(タスクUIクラス)   
-            item.toggled.connect(self._on_task_changed)       # インスタンスをイベント接続
-            self.task_items.append(item)                      # task_itemにインスタンスを追加
-            body_layout.addWidget(item)                       # ウィジェットにタスクUIを追加
+        # タスク一覧は _sync_tasks で追加・並べ替え（概要ラベルの後ろ、「さらに表示」の前）
+        self.more_btn = QPushButton("")
+        self.more_btn.setFlat(True)
+        self.more_btn.setStyleSheet("color:#888; font-size:11px;")
+        self.more_btn.clicked.connect(self._show_more_tasks)
+        body_layout.addWidget(self.more_btn)
 
         # タスク追加ボタン
         add_row = QHBoxLayout()
@@ -121,22 +138,98 @@ class MissionCard(QFrame):
         add_row.addWidget(add_btn)
         body_layout.addLayout(add_row)
 
-        root.addWidget(self.body)
-        self.body.setVisible(self._body_visible)
+        self.layout().addWidget(self.body)
+        self._sync_tasks()
+        self._refresh_summary_label()
 
-        # 右クリックメニュー
-        self.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.customContextMenuRequested.connect(self._open_mission_menu)
+    def refresh(self) -> None:
+        """データの変更をカードに反映（ウィジェットは作り直さず、開閉状態も保つ）"""
+        self.title.setText(self.mission.get("name", ""))
+        self._apply_progress()
+        if self.body is not None:
+            self._sync_tasks()
+            self._refresh_summary_label()
+        self._update_mission_completion()
+        self.rendered_version = self.service.version(self.mission)
 
-        # UI更新処理
+    def _sync_tasks(self) -> None:
+        """
+        表示中のタスクを id をキーに差分更新（期限が近く未完了のものを上に）。
+        先頭から _task_limit 件だけ TaskItem を作り、残りは「さらに表示」で追加する。
+        """
+        if self.body is None:
+            return
+        layout = self.body.layout()
+        tasks = self.service.sorted_tasks(self.mission, 0, self._task_limit)
+        alive = {t["id"] for t in tasks}
+        for task_id in list(self._task_item_by_id):
+            if task_id not in alive:
+                self._task_item_by_id.pop(task_id).setParent(None)
+        for i, t in enumerate(tasks):
+            item = self._task_item_by_id.get(t["id"])
+            if item is None or item.task is not t:
+                item = TaskItem(self.service, self.mission, t, selection=self.task_selection)    # TaskItemインスタンスを生成(タスクUIクラス)
+                item.select_requested.connect(lambda mods, task_id=t["id"]: self._select_task(task_id, mods))
+                item.set_selected(self.task_selection is not None and t["id"] in self.task_selection)
+                self._task_item_by_id[t["id"]] = item
+            elif item.rendered_version != self.service.version(t):
+                item.refresh()
+            # 先頭は概要ラベル
+            if layout.indexOf(item) != i + 1:
+                layout.removeWidget(item)
+                layout.insertWidget(i + 1, item)
+        self.task_items = [self._task_item_by_id[t["id"]] for t in tasks]
+        hidden = self.service.mission_counts(self.mission)[1] - len(tasks)
+        self.more_btn.setText(f"さらに表示（残り {hidden} 件）")
+        self.more_btn.setVisible(hidden > 0)
+
+    def _show_more_tasks(self) -> None:
+        self._task_limit += self.TASK_PAGE_SIZE
+        self._sync_tasks()
+
+    # 複数選択
+    def apply_selection(self) -> None:
+        """選択状態をカードと表示中のタスクに反映"""
+        selected = self.mission_selection is not None and self.mission.get("id") in self.mission_selection
+        if selected != self._selected:
+            self._selected = selected
+            self.setStyleSheet("#missionCard { border:2px solid #1976D2; }" if selected else "")
+        for item in self.task_items:
+            item.set_selected(self.task_selection is not None and item.task.get("id") in self.task_selection)
+
+    def _select_task(self, task_id: str, modifiers: Qt.KeyboardModifier) -> None:
+        if self.task_selection is not None:
+            self.task_selection.click(task_id, modifiers, [item.task["id"] for item in self.task_items])
+
+    def _select_all_tasks(self) -> None:
+        if self.task_selection is not None:
+            self._set_body_visible(True)
+            self.task_selection.set([t["id"] for t in self.service.sorted_tasks(self.mission)])
+
+    def _set_body_visible(self, visible: bool) -> None:
+        self._body_visible = visible
+        if self.body is None:
+            self._build_body()
+        self.body.setVisible(visible)
         self._refresh_summary_label()
-        self._refresh_meta_labels()
-        self._update_mission_completion()
+
+    def reveal(self, task: Optional[TaskDict] = None) -> QWidget:
+        """カードを開き、task の行まで表示件数を広げる。スクロール先のウィジェットを返す"""
+        self._set_body_visible(True)
+        if task is None:
+            return self
+        pos = self.service.sorted_position(task)
+        if pos >= self._task_limit:
+            self._task_limit = (pos // self.TASK_PAGE_SIZE + 1) * self.TASK_PAGE_SIZE
+            self._sync_tasks()
+        return self._task_item_by_id.get(task["id"], self)
 
 
     # 内部関数
     def _refresh_summary_label(self) -> None:
         """概要を更新（カードを開いている時のみ表示）"""
+        if self.summary_label is None:
+            return
         summary = self.mission.get("summary") or ""
         self.summary_label.setText(summary)
         self.summary_label.setVisible(self._body_visible and bool(summary))
@@ -145,7 +238,7 @@ class MissionCard(QFrame):
         # DIされた MissionDict から期日と完了日時データを取り出してラベルに設定
         due_txt = f"期限: {self.mission.get('due_date')}" if self.mission.get("due_date") else "期限: 未設定"
         # 完了日時は全タスク完了時のみ表示（データ不整合のガード）
-        show_done = mission_progress(self.mission) >= 1.0 and self.mission.get("completed_at")
+        show_done = self.service.is_mission_complete(self.mission) and self.mission.get("completed_at")
         done_txt = f"完了: {self.mission.get('completed_at')}" if show_done else "完了: -"
         self.due_label.setText(due_txt)
         self.done_label.setText(done_txt)
@@ -158,41 +251,40 @@ class MissionCard(QFrame):
     def eventFilter(self, obj: QWidget, event) -> bool:
         """ヘッダークリックでタスク表示を切替"""
         if obj in self._header_widgets and event.type() == event.Type.MouseButtonPress:
+            if event.button() == Qt.LeftButton and is_select_click(event.modifiers()) \
+                    and self.mission_selection is not None:
+                # Ctrl/Shift+クリックはカードの選択（表示順で範囲選択）
+                order = [m["id"] for m in self.service.sorted_missions(self.genre)]
+                self.mission_selection.click(self.mission["id"], event.modifiers(), order)
+                return True
             if event.button() == Qt.LeftButton:
-                self._body_visible = not self._body_visible
-                self.body.setVisible(self._body_visible)
-                self._refresh_summary_label()
+                self._set_body_visible(not self._body_visible)
                 return True
         return super().eventFilter(obj, event)
 
     def _apply_progress(self) -> None:
         # プログレスバーを最新値に更新
-        self.progress.setValue(int(mission_progress(self.mission) * 100))
+        self.progress.setValue(int(self.service.mission_progress(self.mission) * 100))
         self.progress.setTextVisible(True)
 
-    def _on_task_changed(self) -> None:
-        # タスクのチェック変更時の反映処理
-        self._apply_progress()
-        self._update_mission_completion()
-        QTimer.singleShot(0, self.changed.emit)
     # add task
     def _add_task(self) -> None:
+        from missionmanager.ui.add_dialogs import get_task_add_input
         result = get_task_add_input(self)
         if result is None:
             return
         name, due_date = result
         self.service.add_task(self.mission, name, due_date)
-
-        item = TaskItem(self.service, self.mission, self.mission["tasks"][-1])
-        item.toggled.connect(self._on_task_changed)
-        self.task_items.append(item)
-        self.body.layout().insertWidget(len(self.task_items) - 1, item)
-        self._apply_progress()
-        self._update_mission_completion()
-        self.changed.emit()
+        self.refresh()
 
     # context menu for mission
     def _open_mission_menu(self, pos: QPoint) -> None:
+        # 複数選択中のカードを右クリックした場合は一括操作
+        sel = self.mission_selection
+        if sel is not None and self.mission.get("id") in sel and len(sel) > 1:
+            if exec_mission_bulk_menu(self, self.service, sel.entities(self.service), self.mapToGlobal(pos)):
+                sel.clear()
+            return
         menu = QMenu(self)
         act_rename = menu.addAction("名前変更")
         act_summary = menu.addAction("概要を編集")
@@ -200,8 +292,13 @@ class MissionCard(QFrame):
         act_up     = menu.addAction("上へ移動")
         act_down   = menu.addAction("下へ移動")
         act_delete = menu.addAction("削除")
+        act_select = menu.addAction("すべてのタスクを選択") if self.task_selection is not None else None
         chosen = menu.exec(self.mapToGlobal(pos))
-        if chosen == act_delete:
+        if chosen is None:
+            return
+        if chosen == act_select:
+            self._select_all_tasks()
+        elif chosen == act_delete:
             self._delete_mission()
         elif chosen == act_rename:
             self._rename_mission()
@@ -211,10 +308,8 @@ class MissionCard(QFrame):
             self._edit_due_date()
         elif chosen == act_up:
             self.service.move_mission_up(self.genre, self.mission)
-            self.changed.emit()
         elif chosen == act_down:
             self.service.move_mission_down(self.genre, self.mission)
-            self.changed.emit()
 
     def _edit_summary(self) -> None:
         text, ok = QInputDialog.getMultiLineText(
@@ -223,25 +318,22 @@ class MissionCard(QFrame):
         if ok:
             self.service.set_mission_summary(self.mission, text.strip() or None)
             self._refresh_summary_label()
-            self.changed.emit()
 
     def _rename_mission(self) -> None:
         new_name, ok = QInputDialog.getText(self, "ミッション名の変更", "ミッション：", text=self.mission.get("name", ""))
         if ok and new_name.strip():
             self.service.rename_mission(self.mission, new_name.strip())
             self.title.setText(self.mission.get("name", ""))
-            self.changed.emit()
 
     def _edit_due_date(self) -> None:
+        from missionmanager.ui.date_dialog import get_due_date
         due_str, ok = get_due_date(self, "期限を編集", self.mission.get("due_date"))
         if not ok:
             return
         self.service.set_mission_due(self.mission, due_str)
         self._refresh_meta_labels()
-        self.changed.emit()
 
     def _delete_mission(self) -> None:
         if QMessageBox.question(self, "確認", f"ミッション「{self.mission.get('name','')}」を削除しますか？") == QMessageBox.Yes:
             self.service.delete_mission(self.genre, self.mission)
             self.setParent(None)
-            self.changed.emit()
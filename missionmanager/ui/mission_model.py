@@ -0,0 +1,408 @@
+"""ミッション一覧のモデル/ビュー表示（表示中の行だけを描画する大規模ジャンル向けモード）"""
+from __future__ import annotations
+from typing import Any, Optional
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QPersistentModelIndex, QPoint, QRect, QSize
+from PySide6.QtGui import QColor, QFont, QPainter
+from PySide6.QtWidgets import (
+    QApplication, QStyle, QStyleOptionProgressBar, QStyleOptionViewItem, QStyledItemDelegate,
+    QTreeView, QMenu, QInputDialog, QMessageBox, QWidget, QAbstractItemView,
+)
+from missionmanager.models import GenreDict, MissionDict, TaskDict
+from missionmanager.app import AppService
+from missionmanager.ui.selection import is_select_click, exec_mission_bulk_menu, exec_task_bulk_menu
+
+# QModelIndex.internalId: ミッション行は 0、タスク行は「親ミッションの行 + 1」
+_MISSION_ROW = 0
+
+ModelIndex = QModelIndex | QPersistentModelIndex
+
+
+class MissionTreeModel(QAbstractItemModel):
+    """
+    現在のジャンルのミッション（トップレベル）とタスク（子）を表すモデル。
+    行の並びは AppService の表示順索引から範囲指定で取り出す（全件の再ソート・コピーなし）。
+    """
+
+    def __init__(self, service: AppService, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.service = service
+        self.genre: Optional[GenreDict] = None
+
+    def set_genre(self, genre: Optional[GenreDict]) -> None:
+        self.beginResetModel()
+        self.genre = genre
+        self._load()
+        self.endResetModel()
+
+    def refresh(self) -> None:
+        """データ変更後に行を取り直す"""
+        self.beginResetModel()
+        self._load()
+        self.endResetModel()
+
+    def _load(self) -> None:
+        # 行ごとの取り出し（sorted_at）は読み込みもロックもしないので、表示するジャンルはここで1回だけ読み込む
+        if self.genre is not None:
+            self.service.load_genre(self.genre)
+
+    # ---------- 要素の解決 ----------
+    @staticmethod
+    def is_mission(index: ModelIndex) -> bool:
+        return index.isValid() and index.internalId() == _MISSION_ROW
+
+    def mission_at(self, row: int) -> Optional[MissionDict]:
+        if self.genre is None:
+            return None
+        return self.service.sorted_at(self.genre, row)
+
+    def mission(self, index: ModelIndex) -> Optional[MissionDict]:
+        """ミッション行ならそのミッション、タスク行なら親ミッション"""
+        if not index.isValid():
+            return None
+        row = index.row() if self.is_mission(index) else index.internalId() - 1
+        return self.mission_at(row)
+
+    def task(self, index: ModelIndex) -> Optional[TaskDict]:
+        if not index.isValid() or self.is_mission(index):
+            return None
+        m = self.mission(index)
+        if m is None:
+            return None
+        return self.service.sorted_at(m, index.row())
+
+    def index_of(self, m: MissionDict) -> QModelIndex:
+        """ミッションの行インデックス"""
+        return self.index(self.service.sorted_position(m), 0)
+
+    # ---------- QAbstractItemModel ----------
+    def index(self, row: int, column: int, parent: ModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, _MISSION_ROW)
+        if self.is_mission(parent):
+            return self.createIndex(row, column, parent.row() + 1)
+        return QModelIndex()
+
+    def parent(self, index: ModelIndex = QModelIndex()) -> QModelIndex:  # type: ignore[override]
+        if not index.isValid() or self.is_mission(index):
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, _MISSION_ROW)
+
+    def rowCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        if self.genre is None:
+            return 0
+        if not parent.isValid():
+            return len(self.genre.get("missions", []))
+        if self.is_mission(parent):
+            m = self.mission(parent)
+            return len(m.get("tasks", [])) if m is not None else 0
+        return 0
+
+    def hasChildren(self, parent: ModelIndex = QModelIndex()) -> bool:
+        return self.rowCount(parent) > 0
+
+    def columnCount(self, parent: ModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def flags(self, index: ModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self.is_mission(index):
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def data(self, index: ModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        if self.is_mission(index):
+            m = self.mission(index)
+            if m is None:
+                return None
+            if role == Qt.DisplayRole:
+                return m.get("name", "")
+            if role == Qt.ToolTipRole:
+                return m.get("summary") or None
+            return None
+        t = self.task(index)
+        if t is None:
+            return None
+        if role == Qt.DisplayRole:
+            return t.get("name", "")
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if t.get("done", False) else Qt.Unchecked
+        return None
+
+    def setData(self, index: ModelIndex, value: Any, role: int = Qt.EditRole) -> bool:
+        if role != Qt.CheckStateRole:
+            return False
+        m, t = self.mission(index), self.task(index)
+        if m is None or t is None:
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        self.service.toggle_task_done(m, t, checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+
+class MissionDelegate(QStyledItemDelegate):
+    """ミッション行: 名前・期限/完了・プログレスバー、タスク行: チェック + 名前 + 期限/完了 を描画"""
+    MISSION_HEIGHT = 44
+    TASK_HEIGHT = 24
+    DUE_COLOR = QColor("#1976D2")
+    DONE_COLOR = QColor("#2E7D32")
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: ModelIndex) -> QSize:
+        size = super().sizeHint(option, index)
+        height = self.MISSION_HEIGHT if MissionTreeModel.is_mission(index) else self.TASK_HEIGHT
+        return QSize(size.width(), max(size.height(), height))
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: ModelIndex) -> None:
+        model: MissionTreeModel = index.model()  # type: ignore[assignment]
+        if MissionTreeModel.is_mission(index):
+            m = model.mission(index)
+            if m is not None:
+                self._paint_mission(painter, option, index, model, m)
+            return
+        t = model.task(index)
+        if t is None:
+            return
+        parts = []
+        if t.get("due_date"):
+            parts.append((f"期限: {t.get('due_date')}", self.DUE_COLOR))
+        if t.get("completed_at"):
+            parts.append((f"完了: {t.get('completed_at')}", self.DONE_COLOR))
+        meta_width = 150 * len(parts)
+        opt = QStyleOptionViewItem(option)
+        opt.rect = option.rect.adjusted(0, 0, -meta_width, 0)
+        super().paint(painter, opt, index)
+        painter.save()
+        font = QFont(option.font)
+        font.setPointSizeF(max(1.0, font.pointSizeF() * 0.85))
+        painter.setFont(font)
+        x = option.rect.right() - meta_width
+        for text, color in parts:
+            painter.setPen(color)
+            painter.drawText(QRect(x, option.rect.top(), 150, option.rect.height()), Qt.AlignVCenter | Qt.AlignLeft, text)
+            x += 150
+        painter.restore()
+
+    def _paint_mission(self, painter: QPainter, option: QStyleOptionViewItem, index: ModelIndex,
+                       model: MissionTreeModel, m: MissionDict) -> None:
+        # 背景（選択・交互色）はビューが設定した option のまま描く。
+        # option.widget は参照せず、デリゲートの親（ビュー）を描画先ウィジェットとして使う
+        opt = QStyleOptionViewItem(option)
+        view = self.parent()
+        style = view.style() if isinstance(view, QWidget) else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, opt, painter, view)
+
+        rect = option.rect.adjusted(4, 2, -4, -2)
+        bar_width = rect.width() * 2 // 5
+        text_rect = QRect(rect.left(), rect.top(), rect.width() - bar_width - 8, rect.height())
+        bar_rect = QRect(rect.right() - bar_width, rect.center().y() - 9, bar_width, 18)
+
+        painter.save()
+        painter.setPen(opt.palette.color(opt.palette.ColorRole.HighlightedText)
+                       if opt.state & QStyle.State_Selected else opt.palette.color(opt.palette.ColorRole.Text))
+        painter.drawText(text_rect.adjusted(0, 0, 0, -text_rect.height() // 2), Qt.AlignLeft | Qt.AlignBottom,
+                         m.get("name", ""))
+        font = QFont(option.font)
+        font.setPointSizeF(max(1.0, font.pointSizeF() * 0.85))
+        painter.setFont(font)
+        meta_rect = text_rect.adjusted(0, text_rect.height() // 2, 0, 0)
+        due_txt = f"期限: {m.get('due_date')}" if m.get("due_date") else "期限: 未設定"
+        complete = model.service.is_mission_complete(m)
+        done_txt = f"完了: {m.get('completed_at')}" if complete and m.get("completed_at") else "完了: -"
+        painter.setPen(self.DUE_COLOR)
+        painter.drawText(meta_rect, Qt.AlignLeft | Qt.AlignTop, due_txt)
+        painter.setPen(self.DONE_COLOR)
+        painter.drawText(meta_rect.adjusted(painter.fontMetrics().horizontalAdvance(due_txt) + 16, 0, 0, 0),
+                         Qt.AlignLeft | Qt.AlignTop, done_txt)
+        painter.restore()
+
+        bar = QStyleOptionProgressBar()
+        bar.rect = bar_rect
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = int(model.service.mission_progress(m) * 100)
+        bar.text = f"{bar.progress}%"
+        bar.textVisible = True
+        bar.state = QStyle.State_Enabled | QStyle.State_Horizontal
+        style.drawControl(QStyle.CE_ProgressBar, bar, painter, view)
+
+
+class MissionTreeView(QTreeView):
+    """
+    ミッションカードの代わりに使う一覧ビュー。
+    - クリックでタスクの表示/非表示を切替（開閉状態はデータ変更後も保持）
+    - 右クリックでミッション/タスクの操作（MissionCard / TaskItem と同じ項目）
+    """
+
+    def __init__(self, service: AppService, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.service = service
+        self.mission_model = MissionTreeModel(service, self)
+        self.setModel(self.mission_model)
+        self.setItemDelegate(MissionDelegate(self))
+        self.setHeaderHidden(True)
+        self.setExpandsOnDoubleClick(False)
+        self.setAlternatingRowColors(True)
+        # Ctrl/Shift+クリックで複数選択し、右クリックで一括操作
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        # 開いているミッションの id（モデルのリセット後に復元する）
+        self._expanded: set[str] = set()
+        self.expanded.connect(self._on_expanded)
+        self.collapsed.connect(self._on_collapsed)
+        self.mission_model.modelReset.connect(self._restore_expanded)
+        self.clicked.connect(self._on_clicked)
+
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._open_menu)
+
+    def show_genre(self, genre: Optional[GenreDict]) -> None:
+        if genre is not self.mission_model.genre:
+            self._expanded.clear()
+            self.mission_model.set_genre(genre)
+        else:
+            self.mission_model.refresh()
+
+    def reveal(self, m: MissionDict, t: Optional[TaskDict] = None) -> None:
+        """ミッション（t を指定した場合はそのタスク）の行までスクロールして選択する"""
+        index = self.mission_model.index_of(m)
+        if t is not None:
+            self.setExpanded(index, True)
+            index = self.mission_model.index(self.service.sorted_position(t), 0, index)
+        self.scrollTo(index)
+        self.setCurrentIndex(index)
+
+    # ---------- 開閉 ----------
+    def _on_expanded(self, index: QModelIndex) -> None:
+        m = self.mission_model.mission(index)
+        if m is not None:
+            self._expanded.add(m["id"])
+
+    def _on_collapsed(self, index: QModelIndex) -> None:
+        m = self.mission_model.mission(index)
+        if m is not None:
+            self._expanded.discard(m["id"])
+
+    def _restore_expanded(self) -> None:
+        for mission_id in list(self._expanded):
+            m = self.service.find_by_id(mission_id)
+            if m is None or self.service.parent_of(m) is not self.mission_model.genre:
+                self._expanded.discard(mission_id)
+                continue
+            self.setExpanded(self.mission_model.index_of(m), True)
+
+    def _on_clicked(self, index: QModelIndex) -> None:
+        if is_select_click(QApplication.keyboardModifiers()):
+            return
+        if MissionTreeModel.is_mission(index):
+            self.setExpanded(index, not self.isExpanded(index))
+
+    # ---------- 右クリックメニュー ----------
+    def _open_menu(self, pos: QPoint) -> None:
+        index = self.indexAt(pos)
+        genre = self.mission_model.genre
+        m = self.mission_model.mission(index)
+        if genre is None or m is None:
+            return
+        if self._open_bulk_menu(pos, index):
+            return
+        if MissionTreeModel.is_mission(index):
+            self._open_mission_menu(pos, genre, m)
+        else:
+            t = self.mission_model.task(index)
+            if t is not None:
+                self._open_task_menu(pos, m, t)
+
+    def _open_bulk_menu(self, pos: QPoint, index: QModelIndex) -> bool:
+        """
+        右クリックした行を含む複数行が選択されていれば一括操作メニューを出す（出したら True）。
+        ミッション行とタスク行が混在する場合は、右クリックした行と同じ種類の行を対象にする。
+        """
+        rows = self.selectionModel().selectedRows()
+        if len(rows) < 2 or not self.selectionModel().isSelected(index):
+            return False
+        global_pos = self.viewport().mapToGlobal(pos)
+        if MissionTreeModel.is_mission(index):
+            missions = [self.mission_model.mission(i) for i in rows if MissionTreeModel.is_mission(i)]
+            done = exec_mission_bulk_menu(self, self.service, [m for m in missions if m is not None], global_pos)
+        else:
+            tasks = [self.mission_model.task(i) for i in rows if not MissionTreeModel.is_mission(i)]
+            done = exec_task_bulk_menu(self, self.service, [t for t in tasks if t is not None], global_pos)
+        if done:
+            self.clearSelection()
+        return True
+
+    def _open_mission_menu(self, pos: QPoint, genre: GenreDict, m: MissionDict) -> None:
+        menu = QMenu(self)
+        act_rename = menu.addAction("名前変更")
+        act_summary = menu.addAction("概要を編集")
+        act_due    = menu.addAction("期限を編集")
+        act_add    = menu.addAction("タスク追加")
+        act_up     = menu.addAction("上へ移動")
+        act_down   = menu.addAction("下へ移動")
+        act_delete = menu.addAction("削除")
+        chosen = menu.exec(self.viewport().mapToGlobal(pos))
+        if chosen == act_rename:
+            new_name, ok = QInputDialog.getText(self, "ミッション名の変更", "ミッション：", text=m.get("name", ""))
+            if not (ok and new_name.strip()):
+                return
+            self.service.rename_mission(m, new_name.strip())
+        elif chosen == act_summary:
+            text, ok = QInputDialog.getMultiLineText(self, "概要を編集", "概要：", text=m.get("summary") or "")
+            if not ok:
+                return
+            self.service.set_mission_summary(m, text.strip() or None)
+        elif chosen == act_due:
+            from missionmanager.ui.date_dialog import get_due_date
+            due_str, ok = get_due_date(self, "期限を編集", m.get("due_date"))
+            if not ok:
+                return
+            self.service.set_mission_due(m, due_str)
+        elif chosen == act_add:
+            from missionmanager.ui.add_dialogs import get_task_add_input
+            result = get_task_add_input(self)
+            if result is None:
+                return
+            name, due_date = result
+            self.service.add_task(m, name, due_date)
+            self._expanded.add(m["id"])
+        elif chosen == act_up:
+            self.service.move_mission_up(genre, m)
+        elif chosen == act_down:
+            self.service.move_mission_down(genre, m)
+        elif chosen == act_delete:
+            if QMessageBox.question(self, "確認", f"ミッション「{m.get('name','')}」を削除しますか？") != QMessageBox.Yes:
+                return
+            self.service.delete_mission(genre, m)
+
+    def _open_task_menu(self, pos: QPoint, m: MissionDict, t: TaskDict) -> None:
+        menu = QMenu(self)
+        act_rename = menu.addAction("名前変更")
+        act_due = menu.addAction("期限を編集")
+        act_up = menu.addAction("上へ移動")
+        act_down = menu.addAction("下へ移動")
+        act_delete = menu.addAction("削除")
+        chosen = menu.exec(self.viewport().mapToGlobal(pos))
+        if chosen == act_rename:
+            new_name, ok = QInputDialog.getText(self, "タスク名の変更", "タスク:", text=t.get("name", ""))
+            if not (ok and new_name.strip()):
+                return
+            self.service.rename_task(t, new_name.strip())
+        elif chosen == act_due:
+            from missionmanager.ui.date_dialog import get_due_date
+            due_str, ok = get_due_date(self, "期限を編集", t.get("due_date"))
+            if not ok:
+                return
+            self.service.set_task_due(t, due_str)
+        elif chosen == act_up:
+            self.service.move_task_up(m, t)
+        elif chosen == act_down:
+            self.service.move_task_down(m, t)
+        elif chosen == act_delete:
+            if QMessageBox.question(self, "確認", f"タスク「{t.get('name','')}」を削除しますか?") != QMessageBox.Yes:
+                return
+            self.service.delete_task(m, t)
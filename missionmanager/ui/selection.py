@@ -0,0 +1,139 @@
+"""ミッション/タスクの複数選択と一括操作メニュー"""
+from __future__ import annotations
+from typing import Any, Optional, Sequence
+from PySide6.QtCore import Qt, QObject, QPoint, Signal
+from PySide6.QtWidgets import QInputDialog, QMenu, QMessageBox, QWidget
+from missionmanager.models import MissionDict, TaskDict
+from missionmanager.app import AppService
+
+
+class Selection(QObject):
+    """
+    選択中の要素の id（選択順）。
+    Ctrl+クリックで追加/解除、Shift+クリックで直前に選んだ要素（アンカー）からの範囲を選択する。
+    """
+    changed = Signal()
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._ids: dict[str, None] = {}
+        self.anchor: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._ids
+
+    def ids(self) -> list[str]:
+        return list(self._ids)
+
+    def entities(self, service: AppService) -> list[Any]:
+        """選択中でまだ存在する要素（削除済みの id は除く）"""
+        return [e for e in (service.find_by_id(i) for i in self._ids) if e is not None]
+
+    def click(self, item_id: str, modifiers: Qt.KeyboardModifier, order: Sequence[str]) -> None:
+        """修飾キー付きクリックを選択に反映する。order は範囲選択に使う表示順の id 列"""
+        if modifiers & Qt.ShiftModifier and self.anchor in order and item_id in order:
+            i, j = sorted((order.index(self.anchor), order.index(item_id)))
+            for other in order[i:j + 1]:
+                self._ids[other] = None
+        elif item_id in self._ids:
+            del self._ids[item_id]
+            self.anchor = item_id
+        else:
+            self._ids[item_id] = None
+            self.anchor = item_id
+        self.changed.emit()
+
+    def set(self, ids: Sequence[str]) -> None:
+        self._ids = dict.fromkeys(ids)
+        self.anchor = ids[-1] if ids else None
+        self.changed.emit()
+
+    def clear(self) -> None:
+        if self._ids or self.anchor is not None:
+            self._ids.clear()
+            self.anchor = None
+            self.changed.emit()
+
+
+def is_select_click(modifiers: Qt.KeyboardModifier) -> bool:
+    """選択操作のクリック（Ctrl/Shift 付き）か"""
+    return bool(modifiers & (Qt.ControlModifier | Qt.ShiftModifier))
+
+
+def _choose(parent: QWidget, title: str, labels: list[str]) -> Optional[int]:
+    """一覧から1つ選ばせて位置を返す（同名があっても区別できるよう番号を付ける）"""
+    items = [f"{i + 1}. {label}" for i, label in enumerate(labels)]
+    item, ok = QInputDialog.getItem(parent, title, "移動先：", items, 0, False)
+    return items.index(item) if ok else None
+
+
+def exec_task_bulk_menu(parent: QWidget, service: AppService, tasks: list[TaskDict], global_pos: QPoint) -> bool:
+    """選択した複数タスクの一括操作メニュー。操作を実行したら True（保存・通知は1回）"""
+    n = len(tasks)
+    menu = QMenu(parent)
+    act_done = menu.addAction(f"完了にする（{n}件）")
+    act_undone = menu.addAction(f"未完了に戻す（{n}件）")
+    act_due = menu.addAction("期限を一括設定")
+    act_move = menu.addAction("別のミッションへ移動")
+    act_delete = menu.addAction(f"削除（{n}件）")
+    chosen = menu.exec(global_pos)
+    if chosen == act_done:
+        service.set_tasks_done(tasks, True)
+    elif chosen == act_undone:
+        service.set_tasks_done(tasks, False)
+    elif chosen == act_due:
+        from missionmanager.ui.date_dialog import get_due_date
+        due_str, ok = get_due_date(parent, "期限を一括設定", None)
+        if not ok:
+            return False
+        service.set_tasks_due(tasks, due_str)
+    elif chosen == act_move:
+        missions = [m for g in service.genres for m in g.get("missions", [])]
+        if not missions:
+            return False
+        labels = [f"{service.parent_of(m).get('name', '')} / {m.get('name', '')}" for m in missions]
+        i = _choose(parent, "別のミッションへ移動", labels)
+        if i is None:
+            return False
+        service.move_tasks_to(tasks, missions[i])
+    elif chosen == act_delete:
+        if QMessageBox.question(parent, "確認", f"選択した{n}件のタスクを削除しますか？") != QMessageBox.Yes:
+            return False
+        service.delete_tasks(tasks)
+    else:
+        return False
+    return True
+
+
+def exec_mission_bulk_menu(parent: QWidget, service: AppService, missions: list[MissionDict], global_pos: QPoint) -> bool:
+    """選択した複数ミッションの一括操作メニュー。操作を実行したら True（保存・通知は1回）"""
+    n = len(missions)
+    menu = QMenu(parent)
+    act_done = menu.addAction(f"すべてのタスクを完了にする（{n}件）")
+    act_due = menu.addAction("期限を一括設定")
+    act_move = menu.addAction("別のジャンルへ移動")
+    act_delete = menu.addAction(f"削除（{n}件）")
+    chosen = menu.exec(global_pos)
+    if chosen == act_done:
+        service.set_tasks_done([t for m in missions for t in m.get("tasks", [])], True)
+    elif chosen == act_due:
+        from missionmanager.ui.date_dialog import get_due_date
+        due_str, ok = get_due_date(parent, "期限を一括設定", None)
+        if not ok:
+            return False
+        service.set_missions_due(missions, due_str)
+    elif chosen == act_move:
+        i = _choose(parent, "別のジャンルへ移動", [g.get("name", "") for g in service.genres])
+        if i is None:
+            return False
+        service.move_missions_to(missions, service.genres[i])
+    elif chosen == act_delete:
+        if QMessageBox.question(parent, "確認", f"選択した{n}件のミッションを削除しますか？") != QMessageBox.Yes:
+            return False
+        service.delete_missions(missions)
+    else:
+        return False
+    return True
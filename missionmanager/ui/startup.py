@@ -0,0 +1,76 @@
+"""起動時間の計測（--startup-report または環境変数 MISSIONMANAGER_STARTUP_REPORT で有効）"""
+from __future__ import annotations
+import os
+import sys
+import time
+from typing import Optional, Sequence
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication, QWidget
+
+REPORT_FLAG = "--startup-report"
+ENV_VAR = "MISSIONMANAGER_STARTUP_REPORT"
+
+
+def report_mode(argv: Sequence[str]) -> Optional[str]:
+    """
+    計測の指定を返す（None: 計測しない / "print": 標準エラーに出力 / "exit": 出力して終了）。
+    環境変数の値が exit なら、カードを並べ終えた時点で終了する（回帰の計測用）
+    """
+    value = os.environ.get(ENV_VAR, "").strip().lower()
+    if value == "exit":
+        return "exit"
+    if REPORT_FLAG in argv or value not in ("", "0"):
+        return "print"
+    return None
+
+
+class StartupReport(QObject):
+    """
+    プロセス開始からの経過時間を段階ごとに記録する：
+    import（モジュール読み込み）/ load（データ読み込み）/ window（ウィンドウ構築）/
+    first paint（最初の描画）/ populated（ミッションカードを並べ終えた）
+    """
+
+    def __init__(self, start: float, mode: str) -> None:
+        super().__init__()
+        self._start = start
+        self._mode = mode
+        self._marks: list[tuple[str, float]] = []
+        self._window: Optional[QWidget] = None
+
+    def mark(self, name: str) -> None:
+        self._marks.append((name, time.perf_counter() - self._start))
+
+    def watch(self, window: QWidget) -> None:
+        """最初の描画とカードの配置完了を記録し、そろったら出力する"""
+        self._window = window
+        window.installEventFilter(self)
+        window.populated.connect(self._on_populated)  # type: ignore[attr-defined]
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self._window and event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.mark("first paint")
+            self._finish()
+        return False
+
+    def _on_populated(self) -> None:
+        self._window.populated.disconnect(self._on_populated)  # type: ignore[union-attr]
+        self.mark("populated")
+        self._finish()
+
+    def _finish(self) -> None:
+        names = {name for name, _ in self._marks}
+        if "first paint" not in names or "populated" not in names:
+            return
+        sys.stderr.write(self.format())
+        if self._mode == "exit":
+            QApplication.quit()
+
+    def format(self) -> str:
+        lines = ["startup:"]
+        prev = 0.0
+        for name, t in self._marks:
+            lines.append(f"  {name:<12} {t * 1000:8.1f} ms  (+{(t - prev) * 1000:.1f})")
+            prev = t
+        return "\n".join(lines) + "\n"
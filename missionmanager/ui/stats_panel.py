@@ -0,0 +1,105 @@
+"""計測結果の表示（--profile で有効。メインウィンドウで Ctrl+Shift+P）"""
+from __future__ import annotations
+from typing import Optional
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QKeySequence, QShortcut
+from PySide6.QtWidgets import (
+    QFileDialog, QHBoxLayout, QHeaderView, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QVBoxLayout, QWidget,
+)
+from missionmanager import profiling
+from missionmanager.profiling import Profiler
+
+_COLUMNS = ("名前", "回数", "合計 ms", "平均 ms", "最大 ms", "書込 bytes", "分布")
+
+
+def install() -> None:
+    """UI の描画処理を計測する（profiling.install の後、MainWindow を作る前に呼ぶ）"""
+    from missionmanager.ui.views import MainWindow
+    from missionmanager.ui.mission_card import MissionCard
+    from missionmanager.ui.mission_model import MissionTreeView
+    from missionmanager.ui.agenda import AgendaView
+    from missionmanager.ui.analytics_view import AnalyticsView
+    profiling.wrap_methods(MainWindow, ["_render_missions", "_render_cards", "_place_cards", "_apply_events",
+                                        "_reload_genre_combo", "_reveal"], "ui.MainWindow")
+    profiling.wrap_methods(MissionCard, ["__init__", "refresh", "_sync_tasks", "_set_body_visible"], "ui.MissionCard")
+    profiling.wrap_methods(MissionTreeView, ["show_genre"], "ui.MissionTreeView")
+    profiling.wrap_methods(AgendaView, ["refresh"], "ui.AgendaView")
+    profiling.wrap_methods(AnalyticsView, ["refresh"], "ui.AnalyticsView")
+
+
+class StatsPanel(QWidget):
+    """計測結果の表（1秒ごとに更新。リセット・JSON 書き出し）"""
+    REFRESH_MS = 1000
+
+    def __init__(self, profiler: Profiler, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent, Qt.Window)
+        self.setWindowTitle("計測")
+        self.resize(860, 420)
+        self.profiler = profiler
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(_COLUMNS))
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(len(_COLUMNS) - 1, QHeaderView.Stretch)
+
+        reset_btn = QPushButton("リセット")
+        reset_btn.clicked.connect(self._reset)
+        export_btn = QPushButton("JSON で保存")
+        export_btn.clicked.connect(self._export)
+        self.note = QLabel("合計時間の多い順（呼び出し先の時間を含む）")
+        self.note.setStyleSheet("color:#888; font-size:11px;")
+
+        bar = QHBoxLayout()
+        bar.addWidget(self.note, 1)
+        bar.addWidget(reset_btn)
+        bar.addWidget(export_btn)
+        layout = QVBoxLayout(self)
+        layout.addLayout(bar)
+        layout.addWidget(self.table, 1)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+
+    @classmethod
+    def attach(cls, window: QWidget, profiler: Profiler) -> "StatsPanel":
+        """window に Ctrl+Shift+P（表示/非表示）を付ける"""
+        panel = cls(profiler, window)
+        QShortcut(QKeySequence("Ctrl+Shift+P"), window, activated=panel.toggle)
+        return panel
+
+    def toggle(self) -> None:
+        self.setVisible(not self.isVisible())
+
+    def showEvent(self, event) -> None:
+        self.refresh()
+        self._timer.start(self.REFRESH_MS)
+        super().showEvent(event)
+
+    def hideEvent(self, event) -> None:
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self) -> None:
+        stats = sorted(self.profiler.snapshot().items(), key=lambda item: -item[1]["total_ms"])
+        self.table.setRowCount(len(stats))
+        for row, (name, s) in enumerate(stats):
+            histogram = "  ".join(f"{label} {n}" for label, n in s["histogram"].items())
+            values = (name, s["count"], s["total_ms"], s["mean_ms"], s["max_ms"], s["bytes"] or "", histogram)
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(f"{value:,.3f}" if isinstance(value, float) else
+                                        f"{value:,}" if isinstance(value, int) else str(value))
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def _reset(self) -> None:
+        self.profiler.reset()
+        self.refresh()
+
+    def _export(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "計測結果の保存", "profile.json", "JSON (*.json)")
+        if path:
+            self.profiler.dump(path)
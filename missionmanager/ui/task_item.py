@@ -1,21 +1,27 @@
 from __future__ import annotations
 from typing import Optional
-from PySide6.QtCore import Qt, Signal, QPoint, QTimer
+from PySide6.QtCore import Qt, Signal, QPoint, QEvent, QObject
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QCheckBox, QLabel, QMenu, QInputDialog, QMessageBox
 from missionmanager.models import TaskDict, MissionDict
 from missionmanager.app import AppService
-from missionmanager.ui.date_dialog import get_due_date
+from missionmanager.ui.selection import Selection, is_select_click, exec_task_bulk_menu
 
 # 1タスクのUI
 class TaskItem(QWidget):
-    toggled = Signal()
+    select_requested = Signal(object)  # Ctrl/Shift+クリック（修飾キーを渡す）
 
-    def __init__(self, service: AppService, mission: MissionDict, task: TaskDict, parent: Optional[QWidget] = None) -> None:
+    def __init__(self, service: AppService, mission: MissionDict, task: TaskDict, parent: Optional[QWidget] = None,
+                 selection: Optional[Selection] = None) -> None:
         super().__init__(parent)
         # コンストラクタインジェクション
         self.service = service
         self.mission = mission
         self.task = task
+        self.selection = selection
+        # 選択中の背景色はこのウィジェットだけに適用
+        self.setObjectName("taskItem")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self._selected = False
 
         # タスクUIのレイアウト設定
         layout = QHBoxLayout(self)
@@ -38,11 +44,36 @@ class TaskItem(QWidget):
         layout.addWidget(self.time_label)
         self._refresh_labels()
 
+        # Ctrl/Shift+クリックは完了切替ではなく選択に使う
+        for w in (self, self.check, self.due_label, self.time_label):
+            w.installEventFilter(self)
+        self.rendered_version = self.service.version(task)   # 描画時のデータ版数
+
         # 右クリックメニュー
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self._open_menu)    # イベント接続
 
+    def refresh(self) -> None:
+        """データの変更をウィジェットに反映（作り直さない）"""
+        self.check.blockSignals(True)
+        self.check.setText(self.task.get("name", ""))
+        self.check.setChecked(bool(self.task.get("done", False)))
+        self.check.blockSignals(False)
+        self._refresh_labels()
+        self.rendered_version = self.service.version(self.task)
     
+    def set_selected(self, selected: bool) -> None:
+        if selected != self._selected:
+            self._selected = selected
+            self.setStyleSheet("#taskItem { background:#E3F2FD; border-radius:4px; }" if selected else "")
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.MouseButtonPress and event.button() == Qt.LeftButton \
+                and is_select_click(event.modifiers()):
+            self.select_requested.emit(event.modifiers())
+            return True
+        return super().eventFilter(obj, event)
+
     def _refresh_labels(self) -> None:
         due_txt = f"期限: {self.task.get('due_date')}" if self.task.get("due_date") else ""
         done_txt = f"完了: {self.task.get('completed_at')}" if self.task.get("completed_at") else ""
@@ -56,11 +87,15 @@ class TaskItem(QWidget):
         # UI上の完了日時ラベルに反映
         self.service.toggle_task_done(self.mission, self.task, checked)
         self._refresh_labels()
-        # 自分が破棄されないようにイベントループ後に外部に通知
-        QTimer.singleShot(0, self.toggled.emit)
            
 
     def _open_menu(self, pos: QPoint) -> None:
+        # 複数選択中のタスクを右クリックした場合は一括操作
+        sel = self.selection
+        if sel is not None and self.task.get("id") in sel and len(sel) > 1:
+            if exec_task_bulk_menu(self, self.service, sel.entities(self.service), self.mapToGlobal(pos)):
+                sel.clear()
+            return
         # メニューインスタンスを作成してメニューを登録
         menu = QMenu(self)
         act_rename = menu.addAction("名前変更")
@@ -82,19 +117,15 @@ class TaskItem(QWidget):
             self._edit_due_date()
         elif chosen == act_up:
             self.service.move_task_up(self.mission, self.task)
-            # シグナルでMissionCardに再描画を通知
-            QTimer.singleShot(0, self.toggled.emit)
         elif chosen == act_down:
             self.service.move_task_down(self.mission, self.task)
-            # シグナルでMissionCardに再描画を通知
-            QTimer.singleShot(0, self.toggled.emit)
 
     def _edit_due_date(self) -> None:
+        from missionmanager.ui.date_dialog import get_due_date
         due_str, ok = get_due_date(self, "期限を編集", self.task.get("due_date"))
         if ok:
             self.service.set_task_due(self.task, due_str)
             self._refresh_labels()
-            QTimer.singleShot(0, self.toggled.emit)
 
     def _rename_task(self) -> None:
         # 名前入力ダイアログの表示
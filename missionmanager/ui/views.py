@@ -1,11 +1,14 @@
 from __future__ import annotations
-from typing import Optional
-from PySide6.QtCore import Qt, QPoint, QTimer
+from typing import TYPE_CHECKING, Optional
+from PySide6.QtCore import Qt, QEvent, QObject, QPoint, QTimer, QDate, QDateTime, QTime, Signal
+from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
     QComboBox,
+    QLineEdit,
+    QApplication,
     QPushButton,
     QScrollArea,
     QFrame,
@@ -14,11 +17,20 @@ from PySide6.QtWidgets import (
     QToolButton,
     QMenu,
     QLabel,
+    QStackedWidget,
 )
-from missionmanager.models import GenreDict, count_incomplete_missions, mission_sort_key
-from missionmanager.app import AppService
+from missionmanager.models import GenreDict, MissionDict
+from missionmanager.app import AppService, Entity
+from missionmanager import events as ev
+from missionmanager.events import Event
 from missionmanager.ui.mission_card import MissionCard
-from missionmanager.ui.add_dialogs import get_genre_add_input, get_mission_add_input
+from missionmanager.ui.selection import Selection
+
+if TYPE_CHECKING:
+    from missionmanager.search import SearchHit, SearchIndex
+    from missionmanager.ui.mission_model import MissionTreeView
+    from missionmanager.ui.agenda import AgendaView
+    from missionmanager.ui.analytics_view import AnalyticsView
 
 
 class MainWindow(QWidget):
@@ -31,13 +43,35 @@ class MainWindow(QWidget):
     - ジャンル: 名前変更/上へ/下へ/削除
     - ミッション: 名前変更/期限編集/上へ/下へ/削除
     - タスク: 名前変更/上へ/下へ/削除（カード内）
+    複数選択：
+    - Ctrl/Shift+クリックでミッションカード・タスクを選択、Ctrl+A で全ミッション、Esc で解除
+    - 選択中の要素を右クリックすると一括操作（完了・期限・移動・削除）
+    検索：
+    - 上部の検索欄で Enter → 名前・概要に一致する要素の一覧から選ぶと、そのジャンルに切り替えてカードを開く
+    期限一覧：
+    - 「期限一覧」で全ジャンルの期限のある未完了のミッション・タスクを期限順に表示（ダブルクリックで開く）
+    起動を軽くするため：
+    - ミッションカードはウィンドウ表示後に RENDER_CHUNK 枚ずつイベントループを挟んで作る
+    - リスト表示・期限一覧・入力ダイアログのモジュールは初めて使う時に読み込む
     """
+    populated = Signal()   # ミッションカードを並べ終えた
+    RENDER_CHUNK = 20      # 1回のイベントループで作るカードの枚数
+    SEARCH_LIMIT = 30      # 検索結果の表示件数
+
     def __init__(self, service: AppService) -> None:
         super().__init__()
         self.setWindowTitle("MissionManager")
         self.resize(780, 540)
         self.service = service
 
+        # 複数選択（カードとタスクで共有）
+        self.mission_selection = Selection(self)
+        self.task_selection = Selection(self)
+        self.mission_selection.changed.connect(self._apply_selection)
+        self.task_selection.changed.connect(self._apply_selection)
+        QShortcut(QKeySequence.SelectAll, self, activated=self._select_all_missions)
+        QShortcut(QKeySequence(Qt.Key_Escape), self, activated=self._clear_selection)
+
         root = QVBoxLayout(self)
         root.setContentsMargins(12, 12, 12, 12)
         root.setSpacing(10)
@@ -54,8 +88,41 @@ class MainWindow(QWidget):
         add_genre_btn.setText("追加")
         add_genre_btn.clicked.connect(self._add_genre)
 
+        # 表示モード切替: カード表示 / リスト表示（表示中の行だけ描画する大規模ジャンル向け）
+        self.list_mode_btn = QToolButton()
+        self.list_mode_btn.setText("リスト表示")
+        self.list_mode_btn.setCheckable(True)
+        self.list_mode_btn.setToolTip("ミッションが多いジャンル向けの軽量な一覧表示に切替")
+        self.list_mode_btn.toggled.connect(self._on_view_mode_changed)
+
+        # 期限一覧（全ジャンル共通）。表示中はカード・リストの代わりに出す
+        self.agenda_btn = QToolButton()
+        self.agenda_btn.setText("期限一覧")
+        self.agenda_btn.setCheckable(True)
+        self.agenda_btn.setToolTip("全ジャンルの期限のある未完了のミッション・タスクを期限順に表示")
+        self.agenda_btn.toggled.connect(self._on_view_mode_changed)
+
+        # 完了履歴の統計（全ジャンル共通）。期限一覧とはどちらか一方だけを表示する
+        self.stats_btn = QToolButton()
+        self.stats_btn.setText("統計")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setToolTip("日/週ごとの完了数・期限に対する完了日の分布・ジャンルごとのペースを表示")
+        self.stats_btn.toggled.connect(self._on_view_mode_changed)
+
+        # 検索欄（索引は初めてフォーカスした時に作る）
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("検索（Enter）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.returnPressed.connect(self._search)
+        self.search_edit.installEventFilter(self)
+        self._search_index: Optional[SearchIndex] = None
+
         top.addWidget(self.genre_combo, 1)
         top.addWidget(add_genre_btn)
+        top.addWidget(self.list_mode_btn)
+        top.addWidget(self.agenda_btn)
+        top.addWidget(self.stats_btn)
+        top.addWidget(self.search_edit)
         root.addLayout(top)
 
         # ジャンル概要表示
@@ -76,7 +143,17 @@ class MainWindow(QWidget):
         self.mission_layout.addStretch(1)
 
         self.scroll.setWidget(self.mission_container)
-        root.addWidget(self.scroll, 1)
+
+        # ミッション一覧(リスト表示)。初めて切り替えた時に作る
+        self.mission_tree: Optional[MissionTreeView] = None
+        # 期限一覧。初めて切り替えた時に作る
+        self.agenda_view: Optional[AgendaView] = None
+        # 統計。初めて切り替えた時に作る
+        self.analytics_view: Optional[AnalyticsView] = None
+
+        self.mission_stack = QStackedWidget()
+        self.mission_stack.addWidget(self.scroll)
+        root.addWidget(self.mission_stack, 1)
 
         # 下部バー: ミッション追加
         bottom = QHBoxLayout()
@@ -86,9 +163,37 @@ class MainWindow(QWidget):
         bottom.addWidget(add_mission_btn)
         root.addLayout(bottom)
 
-        # 初回レンダリング
+        # 表示中のミッションカード（ミッション id -> カード）。再描画時は差分だけ更新する
+        self._cards: dict[str, MissionCard] = {}
+        # 分割して並べている途中の描画の番号（新しい描画が始まったら古い続きは捨てる）
+        self._render_token = 0
+        self._rendering = False
+        self._render_rest: Optional[tuple[Optional[GenreDict], list[MissionDict], int]] = None   # 残りの描画
+
+        # AppService の変更イベントを溜めて、次のイベントループでまとめて反映する
+        self._pending_events: list[Event] = []
+        self.service.events.subscribe(self._on_service_event)
+
+        # 日付が変わったら期限の並びを更新するためのタイマー
+        self._day_timer = QTimer(self)
+        self._day_timer.setSingleShot(True)
+        self._day_timer.timeout.connect(self._on_day_changed)
+        self._schedule_day_rollover()
+
+        # 初回レンダリング（カードはウィンドウの枠を表示してから並べる）
         self._update_genre_summary_label()
+        QTimer.singleShot(0, self._render_missions)
+
+    # ---------- day rollover ----------
+    def _schedule_day_rollover(self) -> None:
+        # 次の 0:00 の少し後に発火させる
+        now = QDateTime.currentDateTime()
+        midnight = QDateTime(QDate.currentDate().addDays(1), QTime(0, 0))
+        self._day_timer.start(max(0, now.msecsTo(midnight)) + 1000)
+
+    def _on_day_changed(self) -> None:
         self._render_missions()
+        self._schedule_day_rollover()
 
     # ---------- genre context menu ----------
     def _open_genre_menu(self, pos: QPoint) -> None:
@@ -130,14 +235,16 @@ class MainWindow(QWidget):
             return None
         return self.service.genres[idx]
 
+    def _genre_label(self, g: GenreDict) -> str:
+        n = self.service.count_incomplete_missions(g)
+        return f"{g.get('name', '')} · {n}" if n > 0 else g.get("name", "")
+
     def _reload_genre_combo(self) -> None:
         current_idx = self.genre_combo.currentIndex()
         self.genre_combo.blockSignals(True)
         self.genre_combo.clear()
         for g in self.service.genres:
-            n = count_incomplete_missions(g)
-            label = f"{g.get('name', '')} · {n}" if n > 0 else g.get("name", "")
-            self.genre_combo.addItem(label)
+            self.genre_combo.addItem(self._genre_label(g))
         if 0 <= current_idx < self.genre_combo.count():
             self.genre_combo.setCurrentIndex(current_idx)
         self.genre_combo.blockSignals(False)
@@ -149,19 +256,100 @@ class MainWindow(QWidget):
         self.genre_summary_label.setVisible(bool(summary))
 
     def _on_genre_changed(self) -> None:
+        self._clear_selection()
         self._update_genre_summary_label()
         self._render_missions()
 
-    def _clear_missions_ui(self) -> None:
-        layout = self.mission_layout
-        for i in reversed(range(layout.count() - 1)):  # keep the final stretch
-            item = layout.itemAt(i)
-            w = item.widget()
-            if w is not None:
-                w.setParent(None)
+    # ---------- selection ----------
+    def _apply_selection(self) -> None:
+        for card in self._cards.values():
+            card.apply_selection()
+
+    def _select_all_missions(self) -> None:
+        genre = self._current_genre()
+        if genre is not None and not self.list_mode_btn.isChecked() and not self._showing_page():
+            self.mission_selection.set([m["id"] for m in self.service.sorted_missions(genre)])
+
+    def _clear_selection(self) -> None:
+        self.mission_selection.clear()
+        self.task_selection.clear()
+
+    # ---------- service events ----------
+    def _on_service_event(self, event: Event) -> None:
+        if event["kind"] == ev.GENRE_LOADED:
+            return   # 読み込んだジャンルの表示は _render_missions が作る
+        # カードを並べている途中なら続きを止める（削除されたミッションのカードを作らないよう）
+        self._render_token += 1
+        if not self._pending_events:
+            QTimer.singleShot(0, self._apply_events)
+        self._pending_events.append(event)
+
+    def _apply_events(self) -> None:
+        """
+        溜まった変更イベントを反映する：
+        - ジャンルの追加・削除・移動はコンボを作り直し、それ以外は該当ジャンルの表示名だけ更新
+        - 表示中ジャンルのミッション追加・削除・移動は一覧を差分更新
+        - ミッション/タスクの更新は該当カードだけ refresh して位置を直す
+        """
+        events, self._pending_events = self._pending_events, []
+        structural = {ev.MISSION_ADDED, ev.MISSION_DELETED, ev.MISSION_MOVED}
+        genre_ids: set[str] = set()
+        mission_ids: set[str] = set()
+        reload_combo = render_all = False
+        for e in events:
+            genre_ids.add(e["genre_id"])
+            if e["kind"] in (ev.GENRE_ADDED, ev.GENRE_DELETED, ev.GENRE_MOVED):
+                reload_combo = True
+            elif e["kind"] in structural:
+                render_all = True
+            elif e["kind"] == ev.MISSION_UPDATED:
+                mission_ids.add(e["id"])
+            elif e["parent_id"] is not None and e["kind"] != ev.GENRE_UPDATED:
+                mission_ids.add(e["parent_id"])
+
+        if reload_combo:
+            self._reload_genre_combo()
+        else:
+            for genre_id in genre_ids:
+                g = self.service.find_by_id(genre_id)
+                if g is not None:
+                    self.genre_combo.setItemText(self.service.sorted_position(g), self._genre_label(g))
+
+        if self._rendering:
+            # 止めた描画を最初からやり直す
+            self._update_genre_summary_label()
+            self._render_missions()
+            return
+        if self.agenda_btn.isChecked():
+            # 期限一覧はどのジャンルの変更でも取り直す（行数と表示範囲の行だけ引くので軽い）
+            self.agenda_view.refresh()
+        elif self.stats_btn.isChecked():
+            # 統計も同様（変更のあったジャンルのタスクだけを列に写し直す）
+            self.analytics_view.refresh()
+        genre = self._current_genre()
+        if genre is None or genre["id"] not in genre_ids:
+            return
+        self._update_genre_summary_label()
+        # 複数のカードが動いた場合は先頭から順に並べ直す必要があるので一覧ごと差分更新
+        if (render_all or reload_combo or len(mission_ids) > 1
+                or self.list_mode_btn.isChecked() or self._showing_page()):
+            self._render_missions()
+            return
+        for mission_id in mission_ids:
+            card = self._cards.get(mission_id)
+            m = self.service.find_by_id(mission_id)
+            if card is None or m is None:
+                continue
+            if card.rendered_version != self.service.version(m):
+                card.refresh()
+            i = self.service.sorted_position(m)
+            if self.mission_layout.indexOf(card) != i:
+                self.mission_layout.removeWidget(card)
+                self.mission_layout.insertWidget(i, card)
 
     # ---------- genre ops ----------
     def _add_genre(self) -> None:
+        from missionmanager.ui.add_dialogs import get_genre_add_input
         result = get_genre_add_input(self)
         if result is None:
             return
@@ -208,25 +396,209 @@ class MainWindow(QWidget):
             self._render_missions()
 
     # ---------- render missions ----------
+    def _showing_page(self) -> bool:
+        """期限一覧か統計を表示中（カードもリストも持たない）"""
+        return self.agenda_btn.isChecked() or self.stats_btn.isChecked()
+
+    def _close_pages(self) -> None:
+        """期限一覧・統計を閉じて元の表示（カード/リスト）に戻す"""
+        self.agenda_btn.setChecked(False)
+        self.stats_btn.setChecked(False)
+
+    def _on_view_mode_changed(self) -> None:
+        """カード表示 / リスト表示 / 期限一覧・統計（リスト表示より優先）を切り替える"""
+        # 期限一覧と統計は後から押した方を残す（もう一方は切替の通知を出さずに戻す）
+        pressed = self.sender()
+        for btn, other in ((self.agenda_btn, self.stats_btn), (self.stats_btn, self.agenda_btn)):
+            if pressed is btn and btn.isChecked() and other.isChecked():
+                other.blockSignals(True)
+                other.setChecked(False)
+                other.blockSignals(False)
+        self._clear_selection()
+        if self.stats_btn.isChecked():
+            if self.analytics_view is None:
+                from missionmanager.ui.analytics_view import AnalyticsView
+                self.analytics_view = AnalyticsView(self.service)
+                self.analytics_view.activated_genre.connect(self._reveal_genre)
+                self.mission_stack.addWidget(self.analytics_view)
+            self.mission_stack.setCurrentWidget(self.analytics_view)
+        elif self.agenda_btn.isChecked():
+            if self.agenda_view is None:
+                from missionmanager.ui.agenda import AgendaView
+                self.agenda_view = AgendaView(self.service)
+                self.agenda_view.activated_entity.connect(self._reveal_entity)
+                self.mission_stack.addWidget(self.agenda_view)
+            self.mission_stack.setCurrentWidget(self.agenda_view)
+        elif self.list_mode_btn.isChecked():
+            if self.mission_tree is None:
+                from missionmanager.ui.mission_model import MissionTreeView
+                self.mission_tree = MissionTreeView(self.service)
+                self.mission_stack.addWidget(self.mission_tree)
+            self.mission_stack.setCurrentWidget(self.mission_tree)
+        else:
+            self.mission_stack.setCurrentWidget(self.scroll)
+        self._render_missions()
+
     def _render_missions(self) -> None:
-        self._clear_missions_ui()
         genre = self._current_genre()
+        if genre is not None:
+            # 遅延読み込み時は初めて表示する時にミッション・タスクを読む
+            self.service.load_genre(genre)
+        if self._showing_page():
+            # 期限一覧・統計の表示中はカードもリストも持たない
+            self._render_cards(None)
+            if self.mission_tree is not None:
+                self.mission_tree.show_genre(None)
+            if self.stats_btn.isChecked():
+                self.analytics_view.refresh()
+            else:
+                self.agenda_view.refresh()
+        elif self.list_mode_btn.isChecked():
+            # リスト表示中はカードを持たない
+            self._render_cards(None)
+            self.mission_tree.show_genre(genre)
+        else:
+            if self.mission_tree is not None:
+                self.mission_tree.show_genre(None)
+            self._render_cards(genre)
+
+    def _render_cards(self, genre: Optional[GenreDict]) -> None:
+        """
+        ミッションカードを差分更新する：
+        - 既存カードはミッション id で再利用（開閉状態を保つ）
+        - データ版数が変わったカードだけ refresh
+        - 並び順（AppService が差分更新）に合わせてウィジェットを移動
+        - 新しいカードの作成は RENDER_CHUNK 枚ずつに分け、残りは次のイベントループで続ける
+        """
+        # AppService が差分更新している表示順をそのまま使う（再ソートしない）
+        missions = self.service.sorted_missions(genre) if genre is not None else []
+        alive = {m["id"] for m in missions}
+        for mission_id in list(self._cards):
+            card = self._cards[mission_id]
+            if mission_id not in alive or card.genre is not genre:
+                del self._cards[mission_id]
+                card.setParent(None)
+        self._render_token += 1
+        self._place_cards(genre, missions, 0, self._render_token)
+
+    def _place_cards(self, genre: Optional[GenreDict], missions: list[MissionDict], start: int, token: int,
+                     chunk: Optional[int] = None) -> None:
+        if token != self._render_token:
+            return   # 後から始まった描画に置き換えられた
+        layout = self.mission_layout
+        stop = min(len(missions), start + (chunk or self.RENDER_CHUNK))
+        for i in range(start, stop):
+            m = missions[i]
+            card = self._cards.get(m["id"])
+            if card is None or card.mission is not m:
+                card = MissionCard(self.service, genre, m, mission_selection=self.mission_selection,
+                                   task_selection=self.task_selection)
+                self._cards[m["id"]] = card
+            elif card.rendered_version != self.service.version(m):
+                card.refresh()
+            if layout.indexOf(card) != i:   # 末尾の stretch より前に並べる
+                layout.removeWidget(card)
+                layout.insertWidget(i, card)
+        self._rendering = stop < len(missions)
+        if self._rendering:
+            self._render_rest = (genre, missions, stop)
+            QTimer.singleShot(0, lambda: self._place_cards(genre, missions, stop, token))
+        else:
+            self._render_rest = None
+            self.populated.emit()
+
+    def _finish_render(self) -> None:
+        """並べている途中のカードを残りまで一度に作る"""
+        if self._rendering and self._render_rest is not None:
+            genre, missions, start = self._render_rest
+            self._render_token += 1
+            self._place_cards(genre, missions, start, self._render_token, chunk=len(missions))
+
+    # ---------- search ----------
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if obj is self.search_edit and event.type() == QEvent.FocusIn:
+            # 入力している間に索引を用意しておく
+            QTimer.singleShot(0, self._ensure_search_index)
+        return super().eventFilter(obj, event)
+
+    def _ensure_search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            from missionmanager.search import SearchIndex
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                self._search_index = SearchIndex(self.service)
+            finally:
+                QApplication.restoreOverrideCursor()
+        return self._search_index
+
+    def _search(self) -> None:
+        query = self.search_edit.text().strip()
+        if not query:
+            return
+        index = self._ensure_search_index()
+        hits = index.search(query, self.SEARCH_LIMIT + 1)
+        menu = QMenu(self)
+        if not hits:
+            menu.addAction("見つかりません").setEnabled(False)
+        kinds = {"genre": "ジャンル", "mission": "ミッション", "task": "タスク"}
+        for hit in hits[:self.SEARCH_LIMIT]:
+            # 親の名前（未読み込みのジャンルの要素もあるので索引から引く）
+            path = [index.hit(hit["genre_id"])["name"]]
+            if hit["kind"] == "task" and hit["parent_id"] is not None:
+                path.append(index.hit(hit["parent_id"])["name"])
+            label = f"[{kinds[hit['kind']]}] {hit['name']}"
+            if hit["kind"] != "genre":
+                label += f"  — {' / '.join(path)}"
+            action = menu.addAction(label)
+            action.triggered.connect(lambda checked=False, h=hit: self._reveal(h))
+        if len(hits) > self.SEARCH_LIMIT:
+            menu.addAction(f"ほかにも一致があります（先頭 {self.SEARCH_LIMIT} 件を表示）").setEnabled(False)
+        menu.exec(self.search_edit.mapToGlobal(self.search_edit.rect().bottomLeft()))
+
+    def _reveal(self, hit: SearchHit) -> None:
+        """検索結果の要素のジャンルに切り替え、カードを開いてその位置までスクロールする"""
+        genre = self.service.find_by_id(hit["genre_id"])
         if genre is None:
             return
-        missions = genre.get("missions", [])
-        sorted_missions = sorted(
-            enumerate(missions),
-            key=lambda x: mission_sort_key(x[1], x[0])
-        )
-        for _, m in sorted_missions:
-            card = MissionCard(self.service, genre, m)
-            card.changed.connect(self._after_mission_changed)
-            self.mission_layout.insertWidget(self.mission_layout.count() - 1, card)
+        self.service.load_genre(genre)
+        entity = self.service.find_by_id(hit["id"])
+        if entity is None:
+            return
+        if hit["kind"] == "genre":
+            self._reveal_genre(genre)
+            return
+        self._reveal_entity(entity)
 
-    def _after_mission_changed(self) -> None:
-        # ミッション変更時にコンボボックス（未完了数）を更新し、再描画
-        self._reload_genre_combo()
-        QTimer.singleShot(0, self._render_missions)
+    def _reveal_genre(self, genre: GenreDict) -> None:
+        """ジャンルに切り替える（期限一覧・統計から開いた場合は元の表示に戻す）"""
+        self._close_pages()
+        self.genre_combo.setCurrentIndex(self.service.sorted_position(genre))
+
+    def _reveal_entity(self, entity: Entity) -> None:
+        """読み込み済みのミッション・タスクのジャンルに切り替え、カード（リスト表示では行）を開いてスクロールする"""
+        if "tasks" in entity:
+            m, t = entity, None
+        else:
+            m, t = self.service.parent_of(entity), entity
+        genre = self.service.parent_of(m)
+        # 期限一覧・統計から開いた場合は元の表示（カード/リスト）に戻す
+        self._close_pages()
+        self.genre_combo.setCurrentIndex(self.service.sorted_position(genre))
+        if self.list_mode_btn.isChecked():
+            self.mission_tree.reveal(m, t)
+            return
+        self._finish_render()
+        card = self._cards.get(m["id"])
+        if card is None:
+            return
+        target = card.reveal(t)
+        # 一致した要素を選択状態にして目立たせる（Esc で解除）
+        if t is not None:
+            self.task_selection.set([t["id"]])
+        else:
+            self.mission_selection.set([m["id"]])
+        # 開いたカードのレイアウトが確定してからスクロールする
+        QTimer.singleShot(0, lambda: self.scroll.ensureWidgetVisible(target))
 
     # ---------- mission ops ----------
     def _add_mission(self) -> None:
@@ -234,9 +606,9 @@ class MainWindow(QWidget):
         if genre is None:
             QMessageBox.warning(self, "警告", "ジャンルを作成して下さい。")
             return
+        from missionmanager.ui.add_dialogs import get_mission_add_input
         result = get_mission_add_input(self)
         if result is None:
             return
         name, summary, due_date = result
         self.service.add_mission(genre, name, summary, due_date)
-        self._render_missions()